@@ -1,4 +1,7 @@
-from flask import Flask, render_template
+import atexit
+import signal
+import sys
+from flask import Flask, render_template, jsonify
 from flask_socketio import SocketIO, emit
 from prompts.prompt_factory import PromptFactory
 import json
@@ -7,6 +10,7 @@ from typing import Dict, Any
 from pydantic import BaseModel
 from services.vector_db_service import VectorDBService
 from services.command_handler import CommandHandler
+from services.indexing_queue import IndexingQueue
 from prompts.strategies.memory_manager import MemoryManager
 
 # 로깅 설정
@@ -36,12 +40,27 @@ socketio = SocketIO(app, cors_allowed_origins="*", logger=True, engineio_logger=
 # 서비스 인스턴스 생성
 prompt_factory = PromptFactory()
 vector_db_service = VectorDBService(storage_dir="data/vector_db")
-command_handler = CommandHandler(vector_db_service=vector_db_service, prompt_factory=prompt_factory)
+indexing_queue = IndexingQueue(vector_db_service)
+command_handler = CommandHandler(vector_db_service=vector_db_service, prompt_factory=prompt_factory,
+                                 indexing_queue=indexing_queue)
+
+# 종료 시 벡터 DB의 WAL을 체크포인트 (atexit은 역순 실행: 인덱싱 큐를 먼저 비운 뒤 벡터 DB 종료)
+atexit.register(vector_db_service.close)
+atexit.register(indexing_queue.close)
 
 # 메모리 매니저 초기화
 MemoryManager.initialize(base_dir="data/memory")
 logger.info("메모리 매니저가 초기화되었습니다.")
 
+# 종료 시 저장되지 않은 대화 메모리 기록
+atexit.register(MemoryManager.close)
+
+def handle_sigterm(signum, frame):
+    # SIGTERM으로 종료될 때도 atexit 종료 훅(체크포인트)이 실행되도록 정상 종료로 전환
+    sys.exit(0)
+
+signal.signal(signal.SIGTERM, handle_sigterm)
+
 @socketio.on('connect')
 def handle_connect():
     logger.info('Client connected')
@@ -93,6 +112,10 @@ def handle_message(message):
 def index():
     return render_template('index.html')
 
+@app.route('/metrics/indexing')
+def indexing_metrics():
+    return jsonify(indexing_queue.stats())
+
 if __name__ == '__main__':
     logger.info("Starting Flask application...")
     socketio.run(app, debug=True, port=5001, host='0.0.0.0')
@@ -0,0 +1,410 @@
+"""
+VectorDatabase / VectorDBService 성능 벤치마크.
+
+한국어와 비슷한 합성 문서(한글 음절 단어, 주제별 어휘, 인라인 HTML 서식)를 만들어
+삽입 처리량, 단건/배치 검색 지연 백분위수, 메모리 사용량, 시작 시간, 정확 검색 대비 recall@k를 측정하고
+결과를 JSON으로 출력합니다. 서비스 벤치마크는 파일 타입별 저장과 전체 타입 검색, 저장된 파일 기준 검색을 측정합니다.
+커밋 간 결과를 비교해 성능 회귀를 확인할 수 있습니다.
+
+LLM 제목 생성은 로컬 키워드 추출로, 임베딩 모델은 기본적으로 해시 기반 임베더로 대체하므로
+네트워크와 GPU 없이 실행됩니다. (--embedder model 로 실제 SentenceTransformer 사용 가능)
+
+실행 예:
+    python benchmarks/vector_db_benchmark.py --sizes 1000,10000 --index-types flat,ivf,hnsw,sq8,pq,pq:rerank=0 --output result.json
+    python benchmarks/vector_db_benchmark.py --sizes "" --service-sizes 1000,10000
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+# 저장소 루트에서 실행하지 않아도 databases 패키지를 찾도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from databases.model_registry import EMBEDDING_MODEL_NAME, register_embedding_model
+from databases.text_processing import extract_keywords
+from databases.vector_database import VectorDatabase
+from services.vector_db_service import VectorDBService, SUPPORTED_FILE_TYPES
+
+# 한글 음절 범위 (가 ~ 힣)
+_HANGUL_START = 0xAC00
+_HANGUL_COUNT = 11172
+
+
+class HashingEmbedder:
+    """
+    단어 해시로 벡터를 만드는 결정적 임베더입니다. SentenceTransformer.encode와 같은 호출 형식을 따릅니다.
+    같은 단어를 공유하는 문서는 가까운 벡터가 되므로 주제 구조가 있는 합성 코퍼스에서 의미 있는 recall을 측정할 수 있습니다.
+    """
+
+    def __init__(self, dimension: int = 768):
+        self.dimension = dimension
+
+    def encode(self, sentences: Any, batch_size: int = 32, **kwargs: Any) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = np.zeros((len(texts), self.dimension), dtype='float32')
+        for row, text in enumerate(texts):
+            for token in text.split():
+                digest = zlib.crc32(token.encode('utf-8'))
+                # 단어마다 다른 가중치를 주어 거리 동점을 줄임 (동점이 많으면 recall이 부정확해짐)
+                weight = 1.0 + ((digest >> 17) & 0xFF) / 255.0
+                vectors[row, digest % self.dimension] += weight if (digest >> 16) & 1 else -weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.maximum(norms, 1e-6)
+        return vectors[0] if single else vectors
+
+
+def _local_title(self: VectorDatabase, text: str, max_words: int = 5) -> str:
+    """
+    LLM 대신 로컬 키워드 추출로 제목을 만듭니다.
+    """
+    return extract_keywords(text, max_words)
+
+
+class SyntheticCorpus:
+    """
+    주제별 어휘를 가진 한국어 유사 문서 생성기입니다. 문서는 실제 컨텍스트처럼 인라인 서식 태그로 감쌉니다.
+    """
+
+    def __init__(self, seed: int = 0, vocabulary_size: int = 20000, topics: int = 100, topic_words: int = 300):
+        self.rng = np.random.default_rng(seed)
+        self.vocabulary = [self._word() for _ in range(vocabulary_size)]
+        self.topics = [self.rng.choice(vocabulary_size, topic_words, replace=False) for _ in range(topics)]
+        # 주제 안에서 자주 쓰이는 단어가 있도록 Zipf 분포 가중치 사용
+        weights = 1.0 / np.arange(1, topic_words + 1)
+        self.topic_weights = weights / weights.sum()
+
+    def _word(self) -> str:
+        length = int(self.rng.integers(2, 5))
+        return "".join(chr(_HANGUL_START + int(code)) for code in self.rng.integers(0, _HANGUL_COUNT, length))
+
+    def document(self) -> str:
+        topic = self.topics[int(self.rng.integers(len(self.topics)))]
+        length = int(self.rng.integers(20, 80))
+        topic_count = int(length * 0.7)
+        words = [self.vocabulary[i] for i in self.rng.choice(topic, topic_count, p=self.topic_weights)]
+        words += [self.vocabulary[i] for i in self.rng.integers(0, len(self.vocabulary), length - topic_count)]
+        self.rng.shuffle(words)
+        half = len(words) // 2
+        return (f"<span style='font-size: 11pt; color: #000000'>{' '.join(words[:half])}</span><br>"
+                f"<span style='font-size: 11pt; color: #000000'>{' '.join(words[half:])}</span>")
+
+    def records(self, count: int, start_id: int = 10 ** 15) -> List[Dict[str, Any]]:
+        records = []
+        for i in range(count):
+            file_id = start_id + i
+            context = self.document()
+            records.append({
+                "id": file_id,
+                "text": f"word {context}",
+                "metadata": {"type": "word", "context": context, "fileId": file_id, "volumeId": i % 8}
+            })
+        return records
+
+
+def _rss_mb() -> float:
+    """
+    현재 프로세스의 상주 메모리(MB). /proc을 사용할 수 없으면 최대 상주 메모리를 반환합니다.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.array(samples) * 1000
+    return {
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3)
+    }
+
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return round(total / 2 ** 20, 2)
+
+
+def _exact_neighbors(db: VectorDatabase, queries: np.ndarray, k: int) -> List[set]:
+    """
+    저장된 임베딩 전체와 직접 비교한 정답 이웃(파일 ID 문자열 집합)을 계산합니다.
+    """
+    ids = np.array(db.embeddings.ids())
+    vectors = np.asarray(db.embeddings.vectors())
+    norms = np.einsum('ij,ij->i', vectors, vectors)
+    neighbors = []
+    for query in queries:
+        distances = norms - 2 * (vectors @ query)
+        top = np.argpartition(distances, min(k, len(distances) - 1))[:k]
+        neighbors.append({str(id) for id in ids[top]})
+    return neighbors
+
+
+def parse_index_spec(spec: str) -> Dict[str, Any]:
+    """
+    "타입:파라미터=값:..." 형식(예: "pq:m=48:rerank=0")의 인덱스 지정을 IndexConfig 딕셔너리로 변환합니다.
+    """
+    index_type, *pairs = spec.split(":")
+    config: Dict[str, Any] = {"index_type": index_type}
+    for pair in pairs:
+        key, value = pair.split("=", 1)
+        config[key] = float(value) if "." in value else int(value)
+    return config
+
+
+def run_case(size: int, index_spec: str, args: argparse.Namespace, corpus: SyntheticCorpus) -> Dict[str, Any]:
+    """
+    한 가지 규모와 인덱스 설정으로 벤치마크를 실행합니다.
+    """
+    index_type = parse_index_spec(index_spec)
+    workdir = tempfile.mkdtemp(prefix=f"vdb-bench-{size}-", dir=args.workdir)
+    storage_dir = os.path.join(workdir, "db")
+    result: Dict[str, Any] = {"size": size, "index_type": index_spec}
+    try:
+        records = corpus.records(size)
+        query_texts = [corpus.document() for _ in range(args.queries)]
+        rss_before = _rss_mb()
+
+        db = VectorDatabase(storage_dir=storage_dir, max_vectors=size, index_config=index_type,
+                            checkpoint_every=args.checkpoint_every, metadata_backend=args.metadata_backend)
+
+        # 일괄 삽입 처리량
+        started = time.perf_counter()
+        for offset in range(0, size, args.insert_batch):
+            db.store_vectors_batch(records[offset:offset + args.insert_batch])
+        batch_seconds = time.perf_counter() - started
+
+        # 단건 삽입 처리량 (기존 문서 교체)
+        single_records = records[:min(args.single_inserts, size)]
+        started = time.perf_counter()
+        for record in single_records:
+            db.store_vector(record["id"], record["text"] + " 수정", record["metadata"])
+        single_seconds = time.perf_counter() - started
+
+        result["insert"] = {
+            "batch_docs_per_second": round(size / batch_seconds, 1),
+            "batch_seconds": round(batch_seconds, 3),
+            "single_docs_per_second": round(len(single_records) / single_seconds, 1) if single_records else None
+        }
+        result["actual_index_kind"] = db.index_kind
+
+        # 단건 검색 지연: 인덱스 검색만, 그리고 쿼리 임베딩을 포함한 전체
+        # (전체 지연은 임베딩 캐시에 없는 별도 쿼리로 측정해 인코딩 비용을 포함)
+        query_vectors = np.vstack([db.embed_query(text, "fast") for text in query_texts])
+        uncached_texts = [corpus.document() for _ in range(args.queries)]
+        index_latencies, end_to_end_latencies, filtered_latencies = [], [], []
+        retrieved = []
+        for text, vector in zip(uncached_texts, query_vectors):
+            started = time.perf_counter()
+            results = db.search_by_vector(vector.reshape(1, -1), args.k)
+            index_latencies.append(time.perf_counter() - started)
+            retrieved.append({result["id"] for result in results})
+
+            started = time.perf_counter()
+            db.search_similar(text, args.k, mode="fast")
+            end_to_end_latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            db.search_by_vector(vector.reshape(1, -1), args.k, filters={"volumeId": 3})
+            filtered_latencies.append(time.perf_counter() - started)
+
+        # 배치 검색: 쿼리 묶음을 인덱스에 한 번에 검색 (쿼리당 지연으로 환산)
+        batch_latencies = []
+        if db.index is not None:
+            for offset in range(0, len(query_vectors), args.search_batch):
+                batch = np.ascontiguousarray(query_vectors[offset:offset + args.search_batch])
+                started = time.perf_counter()
+                db.index.search(batch, args.k)
+                batch_latencies.append((time.perf_counter() - started) / len(batch))
+
+        result["search"] = {
+            "single_index": _percentiles(index_latencies),
+            "single_end_to_end": _percentiles(end_to_end_latencies),
+            "single_filtered": _percentiles(filtered_latencies),
+            "batched_per_query": _percentiles(batch_latencies) if batch_latencies else None
+        }
+
+        # 정확 검색 대비 recall@k
+        truth = _exact_neighbors(db, query_vectors, args.k)
+        recalls = [len(got & expected) / len(expected) for got, expected in zip(retrieved, truth) if expected]
+        result[f"recall_at_{args.k}"] = round(float(np.mean(recalls)), 4)
+
+        result["memory"] = {
+            "rss_before_mb": round(rss_before, 1),
+            "rss_after_build_mb": round(_rss_mb(), 1),
+            "rss_delta_mb": round(_rss_mb() - rss_before, 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        }
+
+        started = time.perf_counter()
+        db.close()
+        result["close_seconds"] = round(time.perf_counter() - started, 3)
+        result["disk_mb"] = _dir_size_mb(storage_dir)
+        # 인덱스 파일 크기로 벡터당 메모리 사용량을 비교 (양자화 압축률)
+        index_bytes = os.path.getsize(os.path.join(storage_dir, "faiss_index.bin"))
+        result["index_mb"] = round(index_bytes / 2 ** 20, 2)
+        result["index_bytes_per_vector"] = round(index_bytes / size, 1)
+        del db
+
+        # 시작 시간: 열기, 그리고 첫 검색까지
+        result["startup"] = {}
+        for mode in ("memory", "mmap"):
+            started = time.perf_counter()
+            reopened = VectorDatabase(storage_dir=storage_dir, max_vectors=size, index_config=index_type,
+                                      open_mode=mode, metadata_backend=args.metadata_backend)
+            opened = time.perf_counter() - started
+            reopened.search_by_vector(query_vectors[:1], args.k)
+            first_search = time.perf_counter() - started
+            result["startup"][mode] = {"open_seconds": round(opened, 4), "first_search_seconds": round(first_search, 4)}
+            reopened.close()
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_service_case(size: int, args: argparse.Namespace, corpus: SyntheticCorpus) -> Dict[str, Any]:
+    """
+    VectorDBService로 size개 문서를 파일 타입별로 나누어 저장하고, 전체/단일 타입 검색과
+    저장된 파일 기준 검색(get_workflows 경로) 지연을 측정합니다.
+    """
+    workdir = tempfile.mkdtemp(prefix=f"vdb-service-bench-{size}-", dir=args.workdir)
+    result: Dict[str, Any] = {"size": size, "case": "service"}
+    try:
+        programs = [{"fileId": 10 ** 15 + i, "fileType": SUPPORTED_FILE_TYPES[i % len(SUPPORTED_FILE_TYPES)],
+                     "context": corpus.document(), "volumeId": i % 8} for i in range(size)]
+        rss_before = _rss_mb()
+        service = VectorDBService(storage_dir=workdir, max_vectors=size, metadata_backend=args.metadata_backend)
+
+        # 일괄 저장 처리량 (타입별로 묶여 저장됨)
+        started = time.perf_counter()
+        for offset in range(0, size, args.insert_batch):
+            service.store_program_infos(programs[offset:offset + args.insert_batch])
+        batch_seconds = time.perf_counter() - started
+
+        # 단건 저장 처리량 (기존 문서의 내용 변경)
+        single_programs = programs[:min(args.single_inserts, size)]
+        started = time.perf_counter()
+        for program in single_programs:
+            service.store_program_info(program["fileId"], program["fileType"], program["context"] + " 수정",
+                                       program["volumeId"])
+        single_seconds = time.perf_counter() - started
+
+        result["insert"] = {
+            "batch_docs_per_second": round(size / batch_seconds, 1),
+            "batch_seconds": round(batch_seconds, 3),
+            "single_docs_per_second": round(len(single_programs) / single_seconds, 1) if single_programs else None
+        }
+
+        # 검색 지연: 임베딩 캐시에 없는 쿼리로 전체 타입, 단일 타입 검색
+        all_types_latencies, single_type_latencies, by_program_latencies = [], [], []
+        for i in range(args.queries):
+            started = time.perf_counter()
+            service.search_similar_programs(corpus.document(), k=args.k, mode="fast", include_context=False)
+            all_types_latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            service.search_similar_programs(corpus.document(), file_type="word", k=args.k, mode="fast",
+                                            include_context=False)
+            single_type_latencies.append(time.perf_counter() - started)
+
+            program = programs[(i * 7919) % size]
+            started = time.perf_counter()
+            service.search_similar_to_program(program["fileId"], program["fileType"], k=args.k)
+            by_program_latencies.append(time.perf_counter() - started)
+
+        result["search"] = {
+            "all_types_end_to_end": _percentiles(all_types_latencies),
+            "single_type_end_to_end": _percentiles(single_type_latencies),
+            "by_stored_program": _percentiles(by_program_latencies)
+        }
+        result["memory"] = {
+            "rss_delta_mb": round(_rss_mb() - rss_before, 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        }
+
+        started = time.perf_counter()
+        service.close()
+        result["close_seconds"] = round(time.perf_counter() - started, 3)
+        result["disk_mb"] = _dir_size_mb(workdir)
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="VectorDatabase 성능 벤치마크")
+    parser.add_argument("--sizes", default="1000,10000", help="문서 수 목록 (예: 1000,10000,100000,1000000)")
+    parser.add_argument("--index-types", default="flat", help="인덱스 목록 (flat, ivf, hnsw, fp16, sq8, pq). "
+                             "파라미터는 콜론으로 지정 (예: pq:m=48:rerank=0)")
+    parser.add_argument("--service-sizes", default="1000", help="VectorDBService 벤치마크 문서 수 목록 (빈 값이면 생략)")
+    parser.add_argument("--queries", type=int, default=200, help="검색 쿼리 수")
+    parser.add_argument("--k", type=int, default=10, help="검색 결과 수 (recall@k의 k)")
+    parser.add_argument("--insert-batch", type=int, default=1000, help="store_vectors_batch 한 번에 넣을 문서 수")
+    parser.add_argument("--single-inserts", type=int, default=200, help="단건 삽입으로 측정할 문서 수")
+    parser.add_argument("--search-batch", type=int, default=32, help="배치 검색 크기")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="VectorDatabase checkpoint_every")
+    parser.add_argument("--metadata-backend", choices=("sqlite", "json"), default="sqlite",
+                        help="VectorDatabase 메타데이터 저장 방식")
+    parser.add_argument("--embedder", choices=("hash", "model"), default="hash",
+                        help="hash: 해시 기반 로컬 임베더, model: 실제 SentenceTransformer 모델")
+    parser.add_argument("--seed", type=int, default=0, help="코퍼스 난수 시드")
+    parser.add_argument("--workdir", default=None, help="임시 데이터베이스를 만들 디렉토리")
+    parser.add_argument("--output", default=None, help="결과 JSON 파일 경로 (없으면 표준 출력)")
+    args = parser.parse_args()
+
+    # LLM 제목 생성을 로컬 키워드 추출로 대체
+    VectorDatabase._generate_title = _local_title
+    if args.embedder == "hash":
+        register_embedding_model(EMBEDDING_MODEL_NAME, HashingEmbedder())
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+    corpus = SyntheticCorpus(seed=args.seed)
+    results = []
+    for size in [int(value) for value in args.sizes.split(",") if value]:
+        for index_type in [value.strip() for value in args.index_types.split(",") if value.strip()]:
+            print(f"벤치마크 실행 중: size={size}, index_type={index_type}", file=sys.stderr)
+            results.append(run_case(size, index_type, args, corpus))
+    for size in [int(value) for value in args.service_sizes.split(",") if value]:
+        print(f"서비스 벤치마크 실행 중: size={size}", file=sys.stderr)
+        results.append(run_service_case(size, args, corpus))
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": vars(args),
+        "results": results
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import threading
+from typing import Dict, Any, Iterable, Optional, Set
+
+# 필터 검색을 지원하는 메타데이터 필드
+FILTER_FIELDS = ("volumeId", "type")
+
+
+class AttributeIndex:
+    """
+    메타데이터 필드 값별로 파일 ID 집합을 보관하는 역색인입니다.
+
+    저장/삭제 시점에 갱신되며, 필터 검색은 조건에 맞는 ID 집합의 교집합만 계산하므로
+    전체 벡터 수가 아니라 해당 필드 값의 항목 수에 비례하는 비용으로 후보를 구합니다.
+    """
+
+    def __init__(self, fields: Iterable[str] = FILTER_FIELDS):
+        """
+        Args:
+            fields (Iterable[str]): 색인할 메타데이터 필드 (기본값: volumeId, type)
+        """
+        self.fields = tuple(fields)
+        self._postings: Dict[str, Dict[str, Set[int]]] = {field: {} for field in self.fields}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(field: str, value: Any) -> str:
+        """
+        필드 값을 비교용 문자열로 통일합니다. (정수/문자열 ID, 파일 타입 대소문자 차이 무시)
+        """
+        value = str(value)
+        return value.lower() if field == "type" else value
+
+    def add(self, id: int, metadata: Dict[str, Any]) -> None:
+        """
+        항목의 필드 값을 색인에 추가합니다. 값이 없는 필드는 색인하지 않습니다.
+        """
+        with self._lock:
+            for field in self.fields:
+                value = metadata.get(field)
+                if value is not None:
+                    self._postings[field].setdefault(self._normalize(field, value), set()).add(int(id))
+
+    def remove(self, id: int, metadata: Dict[str, Any]) -> None:
+        """
+        항목의 필드 값을 색인에서 제거합니다.
+        """
+        with self._lock:
+            for field in self.fields:
+                value = metadata.get(field)
+                if value is None:
+                    continue
+                key = self._normalize(field, value)
+                ids = self._postings[field].get(key)
+                if ids is not None:
+                    ids.discard(int(id))
+                    if not ids:
+                        del self._postings[field][key]
+
+    def rebuild(self, metadata_store: Dict[str, Dict[str, Any]]) -> None:
+        """
+        메타데이터 저장소 전체로 색인을 다시 만듭니다.
+        """
+        with self._lock:
+            self._postings = {field: {} for field in self.fields}
+        for key, entry in metadata_store.items():
+            self.add(int(key), entry.get("metadata", {}))
+
+    def lookup(self, filters: Optional[Dict[str, Any]]) -> Optional[Set[int]]:
+        """
+        필터 조건을 모두 만족하는 파일 ID 집합을 반환합니다.
+        값으로 리스트/튜플/집합을 주면 그중 하나와 일치하는 항목을 찾습니다.
+
+        Args:
+            filters (Optional[Dict[str, Any]]): 필드별 조건 (예: {"volumeId": 3, "type": "word"})
+
+        Returns:
+            Optional[Set[int]]: 조건에 맞는 ID 집합. 조건이 없으면 None
+        """
+        if not filters:
+            return None
+
+        unknown = set(filters) - set(self.fields)
+        if unknown:
+            raise ValueError(f"필터 검색을 지원하지 않는 필드입니다: {sorted(unknown)}")
+
+        with self._lock:
+            matched = []
+            for field, condition in filters.items():
+                values = condition if isinstance(condition, (list, tuple, set, frozenset)) else (condition,)
+                ids = set()
+                for value in values:
+                    ids |= self._postings[field].get(self._normalize(field, value), set())
+                matched.append(ids)
+
+        # 작은 집합부터 교집합을 계산
+        matched.sort(key=len)
+        result = matched[0]
+        for ids in matched[1:]:
+            if not result:
+                break
+            result = result & ids
+        return set(result)
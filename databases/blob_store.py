@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Set
+
+from databases.checkpoint_scheduler import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore:
+    """
+    큰 컨텍스트를 내용 해시(SHA-256) 이름의 zlib 압축 파일로 보관하는 저장소입니다.
+
+    같은 내용은 한 파일만 저장되고(중복 제거) 참조 수로 관리됩니다. 참조가 없어진 파일은
+    바로 지우지 않고 모아 두었다가, 메타데이터가 체크포인트된 뒤 collect()로 삭제합니다.
+    저장된 메타데이터가 지워진 파일을 가리키는 일이 없도록 하기 위해서입니다.
+    """
+
+    def __init__(self, root_dir: str, level: int = 6, max_cache_entries: int = 32):
+        """
+        Args:
+            root_dir (str): 블롭 파일 디렉토리
+            level (int): zlib 압축 수준 (기본값: 6)
+            max_cache_entries (int): 압축을 푼 내용을 메모리에 보관할 최대 개수 (기본값: 32)
+        """
+        self.root_dir = root_dir
+        self.level = level
+        self.max_cache_entries = max_cache_entries
+        os.makedirs(root_dir, exist_ok=True)
+
+        self.reads = 0
+        self.cache_hits = 0
+
+        self._refs: Dict[str, int] = {}
+        self._garbage: Set[str] = set()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_ref(text: str) -> str:
+        """
+        내용의 블롭 참조(SHA-256 해시)를 계산합니다.
+        """
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _path(self, ref: str) -> str:
+        return os.path.join(self.root_dir, ref[:2], f"{ref[2:]}.z")
+
+    def put(self, text: str) -> str:
+        """
+        내용을 저장하고 참조 수를 하나 늘립니다. 같은 내용이 이미 있으면 파일을 다시 쓰지 않습니다.
+
+        Args:
+            text (str): 저장할 내용
+
+        Returns:
+            str: 블롭 참조
+        """
+        ref = self.make_ref(text)
+        with self._lock:
+            path = self._path(ref)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                atomic_write(path, zlib.compress(text.encode('utf-8'), self.level))
+            self._refs[ref] = self._refs.get(ref, 0) + 1
+            self._garbage.discard(ref)
+        return ref
+
+    def get(self, ref: str) -> str:
+        """
+        블롭 내용을 읽습니다. 최근 읽은 내용은 메모리에서 반환합니다.
+
+        Args:
+            ref (str): 블롭 참조
+
+        Returns:
+            str: 저장된 내용
+        """
+        with self._lock:
+            self.reads += 1
+            text = self._cache.get(ref)
+            if text is not None:
+                self.cache_hits += 1
+                self._cache.move_to_end(ref)
+                return text
+
+        with open(self._path(ref), 'rb') as f:
+            text = zlib.decompress(f.read()).decode('utf-8')
+
+        with self._lock:
+            self._cache[ref] = text
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+        return text
+
+    def release(self, ref: str) -> None:
+        """
+        참조 수를 하나 줄입니다. 참조가 없어진 블롭은 다음 collect()에서 삭제됩니다.
+        """
+        with self._lock:
+            count = self._refs.get(ref, 0) - 1
+            if count > 0:
+                self._refs[ref] = count
+            else:
+                self._refs.pop(ref, None)
+                self._garbage.add(ref)
+
+    def rebuild(self, refs: Iterable[str]) -> None:
+        """
+        저장된 메타데이터가 가리키는 블롭 참조들로 참조 수를 다시 만듭니다.
+        """
+        counts: Dict[str, int] = {}
+        for ref in refs:
+            counts[ref] = counts.get(ref, 0) + 1
+        with self._lock:
+            self._refs = counts
+            self._garbage = set()
+
+    def take_garbage(self) -> Set[str]:
+        """
+        지금까지 참조가 없어진 블롭 목록을 가져옵니다. 체크포인트 스냅샷 시점에 호출합니다.
+        """
+        with self._lock:
+            garbage, self._garbage = self._garbage, set()
+            return garbage
+
+    def requeue(self, garbage: Iterable[str]) -> None:
+        """
+        체크포인트가 실패해 삭제하지 못한 블롭을 다음 collect() 대상으로 되돌립니다.
+        """
+        with self._lock:
+            self._garbage.update(ref for ref in garbage if ref not in self._refs)
+
+    def collect(self, garbage: Iterable[str]) -> int:
+        """
+        take_garbage()로 가져온 블롭 중 여전히 참조가 없는 파일을 삭제합니다.
+        메타데이터가 디스크에 기록된 뒤 호출해야 합니다.
+
+        Returns:
+            int: 삭제한 파일 수
+        """
+        removed = 0
+        with self._lock:
+            for ref in garbage:
+                if ref in self._refs:
+                    continue
+                self._cache.pop(ref, None)
+                try:
+                    os.remove(self._path(ref))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        if removed:
+            logger.debug(f"참조가 없는 블롭 {removed}개를 삭제했습니다: {self.root_dir}")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        블롭 수와 읽기 통계를 반환합니다.
+        """
+        with self._lock:
+            return {"blobs": len(self._refs), "references": sum(self._refs.values()),
+                    "reads": self.reads, "cache_hits": self.cache_hits}
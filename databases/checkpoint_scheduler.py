@@ -0,0 +1,145 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write(path: str, data: Union[str, bytes], fsync: bool = True) -> None:
+    """
+    같은 디렉토리의 임시 파일에 쓰고 rename으로 교체해, 중간에 중단되어도 기존 파일이나
+    새 파일 중 하나만 남도록 저장합니다.
+
+    Args:
+        path (str): 저장할 파일 경로
+        data (Union[str, bytes]): 저장할 내용. 문자열은 UTF-8로 기록
+        fsync (bool): 교체 전에 디스크 동기화할지 여부 (기본값: True)
+    """
+    tmp_path = f"{path}.tmp"
+    payload = data.encode('utf-8') if isinstance(data, str) else data
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class CheckpointScheduler:
+    """
+    변경 횟수를 모아 두었다가 일정 시간(interval초)이 지나거나 변경이 max_dirty개 쌓이면
+    백그라운드 스레드에서 저장 함수를 한 번 실행합니다. 요청이 몰려도 변경마다 전체 파일을
+    다시 쓰지 않습니다. 저장이 실패하면 변경 횟수를 유지하고 다음 주기에 다시 시도합니다.
+    """
+
+    def __init__(self, save: Callable[[], None], interval: float = 5.0, max_dirty: int = 100,
+                 name: str = "checkpoint"):
+        """
+        Args:
+            save (Callable[[], None]): 전체 상태를 저장하는 함수
+            interval (float): 첫 변경 후 저장까지 기다리는 최대 시간(초) (기본값: 5.0)
+            max_dirty (int): 바로 저장을 시작할 변경 횟수 (기본값: 100)
+            name (str): 백그라운드 스레드 이름
+        """
+        self._save = save
+        self.interval = interval
+        self.max_dirty = max_dirty
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._save_lock = threading.Lock()
+        self._dirty = 0
+        self._dirty_since: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """
+        아직 저장되지 않은 변경 횟수.
+        """
+        return self._dirty
+
+    def mark_dirty(self, count: int = 1) -> None:
+        """
+        저장되지 않은 변경이 생겼음을 알립니다.
+
+        Args:
+            count (int): 변경 횟수 (기본값: 1)
+        """
+        with self._cond:
+            if self._closed:
+                return
+            if self._dirty == 0:
+                self._dirty_since = time.monotonic()
+            self._dirty += count
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"checkpoint-{self.name}", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _due(self) -> bool:
+        return self._dirty >= self.max_dirty or time.monotonic() - self._dirty_since >= self.interval
+
+    def _run(self) -> None:
+        """
+        저장 시점이 될 때까지 기다렸다가 저장하는 백그라운드 루프입니다.
+        """
+        while True:
+            with self._cond:
+                while not self._closed and not (self._dirty and self._due()):
+                    timeout = None if not self._dirty else self.interval - (time.monotonic() - self._dirty_since)
+                    self._cond.wait(timeout)
+                if self._closed:
+                    return
+            self._checkpoint(retry_delay=self.interval)
+
+    def _checkpoint(self, retry_delay: float = 0.0) -> bool:
+        """
+        지금까지의 변경을 저장합니다. 저장 중에 생긴 변경은 다음 저장에 반영됩니다.
+
+        Returns:
+            bool: 저장에 성공했으면 True
+        """
+        with self._save_lock:
+            with self._cond:
+                taken = self._dirty
+                if not taken:
+                    return True
+            try:
+                self._save()
+            except Exception as e:
+                logger.error(f"체크포인트 저장 중 오류 발생 ({self.name}): {str(e)}")
+                with self._cond:
+                    # 다음 주기에 다시 시도
+                    self._dirty_since = time.monotonic() + retry_delay - self.interval
+                return False
+
+            with self._cond:
+                self._dirty -= taken
+                self._dirty_since = time.monotonic() if self._dirty else None
+            return True
+
+    def flush(self) -> bool:
+        """
+        저장되지 않은 변경이 있으면 호출한 스레드에서 바로 저장합니다.
+
+        Returns:
+            bool: 저장할 변경이 없거나 저장에 성공했으면 True
+        """
+        return self._checkpoint()
+
+    def close(self) -> None:
+        """
+        백그라운드 스레드를 멈추고 남은 변경을 저장합니다. 종료 시 호출됩니다.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
@@ -0,0 +1,207 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    SentenceTransformer.encode 결과를 보관하는 2단계 캐시입니다.
+
+    - 메모리 계층: 최근 사용한 max_memory_entries개의 float32 벡터 (LRU)
+    - 디스크 계층: 고정 길이 행을 이어 붙인 바이너리 파일과 행 순서대로 키를 적은 파일
+
+    키는 모델 이름과 텍스트의 SHA-256 해시입니다.
+    """
+
+    def __init__(self, cache_dir: Optional[str], model_name: str, dimension: int = 768,
+                 max_memory_entries: int = 4096, max_disk_entries: int = 100000, dtype: str = 'float16'):
+        """
+        Args:
+            cache_dir (Optional[str]): 디스크 계층 저장 디렉토리. 없으면 메모리 계층만 사용
+            model_name (str): 임베딩 모델 이름 (키에 포함)
+            dimension (int): 벡터의 차원 수 (기본값: 768)
+            max_memory_entries (int): 메모리 계층 최대 항목 수 (기본값: 4096)
+            max_disk_entries (int): 디스크 계층 최대 항목 수. 넘으면 오래된 절반을 정리 (기본값: 100000)
+            dtype (str): 디스크 계층 저장 형식, 'float16' 또는 'float32' (기본값: 'float16')
+        """
+        self.model_name = model_name
+        self.dimension = dimension
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.dtype = np.dtype(dtype)
+        self.row_bytes = self.dtype.itemsize * dimension
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory = OrderedDict()
+        self._disk_rows: Dict[str, int] = {}
+        self._data_file = None
+        self._keys_file = None
+        self._lock = threading.Lock()
+
+        self.data_path = None
+        self.keys_path = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.data_path = os.path.join(cache_dir, f"embeddings_{self.dtype.name}_{dimension}.bin")
+            self.keys_path = os.path.join(cache_dir, f"keys_{self.dtype.name}_{dimension}.txt")
+            self._open_disk_tier()
+
+    def make_key(self, text: str) -> str:
+        """
+        모델 이름과 텍스트로 캐시 키를 만듭니다.
+        """
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        캐시된 임베딩을 (1, dimension) float32 형태로 조회합니다.
+
+        Args:
+            text (str): 임베딩한 텍스트
+
+        Returns:
+            Optional[np.ndarray]: 캐시된 벡터. 없으면 None
+        """
+        key = self.make_key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector.copy()
+
+            row = self._disk_rows.get(key)
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._data_file.seek(row * self.row_bytes)
+            vector = np.frombuffer(self._data_file.read(self.row_bytes), dtype=self.dtype)
+            vector = vector.astype('float32').reshape(1, -1)
+            self._remember(key, vector)
+            self.disk_hits += 1
+            return vector.copy()
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        """
+        임베딩을 메모리 계층과 디스크 계층에 저장합니다.
+
+        Args:
+            text (str): 임베딩한 텍스트
+            vector (np.ndarray): (1, dimension) 또는 (dimension,) 형태의 벡터
+        """
+        key = self.make_key(text)
+        vector = np.asarray(vector, dtype='float32').reshape(1, -1)
+        with self._lock:
+            self._remember(key, vector.copy())
+            if self._data_file is None or key in self._disk_rows:
+                return
+            try:
+                if len(self._disk_rows) >= self.max_disk_entries:
+                    self._compact()
+                self._data_file.seek(0, os.SEEK_END)
+                self._data_file.write(vector.astype(self.dtype).tobytes())
+                self._data_file.flush()
+                self._keys_file.write(f"{key}\n")
+                self._keys_file.flush()
+                self._disk_rows[key] = len(self._disk_rows)
+            except Exception as e:
+                logger.error(f"임베딩 캐시 디스크 기록 중 오류 발생: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 적중/미스 통계를 반환합니다.
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_rows)
+            }
+
+    def close(self) -> None:
+        """
+        디스크 계층 파일을 닫습니다.
+        """
+        with self._lock:
+            for f in (self._data_file, self._keys_file):
+                if f is not None:
+                    f.close()
+            self._data_file = None
+            self._keys_file = None
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """
+        메모리 계층에 벡터를 넣고 용량을 넘으면 가장 오래 사용하지 않은 항목을 제거합니다.
+        """
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _open_disk_tier(self) -> None:
+        """
+        디스크 계층을 열고 키 목록을 읽습니다. 기록 도중 끊긴 행이나 키는 잘라냅니다.
+        """
+        lines = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        keys = [line.rstrip("\n") for line in lines if line.endswith("\n")]
+        data_size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+
+        # 두 파일 중 짧은 쪽에 맞춰 정리
+        rows = min(len(keys), data_size // self.row_bytes)
+        if data_size != rows * self.row_bytes:
+            with open(self.data_path, 'r+b') as f:
+                f.truncate(rows * self.row_bytes)
+        if len(lines) != rows:
+            with open(self.keys_path, 'w', encoding='utf-8') as f:
+                f.writelines(f"{key}\n" for key in keys[:rows])
+        self._disk_rows = {key: row for row, key in enumerate(keys[:rows])}
+
+        self._data_file = open(self.data_path, 'r+b' if os.path.exists(self.data_path) else 'w+b')
+        self._keys_file = open(self.keys_path, 'a', encoding='utf-8')
+        if rows:
+            logger.info(f"임베딩 캐시를 불러왔습니다: {self.data_path} ({rows}개)")
+
+    def _compact(self) -> None:
+        """
+        디스크 계층이 가득 차면 최근에 추가된 절반만 남기고 다시 씁니다.
+        """
+        keep = self.max_disk_entries // 2
+        ordered = sorted(self._disk_rows.items(), key=lambda item: item[1])[-keep:] if keep else []
+
+        self._data_file.seek(0)
+        data = self._data_file.read()
+        self._data_file.close()
+        self._keys_file.close()
+
+        tmp_data_path = f"{self.data_path}.tmp"
+        with open(tmp_data_path, 'wb') as f:
+            for _, row in ordered:
+                f.write(data[row * self.row_bytes:(row + 1) * self.row_bytes])
+        tmp_keys_path = f"{self.keys_path}.tmp"
+        with open(tmp_keys_path, 'w', encoding='utf-8') as f:
+            f.writelines(f"{key}\n" for key, _ in ordered)
+        os.replace(tmp_data_path, self.data_path)
+        os.replace(tmp_keys_path, self.keys_path)
+
+        self._disk_rows = {key: row for row, (key, _) in enumerate(ordered)}
+        self._data_file = open(self.data_path, 'r+b')
+        self._keys_file = open(self.keys_path, 'a', encoding='utf-8')
+        logger.info(f"임베딩 캐시 디스크 계층을 {len(self._disk_rows)}개로 정리했습니다: {self.data_path}")
@@ -0,0 +1,171 @@
+import logging
+import os
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStore:
+    """
+    FAISS 인덱스와 별도로 원본 임베딩을 보관하는 메모리 매핑(.npy) 저장소입니다.
+
+    embeddings.npy에는 (capacity, dimension) float32 행렬이, embedding_ids.npy에는
+    각 행의 파일 ID가 저장됩니다. 유효한 행은 항상 앞쪽 [0, count) 구간에 모여 있으며
+    빈 행의 ID는 -1입니다. 인덱스 재구성이나 인덱스 타입 변경 시 모델을 다시 실행하지 않고
+    이 배열만으로 처리할 수 있습니다.
+    """
+
+    def __init__(self, storage_dir: str, dimension: int, initial_capacity: int = 1024):
+        """
+        Args:
+            storage_dir (str): 저장 디렉토리
+            dimension (int): 벡터의 차원 수
+            initial_capacity (int): 새로 만들 때의 초기 행 수 (기본값: 1024)
+        """
+        self.dimension = dimension
+        self.vectors_path = os.path.join(storage_dir, "embeddings.npy")
+        self.ids_path = os.path.join(storage_dir, "embedding_ids.npy")
+
+        if os.path.exists(self.vectors_path) and os.path.exists(self.ids_path):
+            self._vectors = np.lib.format.open_memmap(self.vectors_path, mode='r+')
+            self._ids = np.lib.format.open_memmap(self.ids_path, mode='r+')
+            if self._vectors.shape[1] != dimension or len(self._ids) != len(self._vectors):
+                raise ValueError(f"임베딩 저장소의 형태가 올바르지 않습니다: {self.vectors_path}")
+            empty = np.flatnonzero(self._ids == -1)
+            self.count = int(empty[0]) if len(empty) else len(self._ids)
+        else:
+            self._vectors = np.lib.format.open_memmap(
+                self.vectors_path, mode='w+', dtype='float32', shape=(initial_capacity, dimension))
+            self._ids = np.lib.format.open_memmap(
+                self.ids_path, mode='w+', dtype='int64', shape=(initial_capacity,))
+            self._ids[:] = -1
+            self.count = 0
+
+        self._rows: Dict[int, int] = {int(id): row for row, id in enumerate(self._ids[:self.count])}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, id: int) -> bool:
+        return int(id) in self._rows
+
+    @property
+    def capacity(self) -> int:
+        return len(self._ids)
+
+    def ids(self) -> np.ndarray:
+        """
+        저장된 파일 ID 배열(메모리 매핑 뷰)을 반환합니다.
+        """
+        return self._ids[:self.count]
+
+    def vectors(self) -> np.ndarray:
+        """
+        저장된 임베딩 행렬(메모리 매핑 뷰)을 반환합니다. ids()와 같은 순서입니다.
+        """
+        return self._vectors[:self.count]
+
+    def get(self, id: int) -> np.ndarray:
+        """
+        파일 ID의 임베딩을 (1, dimension) 형태로 반환합니다.
+
+        Args:
+            id (int): 파일 ID
+
+        Returns:
+            np.ndarray: 임베딩 사본
+        """
+        row = self._rows.get(int(id))
+        if row is None:
+            raise KeyError(f"ID {id}에 해당하는 임베딩이 존재하지 않습니다.")
+        return np.array(self._vectors[row], dtype='float32').reshape(1, -1)
+
+    def take(self, ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        여러 파일 ID의 임베딩을 한 번에 가져옵니다. 저장되지 않은 ID는 건너뜁니다.
+
+        Args:
+            ids (Iterable[int]): 파일 ID들
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 찾은 ID의 int64 배열과 같은 순서의 (n, dimension) 임베딩 사본
+        """
+        found = [(id, self._rows[id]) for id in map(int, ids) if id in self._rows]
+        found_ids = np.array([id for id, _ in found], dtype='int64')
+        rows = np.array([row for _, row in found], dtype='int64')
+        return found_ids, np.asarray(self._vectors[rows], dtype='float32')
+
+    def put(self, id: int, vector: np.ndarray) -> None:
+        """
+        임베딩을 저장합니다. 같은 ID가 있으면 해당 행을 덮어씁니다.
+
+        Args:
+            id (int): 파일 ID
+            vector (np.ndarray): (1, dimension) 또는 (dimension,) 형태의 벡터
+        """
+        id = int(id)
+        row = self._rows.get(id)
+        if row is None:
+            if self.count == self.capacity:
+                self._grow()
+            row = self.count
+            self.count += 1
+            self._ids[row] = id
+            self._rows[id] = row
+        self._vectors[row] = np.asarray(vector, dtype='float32').reshape(-1)
+
+    def remove(self, id: int) -> bool:
+        """
+        임베딩을 삭제합니다. 마지막 행을 빈 자리로 옮겨 O(1)에 처리합니다.
+
+        Args:
+            id (int): 파일 ID
+
+        Returns:
+            bool: 삭제된 항목이 있었으면 True
+        """
+        row = self._rows.pop(int(id), None)
+        if row is None:
+            return False
+
+        last = self.count - 1
+        if row != last:
+            moved_id = int(self._ids[last])
+            self._vectors[row] = self._vectors[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+        self._ids[last] = -1
+        self.count = last
+        return True
+
+    def flush(self) -> None:
+        """
+        메모리 매핑된 변경 내용을 디스크에 기록합니다.
+        """
+        self._vectors.flush()
+        self._ids.flush()
+
+    def _grow(self) -> None:
+        """
+        저장 공간을 두 배로 늘립니다. 새 파일에 복사한 뒤 기존 파일을 교체합니다.
+        """
+        new_capacity = max(1, self.capacity * 2)
+        for attr, path, dtype, shape, fill in (
+            ('_vectors', self.vectors_path, 'float32', (new_capacity, self.dimension), 0),
+            ('_ids', self.ids_path, 'int64', (new_capacity,), -1),
+        ):
+            old = getattr(self, attr)
+            tmp_path = f"{path}.tmp"
+            new = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=shape)
+            new[:self.count] = old[:self.count]
+            new[self.count:] = fill
+            new.flush()
+            # 교체 전에 기존/임시 매핑을 해제 (Windows에서는 열린 파일을 교체할 수 없음)
+            del new
+            setattr(self, attr, None)
+            del old
+            os.replace(tmp_path, path)
+            setattr(self, attr, np.lib.format.open_memmap(path, mode='r+'))
+        logger.info(f"임베딩 저장소 용량을 {new_capacity}로 늘렸습니다: {self.vectors_path}")
@@ -0,0 +1,275 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set
+
+# 지원하는 축출 정책
+EVICTION_POLICIES = ("lru", "ttl")
+
+
+def entry_bytes(entry: Dict[str, Any]) -> int:
+    """
+    저장 항목이 차지하는 대략적인 크기(텍스트, 제목, 컨텍스트의 UTF-8 바이트 수)를 계산합니다.
+    블롭 저장소로 옮긴 컨텍스트도 원래 크기로 계산합니다.
+    """
+    context = entry.get("metadata", {}).get("context") or ""
+    size = sum(len(str(value).encode('utf-8')) for value in (entry.get("text", ""), entry.get("title", ""), context))
+    blob = entry.get("context_blob")
+    if blob:
+        size += blob["bytes"] * (2 if blob.get("in_text") else 1)
+    return size
+
+
+class EvictionPolicy:
+    """
+    VectorDatabase가 최대 저장 개수나 바이트 한도를 넘을 때 삭제할 항목을 고르는 정책의 기본 클래스입니다.
+    항목별 크기를 추적해 max_bytes(컨텍스트 총량 한도)를 함께 적용합니다.
+    모든 메서드는 내부 잠금으로 보호되므로 읽기 잠금만 잡은 검색 중에도 touch를 호출할 수 있습니다.
+    """
+
+    name = ""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """
+        Args:
+            max_bytes (Optional[int]): 저장 항목 총 바이트 한도. None이면 개수 한도만 적용
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        새로 저장되거나 교체된 항목을 등록합니다.
+        """
+        self._add(key, entry_bytes(entry), entry.get("stored_at") or 0.0)
+
+    def _add(self, key: str, size: int, stored_at: float) -> None:
+        with self._lock:
+            self.total_bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            self._on_add(key, stored_at)
+
+    def remove(self, key: str) -> None:
+        """
+        삭제된 항목을 제거합니다.
+        """
+        with self._lock:
+            self.total_bytes -= self._sizes.pop(key, 0)
+            self._on_remove(key)
+
+    def touch(self, key: str) -> None:
+        """
+        조회되거나 검색 결과에 포함된 항목을 최근 사용으로 표시합니다.
+        """
+        with self._lock:
+            if key in self._sizes:
+                self._on_touch(key)
+
+    def size_of(self, key: str) -> int:
+        return self._sizes.get(key, 0)
+
+    def needs_room(self, count: int, max_count: int, extra_bytes: int = 0) -> bool:
+        """
+        count개를 저장하고 extra_bytes만큼 늘어날 때 한도를 넘는지 확인합니다.
+        """
+        if count > max_count:
+            return True
+        return self.max_bytes is not None and self.total_bytes + extra_bytes > self.max_bytes
+
+    def rebuild(self, metadata_store: Dict[str, Dict[str, Any]]) -> None:
+        """
+        메타데이터 저장소 전체로 정책 상태를 다시 만듭니다. 저장 시각이 없는 기존 항목은
+        저장소의 순서대로 가장 오래된 항목으로 취급합니다.
+        """
+        with self._lock:
+            self.total_bytes = 0
+            self._sizes = {}
+            self._reset()
+        # 항목 전체가 아니라 (저장 시각, 키, 크기)만 모아 정렬
+        ordered = sorted((entry.get("stored_at") or 0.0, position, key, entry_bytes(entry))
+                         for position, (key, entry) in enumerate(metadata_store.items()))
+        for stored_at, _, key, size in ordered:
+            self._add(key, size, stored_at)
+
+    def victim(self, exclude: Optional[Set[str]] = None) -> Optional[str]:
+        """
+        삭제할 항목의 키를 고릅니다.
+
+        Args:
+            exclude (Optional[Set[str]]): 삭제 대상에서 제외할 키
+
+        Returns:
+            Optional[str]: 삭제할 키. 후보가 없으면 None
+        """
+        with self._lock:
+            return self._victim(exclude or set())
+
+    def expired(self, now: Optional[float] = None) -> List[str]:
+        """
+        유효 기간이 지난 항목의 키를 반환합니다. 기본 정책은 만료가 없습니다.
+        """
+        return []
+
+    def state(self) -> Dict[str, Any]:
+        """
+        메타데이터만으로 복원할 수 없는 정책 상태(접근 순서 등)를 체크포인트에 저장할 형태로 반환합니다.
+        """
+        return {}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """
+        state()로 저장한 상태를 rebuild 이후에 적용합니다.
+        """
+
+    def _reset(self) -> None:
+        raise NotImplementedError
+
+    def _on_add(self, key: str, stored_at: float) -> None:
+        raise NotImplementedError
+
+    def _on_remove(self, key: str) -> None:
+        raise NotImplementedError
+
+    def _on_touch(self, key: str) -> None:
+        pass
+
+    def _victim(self, exclude: Set[str]) -> Optional[str]:
+        raise NotImplementedError
+
+
+class LRUEvictionPolicy(EvictionPolicy):
+    """
+    마지막으로 저장/조회/검색된 시점이 가장 오래된 항목부터 삭제합니다.
+    접근 순서를 OrderedDict로 유지하므로 갱신과 삭제 대상 선택이 O(1)입니다.
+    """
+
+    name = "lru"
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        super().__init__(max_bytes)
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def _reset(self) -> None:
+        self._order = OrderedDict()
+
+    def _on_add(self, key: str, stored_at: float) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def _on_remove(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def _on_touch(self, key: str) -> None:
+        self._order.move_to_end(key)
+
+    def _victim(self, exclude: Set[str]) -> Optional[str]:
+        for key in self._order:
+            if key not in exclude:
+                return key
+        return None
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"order": list(self._order)}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            for key in state.get("order", []):
+                if key in self._order:
+                    self._order.move_to_end(key)
+
+
+class TTLEvictionPolicy(EvictionPolicy):
+    """
+    저장된 지 ttl_seconds가 지난 항목을 만료시키고, 한도를 넘으면 가장 먼저 저장된 항목부터 삭제합니다.
+    저장 시각의 최소 힙을 사용하며 교체/삭제된 항목은 꺼낼 때 건너뜁니다(지연 삭제).
+    """
+
+    name = "ttl"
+
+    def __init__(self, ttl_seconds: float = 7 * 24 * 3600, max_bytes: Optional[int] = None):
+        """
+        Args:
+            ttl_seconds (float): 항목의 유효 기간(초) (기본값: 7일)
+            max_bytes (Optional[int]): 저장 항목 총 바이트 한도
+        """
+        super().__init__(max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self._heap: List[tuple] = []
+        self._stored_at: Dict[str, float] = {}
+
+    def _reset(self) -> None:
+        self._heap = []
+        self._stored_at = {}
+
+    def _on_add(self, key: str, stored_at: float) -> None:
+        # 저장 시각이 없는 기존 항목은 로드 시점부터 유효 기간을 계산
+        stored_at = stored_at or time.time()
+        self._stored_at[key] = stored_at
+        heapq.heappush(self._heap, (stored_at, key))
+        # 교체/삭제로 남은 항목이 많아지면 힙을 다시 구성
+        if len(self._heap) > 2 * len(self._stored_at) + 64:
+            self._heap = [(value, key) for key, value in self._stored_at.items()]
+            heapq.heapify(self._heap)
+
+    def _on_remove(self, key: str) -> None:
+        self._stored_at.pop(key, None)
+
+    def _pop_stale(self) -> None:
+        """
+        힙 맨 앞의 교체/삭제된 항목을 제거합니다.
+        """
+        while self._heap and self._stored_at.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _victim(self, exclude: Set[str]) -> Optional[str]:
+        skipped = []
+        victim = None
+        while True:
+            self._pop_stale()
+            if not self._heap:
+                break
+            item = heapq.heappop(self._heap)
+            skipped.append(item)
+            if item[1] not in exclude:
+                victim = item[1]
+                break
+        for item in skipped:
+            heapq.heappush(self._heap, item)
+        return victim
+
+    def expired(self, now: Optional[float] = None) -> List[str]:
+        deadline = (now if now is not None else time.time()) - self.ttl_seconds
+        with self._lock:
+            # 힙을 루트부터 따라가며 기한이 지난 항목만 방문 (만료 항목 수에 비례하는 비용)
+            keys = []
+            frontier = [(self._heap[0], 0)] if self._heap else []
+            while frontier:
+                (stored_at, key), position = heapq.heappop(frontier)
+                if stored_at > deadline:
+                    continue
+                if self._stored_at.get(key) == stored_at:
+                    keys.append(key)
+                for child in (2 * position + 1, 2 * position + 2):
+                    if child < len(self._heap):
+                        heapq.heappush(frontier, (self._heap[child], child))
+            return keys
+
+
+def make_eviction_policy(value: Any = None) -> EvictionPolicy:
+    """
+    EvictionPolicy, 정책 이름("lru", "ttl"), 또는 {"policy": ..., "max_bytes": ..., "ttl_seconds": ...}
+    딕셔너리로 축출 정책을 만듭니다. 없으면 LRU입니다.
+    """
+    if isinstance(value, EvictionPolicy):
+        return value
+    params = {"policy": value} if value is None or isinstance(value, str) else dict(value)
+    policy = (params.pop("policy", None) or "lru").lower()
+    if policy == "lru":
+        return LRUEvictionPolicy(**params)
+    if policy == "ttl":
+        return TTLEvictionPolicy(**params)
+    raise ValueError(f"지원하지 않는 축출 정책입니다: {policy} (지원: {', '.join(EVICTION_POLICIES)})")
@@ -0,0 +1,185 @@
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 인덱스 타입별 기본 파라미터
+DEFAULT_INDEX_PARAMS: Dict[str, Dict[str, Any]] = {
+    "flat": {},
+    "ivf": {"nlist": 100, "nprobe": 10, "min_train_size": None, "rerank": 0},
+    "hnsw": {"M": 32, "efConstruction": 40, "efSearch": 64, "min_train_size": 10000, "rerank": 0},
+    "fp16": {"min_train_size": 0, "rerank": 0},
+    "sq8": {"min_train_size": 1000, "rerank": 2},
+    "pq": {"m": 96, "nbits": 8, "min_train_size": None, "rerank": 4},
+}
+
+# 스칼라 양자화 인덱스 타입별 FAISS 양자화 방식
+_SCALAR_QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "sq8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+class IndexConfig:
+    """
+    파일 타입별 VectorDatabase가 사용할 FAISS 인덱스 타입과 파라미터입니다.
+
+    - flat: IndexFlatL2 전수 검색 (기본값)
+    - ivf: IndexIVFFlat. nlist개 클러스터로 학습하고 nprobe개 클러스터만 검색
+    - hnsw: IndexHNSWFlat 그래프 검색. M, efConstruction, efSearch로 조정
+    - fp16: 벡터를 float16으로 저장하는 전수 검색 (메모리 1/2)
+    - sq8: 차원별 8비트 스칼라 양자화 전수 검색 (메모리 1/4)
+    - pq: m개 부분 벡터를 nbits비트 코드로 저장하는 곱 양자화 (기본값 m=96: 메모리 1/32)
+
+    저장된 벡터 수가 min_train_size보다 적으면 flat 인덱스를 사용하고,
+    그 이상이 되면 저장된 임베딩으로 설정된 인덱스를 학습해 교체합니다.
+
+    rerank가 0보다 크면 인덱스에서 k * rerank개의 후보를 찾은 뒤 임베딩 저장소의 원본 벡터로
+    거리를 다시 계산해 상위 k개를 고릅니다. 원본 벡터는 메모리 매핑 파일이므로 후보 행만 읽습니다.
+    """
+
+    def __init__(self, index_type: str = "flat", **params: Any):
+        """
+        Args:
+            index_type (str): 인덱스 타입 (flat, ivf, hnsw, fp16, sq8, pq)
+            **params: 인덱스 파라미터 (nlist, nprobe, M, efConstruction, efSearch, m, nbits, min_train_size, rerank)
+        """
+        index_type = index_type.lower()
+        if index_type not in DEFAULT_INDEX_PARAMS:
+            raise ValueError(f"지원하지 않는 인덱스 타입입니다: {index_type}")
+
+        unknown = set(params) - set(DEFAULT_INDEX_PARAMS[index_type])
+        if unknown:
+            raise ValueError(f"{index_type} 인덱스에 사용할 수 없는 파라미터입니다: {sorted(unknown)}")
+
+        self.index_type = index_type
+        self.params = {**DEFAULT_INDEX_PARAMS[index_type], **params}
+
+    @classmethod
+    def from_value(cls, value: Any) -> "IndexConfig":
+        """
+        IndexConfig, 인덱스 타입 문자열, 또는 {"index_type": ..., 파라미터...} 딕셔너리로 설정을 만듭니다.
+        """
+        if value is None:
+            return cls()
+        if isinstance(value, IndexConfig):
+            return value
+        if isinstance(value, str):
+            return cls(value)
+        params = dict(value)
+        return cls(params.pop("index_type", "flat"), **params)
+
+    @property
+    def min_train_size(self) -> int:
+        """
+        설정된 인덱스로 전환할 최소 벡터 수. IVF는 클러스터당, PQ는 부분 양자화기의 중심점당
+        약 39개의 학습 벡터가 필요합니다.
+        """
+        if self.index_type == "flat":
+            return 0
+        if self.params.get("min_train_size") is not None:
+            return self.params["min_train_size"]
+        if self.index_type == "pq":
+            return 2 ** self.params["nbits"] * 39
+        return self.params["nlist"] * 39
+
+    def kind_for(self, count: int) -> str:
+        """
+        벡터 수에 맞는 실제 인덱스 타입을 반환합니다. 학습에 필요한 수보다 적으면 flat입니다.
+        """
+        if self.index_type != "flat" and count >= self.min_train_size:
+            return self.index_type
+        return "flat"
+
+    @staticmethod
+    def supports_remove(kind: str) -> bool:
+        """
+        인덱스에서 벡터를 직접 제거할 수 있는지 여부. HNSW는 제거를 지원하지 않습니다.
+        """
+        return kind != "hnsw"
+
+    @staticmethod
+    def supports_selector(kind: str) -> bool:
+        """
+        검색 파라미터의 ID 선택자로 검색 대상을 제한할 수 있는지 여부. PQ 인덱스는 지원하지 않습니다.
+        """
+        return kind != "pq"
+
+    def rerank_factor(self, kind: str) -> int:
+        """
+        실제 인덱스 타입에 적용할 재순위 배수. flat 인덱스는 이미 정확하므로 0입니다.
+        """
+        if kind == "flat" or kind != self.index_type:
+            return 0
+        return int(self.params.get("rerank") or 0)
+
+    def build(self, dimension: int, vectors: Optional[np.ndarray] = None,
+              ids: Optional[np.ndarray] = None) -> Tuple[faiss.Index, str]:
+        """
+        벡터 수에 맞는 인덱스를 만들고 필요하면 학습한 뒤 벡터를 추가합니다.
+
+        Args:
+            dimension (int): 벡터의 차원 수
+            vectors (Optional[np.ndarray]): 추가할 (n, dimension) 벡터
+            ids (Optional[np.ndarray]): vectors와 같은 순서의 int64 ID
+
+        Returns:
+            Tuple[faiss.Index, str]: 생성된 인덱스와 실제 인덱스 타입
+        """
+        count = 0 if vectors is None else len(vectors)
+        kind = self.kind_for(count)
+
+        if kind == "ivf":
+            quantizer = faiss.IndexFlatL2(dimension)
+            index = faiss.IndexIVFFlat(quantizer, dimension, self.params["nlist"])
+            index.train(vectors)
+        elif kind == "hnsw":
+            hnsw = faiss.IndexHNSWFlat(dimension, self.params["M"])
+            hnsw.hnsw.efConstruction = self.params["efConstruction"]
+            index = faiss.IndexIDMap2(hnsw)
+        elif kind in _SCALAR_QUANTIZERS:
+            quantized = faiss.IndexScalarQuantizer(dimension, _SCALAR_QUANTIZERS[kind])
+            if count:
+                quantized.train(vectors)
+            index = faiss.IndexIDMap2(quantized)
+        elif kind == "pq":
+            if dimension % self.params["m"]:
+                raise ValueError(f"벡터 차원({dimension})이 PQ 부분 벡터 수 m({self.params['m']})으로 나누어떨어지지 않습니다.")
+            quantized = faiss.IndexPQ(dimension, self.params["m"], self.params["nbits"])
+            quantized.train(vectors)
+            index = faiss.IndexIDMap2(quantized)
+        else:
+            index = faiss.IndexIDMap2(faiss.IndexFlatL2(dimension))
+
+        self.configure(index, kind)
+        if count:
+            index.add_with_ids(vectors, ids)
+        if kind != "flat":
+            logger.info(f"{kind} 인덱스를 {count}개의 벡터로 구성했습니다. 파라미터: {self.params}")
+        return index, kind
+
+    def configure(self, index: faiss.Index, kind: str) -> None:
+        """
+        검색 파라미터(nprobe, efSearch)를 인덱스에 적용합니다. 로드한 인덱스에도 사용합니다.
+        """
+        if kind == "ivf" and self.index_type == "ivf":
+            faiss.extract_index_ivf(index).nprobe = self.params["nprobe"]
+        elif kind == "hnsw" and self.index_type == "hnsw":
+            faiss.downcast_index(index.index).hnsw.efSearch = self.params["efSearch"]
+
+    def search_parameters(self, kind: str, selector: faiss.IDSelector) -> faiss.SearchParameters:
+        """
+        ID 선택자로 검색 대상을 제한하는 검색 파라미터를 만듭니다. 설정된 nprobe/efSearch를 함께 적용합니다.
+        (검색 파라미터를 넘기면 인덱스에 설정된 값 대신 파라미터의 값이 사용됨)
+        """
+        if kind == "ivf":
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self.params.get("nprobe", 1))
+        if kind == "hnsw":
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.params.get("efSearch", 16))
+        return faiss.SearchParameters(sel=selector)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"index_type": self.index_type, **self.params}
@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 메타데이터 저장 방식
+# - sqlite: 항목별로 읽고 쓰는 SQLite 파일 (체크포인트 시 변경된 항목만 커밋)
+# - json: 전체를 메모리에 읽고 체크포인트마다 metadata.json 전체를 다시 쓰는 기존 방식
+METADATA_BACKENDS = ("sqlite", "json")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    text TEXT NOT NULL,
+    text_has_context INTEGER NOT NULL,
+    metadata TEXT NOT NULL,
+    context TEXT,
+    stored_at REAL,
+    extra TEXT
+) WITHOUT ROWID
+"""
+
+_COLUMNS = "id, title, text, text_has_context, metadata, context, stored_at, extra"
+
+# 전용 열에 저장하는 항목 필드 (나머지 필드는 extra 열에 JSON으로 저장)
+_ENTRY_FIELDS = ("text", "title", "metadata", "stored_at")
+
+
+class SQLiteMetadataStore(MutableMapping):
+    """
+    VectorDatabase의 metadata_store를 SQLite 파일로 보관하는 매핑입니다. 파일 ID(문자열)로 항목을 조회/저장하며
+    항목은 {"text", "title", "metadata", "stored_at"} 딕셔너리로 반환합니다.
+
+    컨텍스트는 한 번만 저장합니다. text가 "{타입} {컨텍스트}" 형태이면 컨텍스트를 뺀 앞부분만 저장하고
+    조회할 때 다시 붙입니다. 변경은 commit()을 호출할 때(체크포인트) 한 트랜잭션으로 기록되며,
+    그 사이의 변경은 VectorDatabase의 WAL이 보호합니다.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): SQLite 파일 경로. 없으면 새로 생성
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # 커밋 후 VectorDatabase의 WAL을 비우므로 커밋은 디스크 동기화까지 완료되어야 함
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        if "extra" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN extra TEXT")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @classmethod
+    def open(cls, path: str, legacy_json_path: Optional[str] = None) -> "SQLiteMetadataStore":
+        """
+        저장소를 엽니다. SQLite 파일이 없고 기존 metadata.json이 있으면 먼저 옮겨 담습니다.
+        임시 파일에 모두 기록한 뒤 rename으로 교체하므로 옮기는 도중 중단되어도 metadata.json은 그대로 남습니다.
+
+        Args:
+            path (str): SQLite 파일 경로
+            legacy_json_path (Optional[str]): 옮겨 담을 metadata.json 경로
+
+        Returns:
+            SQLiteMetadataStore: 열린 저장소
+        """
+        if legacy_json_path and os.path.exists(legacy_json_path):
+            if not os.path.exists(path):
+                with open(legacy_json_path, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                tmp_path = f"{path}.tmp"
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                conn = sqlite3.connect(tmp_path)
+                conn.execute(_SCHEMA)
+                conn.executemany(f"INSERT INTO entries ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 (cls._encode(key, entry) for key, entry in metadata.items()))
+                conn.commit()
+                conn.close()
+                os.replace(tmp_path, path)
+                logger.info(f"metadata.json의 {len(metadata)}개 항목을 SQLite로 옮겼습니다: {path}")
+            os.remove(legacy_json_path)
+        return cls(path)
+
+    @staticmethod
+    def _encode(key: str, entry: Dict[str, Any]) -> Tuple[Any, ...]:
+        """
+        항목을 테이블 행으로 변환합니다. 컨텍스트는 context 열에만 저장합니다.
+        """
+        metadata = dict(entry.get("metadata", {}))
+        context = metadata.pop("context") if isinstance(metadata.get("context"), str) else None
+        text = entry.get("text", "")
+        text_has_context = bool(context) and text.endswith(context)
+        if text_has_context:
+            text = text[:-len(context)]
+        extra = {field: value for field, value in entry.items() if field not in _ENTRY_FIELDS}
+        return (key, entry.get("title", ""), text, int(text_has_context),
+                json.dumps(metadata, ensure_ascii=False, separators=(',', ':')), context, entry.get("stored_at"),
+                json.dumps(extra, ensure_ascii=False, separators=(',', ':')) if extra else None)
+
+    @staticmethod
+    def _decode(row: Tuple[Any, ...]) -> Tuple[str, Dict[str, Any]]:
+        """
+        테이블 행을 (키, 항목)으로 변환합니다.
+        """
+        key, title, text, text_has_context, metadata_json, context, stored_at, extra = row
+        metadata = json.loads(metadata_json)
+        if context is not None:
+            metadata["context"] = context
+            if text_has_context:
+                text += context
+        entry = {"text": text, "title": title, "metadata": metadata, "stored_at": stored_at}
+        if extra:
+            entry.update(json.loads(extra))
+        return key, entry
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM entries WHERE id = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._decode(row)[1]
+
+    def __setitem__(self, key: str, entry: Dict[str, Any]) -> None:
+        row = self._encode(key, entry)
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM entries WHERE id = ?", (key,)).fetchone() is not None
+            self._conn.execute(f"INSERT OR REPLACE INTO entries ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+            if not exists:
+                self._count += 1
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            if self._conn.execute("DELETE FROM entries WHERE id = ?", (key,)).rowcount == 0:
+                raise KeyError(key)
+            self._count -= 1
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM entries WHERE id = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        # 순회 중 변경되어도 안전하도록 키 목록을 먼저 읽음
+        with self._lock:
+            keys = [row[0] for row in self._conn.execute("SELECT id FROM entries")]
+        return iter(keys)
+
+    def items(self, batch_size: int = 512) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        모든 (키, 항목)을 batch_size개씩 읽으며 반환합니다. 전체를 한꺼번에 메모리로 읽지 않습니다.
+        """
+        last_key = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM entries WHERE id > ? ORDER BY id LIMIT ?", (last_key, batch_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._decode(row)
+            last_key = rows[-1][0]
+
+    def values(self) -> Iterator[Dict[str, Any]]:
+        return (entry for _, entry in self.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._count = 0
+
+    def commit(self) -> None:
+        """
+        마지막 커밋 이후의 변경을 디스크에 기록합니다.
+        """
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        """
+        변경을 커밋하고 연결을 닫습니다.
+        """
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
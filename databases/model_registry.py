@@ -0,0 +1,67 @@
+import logging
+import os
+import threading
+from typing import Any, Dict
+
+from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+# 한국어 텍스트에 최적화된 임베딩 모델
+EMBEDDING_MODEL_NAME = 'jhgan/ko-sroberta-multitask'
+
+# 프로세스 전체에서 공유하는 모델과 클라이언트
+_embedding_models: Dict[str, Any] = {}
+_openai_client = None
+_lock = threading.Lock()
+
+
+def get_embedding_model(name: str = EMBEDDING_MODEL_NAME) -> Any:
+    """
+    이름에 해당하는 임베딩 모델을 반환합니다. 처음 요청될 때 한 번만 로드합니다.
+
+    Args:
+        name (str): SentenceTransformer 모델 이름 (기본값: EMBEDDING_MODEL_NAME)
+
+    Returns:
+        Any: encode 메서드를 가진 임베딩 모델
+    """
+    model = _embedding_models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        if name not in _embedding_models:
+            from sentence_transformers import SentenceTransformer
+            logger.info(f"임베딩 모델을 로드합니다: {name}")
+            _embedding_models[name] = SentenceTransformer(name)
+        return _embedding_models[name]
+
+
+def register_embedding_model(name: str, model: Any) -> None:
+    """
+    이미 만들어진 임베딩 모델을 등록합니다. 같은 이름의 모델이 있으면 교체합니다.
+
+    Args:
+        name (str): 모델 이름
+        model (Any): encode 메서드를 가진 임베딩 모델
+    """
+    with _lock:
+        _embedding_models[name] = model
+
+
+def get_openai_client() -> OpenAI:
+    """
+    프로세스 전체에서 공유하는 OpenAI 클라이언트를 반환합니다.
+
+    Returns:
+        OpenAI: OpenAI 클라이언트
+    """
+    global _openai_client
+    if _openai_client is not None:
+        return _openai_client
+
+    with _lock:
+        if _openai_client is None:
+            _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return _openai_client
@@ -0,0 +1,211 @@
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from databases.metadata_store import SQLiteMetadataStore
+
+logger = logging.getLogger(__name__)
+
+# SimHash 지문 비트 수
+SIMHASH_BITS = 64
+
+
+def simhash(text: str, shingle_size: int = 3) -> Optional[int]:
+    """
+    텍스트의 64비트 SimHash 지문을 계산합니다. 연속한 shingle_size개 단어를 하나의 특징으로 보고,
+    특징 해시의 각 비트를 출현 횟수로 가중 합산한 부호로 지문을 만듭니다.
+    내용이 비슷할수록 지문 사이의 해밍 거리가 작습니다.
+
+    Args:
+        text (str): 서식을 제거한 텍스트
+        shingle_size (int): 특징으로 사용할 연속 단어 수 (기본값: 3)
+
+    Returns:
+        Optional[int]: 지문. 단어가 없으면 None
+    """
+    tokens = text.split()
+    if not tokens:
+        return None
+    size = min(shingle_size, len(tokens))
+    shingles = [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+    hashes, counts = np.unique(
+        np.array([int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+                  for shingle in shingles], dtype=np.uint64),
+        return_counts=True)
+    # (특징 수, 64) 비트 행렬을 ±1로 바꿔 출현 횟수로 가중 합산
+    bits = np.unpackbits(hashes.astype('>u8').view(np.uint8).reshape(-1, 8), axis=1).astype(np.int64)
+    weights = counts @ (2 * bits - 1)
+    return int.from_bytes(np.packbits(weights > 0).tobytes(), 'big')
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateIndex:
+    """
+    파일 타입 하나의 거의 같은 문서를 찾고 대표 문서(canonical)에 연결된 사본(alias)을 관리합니다.
+
+    - 대표 문서의 SimHash 지문을 LSH 밴드 버킷에 넣어, 해밍 거리 max_distance 이하인 지문을
+      전체 비교 없이 찾습니다. (max_distance + 1개 밴드로 나누면 그 이하로 다른 두 지문은 적어도 한 밴드가 같음)
+    - 사본은 벡터 인덱스에 넣지 않고 aliases.db에 원래 컨텍스트와 함께 보관하므로,
+      대표 문서가 삭제되면 사본 하나를 새 대표 문서로 올릴 수 있습니다.
+    """
+
+    def __init__(self, alias_path: str, threshold: float = 0.95, min_tokens: int = 16):
+        """
+        Args:
+            alias_path (str): 사본 저장 SQLite 파일 경로
+            threshold (float): 같은 문서로 볼 지문 유사도 (1 - 해밍 거리 / 64) (기본값: 0.95)
+            min_tokens (int): 지문을 계산할 최소 단어 수. 짧은 문서는 지문이 불안정해 연결하지 않음 (기본값: 16)
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"유사도 기준은 0보다 크고 1 이하여야 합니다: {threshold}")
+        self.threshold = threshold
+        self.min_tokens = min_tokens
+        self.max_distance = int((1.0 - threshold) * SIMHASH_BITS + 1e-9)
+
+        # 밴드별 (시작 비트, 마스크)
+        bands = self.max_distance + 1
+        widths = [SIMHASH_BITS // bands + (1 if i < SIMHASH_BITS % bands else 0) for i in range(bands)]
+        self._bands: List[Tuple[int, int]] = []
+        offset = 0
+        for width in widths:
+            self._bands.append((offset, (1 << width) - 1))
+            offset += width
+
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+        self._fingerprints: Dict[str, int] = {}
+        self._aliases_of: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+
+        self.aliases = SQLiteMetadataStore(alias_path)
+        for key, entry in self.aliases.items():
+            self._aliases_of.setdefault(str(entry["metadata"]["canonicalId"]), set()).add(key)
+
+    def fingerprint(self, text: str) -> Optional[int]:
+        """
+        연결 판단에 사용할 지문을 계산합니다. 단어가 min_tokens개보다 적으면 None입니다.
+        """
+        if len(text.split()) < self.min_tokens:
+            return None
+        return simhash(text)
+
+    def _band_keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        return [(band, (fingerprint >> offset) & mask) for band, (offset, mask) in enumerate(self._bands)]
+
+    def rebuild(self, entries: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        벡터 DB의 (키, 항목)들로 대표 문서 지문 색인을 다시 만듭니다. 지문이 없는 항목은 건너뜁니다.
+        """
+        with self._lock:
+            self._buckets = {}
+            self._fingerprints = {}
+            for key, entry in entries:
+                value = entry.get("metadata", {}).get("simhash")
+                if value:
+                    self.add_canonical(key, int(value, 16))
+
+    def add_canonical(self, key: str, fingerprint: int) -> None:
+        with self._lock:
+            self.remove_canonical(key)
+            self._fingerprints[key] = fingerprint
+            for band_key in self._band_keys(fingerprint):
+                self._buckets.setdefault(band_key, set()).add(key)
+
+    def remove_canonical(self, key: str) -> None:
+        with self._lock:
+            fingerprint = self._fingerprints.pop(key, None)
+            if fingerprint is None:
+                return
+            for band_key in self._band_keys(fingerprint):
+                bucket = self._buckets.get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band_key]
+
+    def find_canonical(self, fingerprint: int, exists: Callable[[str], bool],
+                       exclude: Optional[str] = None) -> Optional[str]:
+        """
+        지문과 가장 가까운(해밍 거리 max_distance 이하) 대표 문서를 찾습니다.
+        벡터 DB에서 사라진(축출된) 대표 문서는 색인에서 제거합니다.
+
+        Args:
+            fingerprint (int): 찾을 지문
+            exists (Callable[[str], bool]): 대표 문서가 벡터 DB에 있는지 확인하는 함수
+            exclude (Optional[str]): 제외할 키 (자기 자신)
+
+        Returns:
+            Optional[str]: 대표 문서 키. 없으면 None
+        """
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(fingerprint):
+                candidates |= self._buckets.get(band_key, set())
+            candidates.discard(exclude)
+            scored = sorted((hamming_distance(fingerprint, self._fingerprints[key]), key) for key in candidates)
+            for distance, key in scored:
+                if distance > self.max_distance:
+                    break
+                if exists(key):
+                    return key
+                self.remove_canonical(key)
+            return None
+
+    def is_near(self, a: int, b: int) -> bool:
+        return hamming_distance(a, b) <= self.max_distance
+
+    def link(self, key: str, canonical_key: str, entry: Dict[str, Any]) -> None:
+        """
+        사본을 대표 문서에 연결해 저장합니다.
+
+        Args:
+            key (str): 사본 파일 ID
+            canonical_key (str): 대표 문서 파일 ID
+            entry (Dict[str, Any]): text, metadata를 가진 사본 항목 (metadata에 canonicalId를 기록)
+        """
+        with self._lock:
+            self.unlink(key, commit=False)
+            entry = {**entry, "metadata": {**entry["metadata"], "canonicalId": canonical_key}}
+            self.aliases[key] = entry
+            self.aliases.commit()
+            self._aliases_of.setdefault(canonical_key, set()).add(key)
+
+    def unlink(self, key: str, commit: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        사본 연결을 제거합니다.
+
+        Returns:
+            Optional[Dict[str, Any]]: 제거된 사본 항목. 사본이 아니었으면 None
+        """
+        with self._lock:
+            entry = self.aliases.get(key)
+            if entry is None:
+                return None
+            del self.aliases[key]
+            if commit:
+                self.aliases.commit()
+            canonical_key = str(entry["metadata"]["canonicalId"])
+            siblings = self._aliases_of.get(canonical_key)
+            if siblings is not None:
+                siblings.discard(key)
+                if not siblings:
+                    del self._aliases_of[canonical_key]
+            return entry
+
+    def alias(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        사본 항목을 반환합니다. 사본이 아니면 None입니다.
+        """
+        return self.aliases.get(key)
+
+    def aliases_of(self, canonical_key: str) -> List[str]:
+        with self._lock:
+            return sorted(self._aliases_of.get(canonical_key, ()))
+
+    def close(self) -> None:
+        self.aliases.close()
@@ -0,0 +1,156 @@
+import json
+import logging
+import sqlite3
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS nodes (
+        node TEXT PRIMARY KEY,
+        version REAL,
+        neighbors TEXT NOT NULL,
+        dirty INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS edges (
+        target TEXT NOT NULL,
+        source TEXT NOT NULL,
+        PRIMARY KEY (target, source)
+    ) WITHOUT ROWID
+    """,
+)
+
+
+def node_key(file_type: str, key: str) -> str:
+    """
+    그래프 노드 키 ("타입:파일 ID")를 만듭니다.
+    """
+    return f"{file_type}:{key}"
+
+
+class NeighborGraph:
+    """
+    문서별로 대상 파일 타입마다 가장 가까운 size개 문서(이웃)를 미리 계산해 SQLite 파일에 보관하는 kNN 그래프입니다.
+
+    이웃 목록은 {대상 타입: [[파일 키, fileId, volumeId, 유사도 점수], ...]} 형태이며 점수가 높은 순입니다.
+    역방향 간선(edges)으로 어떤 문서를 이웃으로 가진 노드를 찾아, 그 문서가 바뀌거나 삭제되면
+    해당 노드를 dirty로 표시합니다. dirty이거나 없는 노드는 조회 시 다시 계산해야 합니다.
+    """
+
+    def __init__(self, path: str, size: int = 16):
+        """
+        Args:
+            path (str): SQLite 파일 경로. 없으면 새로 생성
+            size (int): 노드가 대상 타입마다 보관할 이웃 수 (기본값: 16)
+        """
+        self.path = path
+        self.size = size
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # 저장된 벡터에서 다시 만들 수 있는 파생 데이터이므로 커밋마다 동기화하지 않음
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def get(self, node: str) -> Optional[Tuple[Optional[float], Dict[str, List[List[Any]]]]]:
+        """
+        노드의 (버전, 이웃 목록)을 반환합니다. 없거나 dirty이면 None입니다.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT version, neighbors, dirty FROM nodes WHERE node = ?", (node,)).fetchone()
+        if row is None or row[2]:
+            return None
+        return row[0], json.loads(row[1])
+
+    def set(self, node: str, version: Optional[float], neighbors: Dict[str, List[List[Any]]]) -> None:
+        """
+        노드의 이웃 목록을 교체하고 dirty 표시를 지웁니다.
+
+        Args:
+            node (str): 노드 키
+            version (Optional[float]): 이웃을 계산한 문서의 저장 시각. 조회 시 문서가 다시 저장되었는지 확인하는 데 사용
+            neighbors (Dict[str, List[List[Any]]]): 대상 타입별 이웃 목록 (점수가 높은 순)
+        """
+        neighbors = {file_type: items[:self.size] for file_type, items in neighbors.items()}
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO nodes (node, version, neighbors, dirty) VALUES (?, ?, ?, 0)",
+                               (node, version, json.dumps(neighbors, ensure_ascii=False, separators=(',', ':'))))
+            self._conn.execute("DELETE FROM edges WHERE source = ?", (node,))
+            self._conn.executemany("INSERT OR IGNORE INTO edges (target, source) VALUES (?, ?)",
+                                   ((node_key(file_type, item[0]), node)
+                                    for file_type, items in neighbors.items() for item in items))
+
+    def offer(self, node: str, file_type: str, offered: List[List[Any]]) -> bool:
+        """
+        새로 저장된 문서들을 노드의 이웃 후보로 제안합니다. 기존 이웃과 합쳐 점수가 높은 size개를 남깁니다.
+        없거나 dirty인 노드는 조회 시 다시 계산되므로 건너뜁니다.
+
+        Args:
+            node (str): 이웃 목록을 갱신할 노드 키
+            file_type (str): 제안하는 문서들의 타입
+            offered (List[List[Any]]): [파일 키, fileId, volumeId, 유사도 점수] 목록
+
+        Returns:
+            bool: 목록이 바뀌었으면 True
+        """
+        with self._lock:
+            current = self.get(node)
+            if current is None:
+                return False
+            version, neighbors = current
+            offered_keys = {item[0] for item in offered}
+            existing = [item for item in neighbors.get(file_type, []) if item[0] not in offered_keys]
+            items = sorted(existing + offered, key=lambda item: item[3], reverse=True)[:self.size]
+            if items == neighbors.get(file_type, []):
+                return False
+            neighbors[file_type] = items
+            self.set(node, version, neighbors)
+            return True
+
+    def referrers(self, node: str) -> Set[str]:
+        """
+        이 노드를 이웃으로 가진 노드들을 반환합니다.
+        """
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT source FROM edges WHERE target = ?", (node,))}
+
+    def mark_dirty(self, nodes: Iterable[str]) -> None:
+        with self._lock:
+            self._conn.executemany("UPDATE nodes SET dirty = 1 WHERE node = ?", ((node,) for node in nodes))
+
+    def remove(self, node: str) -> None:
+        """
+        노드를 삭제하고, 이 노드를 이웃으로 가진 노드들을 dirty로 표시합니다.
+        """
+        with self._lock:
+            self.mark_dirty(self.referrers(node))
+            self._conn.execute("DELETE FROM nodes WHERE node = ?", (node,))
+            self._conn.execute("DELETE FROM edges WHERE source = ? OR target = ?", (node, node))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM nodes")
+            self._conn.execute("DELETE FROM edges")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        노드 수와 다시 계산해야 하는 노드 수를 반환합니다.
+        """
+        with self._lock:
+            nodes, dirty = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(dirty), 0) FROM nodes").fetchone()
+        return {"nodes": nodes, "dirty": dirty}
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
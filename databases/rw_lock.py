@@ -0,0 +1,86 @@
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    여러 읽기 작업은 동시에, 쓰기 작업은 하나씩만 실행되도록 하는 잠금입니다.
+
+    쓰기를 기다리는 스레드가 있으면 새 읽기는 대기하므로 쓰기가 굶지 않습니다.
+    쓰기 잠금은 같은 스레드에서 재진입할 수 있고, 쓰기 잠금을 가진 스레드나 이미 읽기 잠금을
+    가진 스레드는 대기 없이 읽기 잠금을 다시 얻습니다. 읽기 잠금에서 쓰기 잠금으로의 승격은
+    교착 상태를 만들 수 있으므로 허용하지 않습니다.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def acquire_read(self) -> None:
+        depth = getattr(self._local, "read_depth", 0)
+        with self._cond:
+            if self._writer != threading.get_ident() and depth == 0:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+            self._readers += 1
+        self._local.read_depth = depth + 1
+
+    def release_read(self) -> None:
+        self._local.read_depth -= 1
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if getattr(self._local, "read_depth", 0):
+                raise RuntimeError("읽기 잠금을 가진 상태에서 쓰기 잠금을 얻을 수 없습니다.")
+
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        with self._cond:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("쓰기 잠금을 가진 스레드만 해제할 수 있습니다.")
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read_lock(self):
+        """
+        읽기 잠금 컨텍스트. 다른 읽기와 동시에 실행됩니다.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_lock(self):
+        """
+        쓰기 잠금 컨텍스트. 다른 모든 읽기/쓰기와 배타적으로 실행됩니다.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
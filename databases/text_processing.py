@@ -0,0 +1,121 @@
+import hashlib
+import html
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+
+# 태그와 한글/영문/숫자 토큰 패턴
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_TOKEN_PATTERN = re.compile(r"[0-9A-Za-z가-힣]{2,}")
+
+# 내용째 제거할 블록, 줄바꿈으로 바꿀 태그, 폭이 없는 문자
+_BLOCK_PATTERN = re.compile(r"<(style|script)\b[^>]*>.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+_LINE_BREAK_TAG_PATTERN = re.compile(r"<br\s*/?>|</(p|div|li|tr|h[1-6])\s*>", re.IGNORECASE)
+_ZERO_WIDTH_PATTERN = re.compile("[\u200b\u200c\u200d\u2060\ufeff\u00ad]")
+_INLINE_SPACE_PATTERN = re.compile(r"[^\S\n]+")
+_BLANK_LINES_PATTERN = re.compile(r"\s*\n\s*")
+
+# 키워드 끝에서 떼어낼 조사 (긴 것부터 검사)
+_PARTICLES = ("으로", "에서", "에게", "까지", "부터", "은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "로", "도")
+
+# 키워드에서 제외할 단어 (서식 잔여물과 의미 없는 단어)
+_STOPWORDS = {"span", "style", "color", "font", "size", "br", "div", "px", "pt", "000000", "그리고", "하지만", "있습니다", "합니다"}
+
+
+def extract_keywords(text: str, max_words: int = 5) -> str:
+    """
+    LLM 호출 없이 텍스트에서 자주 등장하는 단어를 골라 간단한 키워드 요약을 만듭니다.
+    태그를 제거하고, 한글 단어 끝의 조사를 떼어 낸 뒤 빈도 순(같으면 먼저 나온 순)으로 고릅니다.
+
+    Args:
+        text (str): 원본 텍스트
+        max_words (int): 최대 키워드 수 (기본값: 5)
+
+    Returns:
+        str: 공백으로 구분한 키워드
+    """
+    counts = Counter()
+    first_seen = {}
+    for position, token in enumerate(_TOKEN_PATTERN.findall(_TAG_PATTERN.sub(" ", text))):
+        token = token.lower()
+        for particle in _PARTICLES:
+            if len(token) > len(particle) + 1 and token.endswith(particle):
+                token = token[:-len(particle)]
+                break
+        if token in _STOPWORDS:
+            continue
+        counts[token] += 1
+        first_seen.setdefault(token, position)
+
+    ranked = sorted(counts, key=lambda token: (-counts[token], first_seen[token]))
+    return " ".join(ranked[:max_words])
+
+
+class TextPreprocessor:
+    """
+    제목 생성과 임베딩 전에 문서 컨텍스트에서 서식을 걷어내 본문 텍스트만 남깁니다.
+
+    style/script 블록과 주석을 내용째 지우고, 줄 단위 태그는 줄바꿈으로, 나머지 태그는 공백으로 바꿉니다.
+    HTML 엔티티를 풀고 NFC로 정규화한 뒤 폭이 없는 문자를 제거하고 공백을 정리합니다.
+    결과는 원본의 SHA-256 해시를 키로 LRU 방식으로 보관합니다.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Args:
+            max_entries (int): 보관할 최대 결과 수 (기본값: 4096)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def strip_markup(text: str) -> str:
+        """
+        캐시 없이 텍스트에서 서식을 제거합니다.
+
+        Args:
+            text (str): 원본 텍스트 (HTML 조각 포함 가능)
+
+        Returns:
+            str: 정리된 본문 텍스트
+        """
+        text = _BLOCK_PATTERN.sub(" ", text)
+        text = _LINE_BREAK_TAG_PATTERN.sub("\n", text)
+        text = _TAG_PATTERN.sub(" ", text)
+        text = unicodedata.normalize("NFC", html.unescape(text))
+        text = _ZERO_WIDTH_PATTERN.sub("", text)
+        text = _INLINE_SPACE_PATTERN.sub(" ", text)
+        return _BLANK_LINES_PATTERN.sub("\n", text).strip()
+
+    def clean(self, text: str) -> str:
+        """
+        서식을 제거한 본문 텍스트를 반환합니다. 같은 내용은 한 번만 처리합니다.
+
+        Args:
+            text (str): 원본 텍스트
+
+        Returns:
+            str: 정리된 본문 텍스트
+        """
+        if not text:
+            return ""
+
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            cleaned = self._entries.get(key)
+            if cleaned is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cleaned
+            self.misses += 1
+
+        cleaned = self.strip_markup(text)
+        with self._lock:
+            self._entries[key] = cleaned
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cleaned
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TitleCache:
+    """
+    LLM으로 생성한 제목을 보관하는 LRU 캐시입니다.
+
+    키는 정규화한 텍스트의 SHA-256 해시와 max_words로 구성되며, 메모리에 최대
+    max_entries개를 유지하고 save_every번 변경될 때마다 디스크에 저장합니다.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10000, save_every: int = 20):
+        """
+        Args:
+            path (Optional[str]): 캐시 파일 경로. 없으면 메모리에만 유지
+            max_entries (int): 최대 보관 항목 수 (기본값: 10000)
+            save_every (int): 디스크에 저장할 변경 횟수 간격 (기본값: 20)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.save_every = save_every
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._dirty = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def make_key(text: str, max_words: int) -> str:
+        """
+        텍스트를 정규화(NFC, 공백 정리)한 뒤 해시하여 캐시 키를 만듭니다.
+
+        Args:
+            text (str): 제목을 생성할 텍스트
+            max_words (int): 제목의 최대 단어 수
+
+        Returns:
+            str: 캐시 키
+        """
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return f"{hashlib.sha256(normalized.encode('utf-8')).hexdigest()}:{max_words}"
+
+    def get(self, text: str, max_words: int) -> Optional[str]:
+        """
+        캐시된 제목을 조회합니다. 조회된 항목은 가장 최근 항목으로 옮겨집니다.
+
+        Returns:
+            Optional[str]: 캐시된 제목. 없으면 None
+        """
+        key = self.make_key(text, max_words)
+        with self._lock:
+            title = self._entries.get(key)
+            if title is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return title
+
+    def put(self, text: str, max_words: int, title: str) -> None:
+        """
+        제목을 캐시에 저장하고 용량을 넘으면 가장 오래 사용하지 않은 항목을 제거합니다.
+        """
+        key = self.make_key(text, max_words)
+        with self._lock:
+            self._entries[key] = title
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty += 1
+            should_save = self._dirty >= self.save_every
+
+        if should_save:
+            self.save()
+
+    def save(self) -> None:
+        """
+        변경된 내용이 있으면 캐시를 디스크에 저장합니다. LRU 순서를 그대로 유지합니다.
+        """
+        if not self.path:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(list(self._entries.items()), ensure_ascii=False, separators=(',', ':'))
+            self._dirty = 0
+
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"제목 캐시 저장 중 오류 발생: {str(e)}")
+
+    def _load(self) -> None:
+        """
+        디스크에 저장된 캐시를 불러옵니다.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for key, title in json.load(f)[-self.max_entries:]:
+                    self._entries[key] = title
+            logger.info(f"제목 캐시를 불러왔습니다: {self.path} ({len(self._entries)}개)")
+        except Exception as e:
+            logger.error(f"제목 캐시 로드 중 오류 발생: {str(e)}")
@@ -1,22 +1,61 @@
 import numpy as np
 import faiss
-from typing import Dict, Any, Optional, List
-from sentence_transformers import SentenceTransformer
+from typing import Dict, Any, Callable, Optional, List, MutableMapping
 import logging
 import os
 import json
 import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from dotenv import load_dotenv
 from collections import OrderedDict
+from databases.write_ahead_log import WriteAheadLog, encode_vector, decode_vector
+from databases.embedding_store import EmbeddingStore
+from databases.title_cache import TitleCache
+from databases.embedding_cache import EmbeddingCache
+from databases.model_registry import EMBEDDING_MODEL_NAME, get_embedding_model, get_openai_client
+from databases.index_factory import IndexConfig
+from databases.text_processing import extract_keywords, TextPreprocessor
+from databases.rw_lock import ReadWriteLock
+from databases.attribute_index import AttributeIndex
+from databases.checkpoint_scheduler import CheckpointScheduler, atomic_write
+from databases.eviction import EvictionPolicy, make_eviction_policy, entry_bytes
+from databases.metadata_store import SQLiteMetadataStore, METADATA_BACKENDS
+from databases.blob_store import BlobStore
 
 # 환경 변수 로드
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# 검색 쿼리 표현 방식
+# - llm: LLM으로 쿼리 제목을 만들어 "제목 쿼리"를 임베딩 (네트워크 왕복 포함)
+# - keywords: 로컬에서 추출한 키워드로 "키워드 쿼리"를 임베딩
+# - fast: 쿼리 텍스트를 그대로 임베딩
+SEARCH_MODES = ("llm", "keywords", "fast")
+
+# 제목 생성 시 LLM에 보내는 최대 글자 수 (서식을 제거한 본문 기준)
+TITLE_INPUT_MAX_CHARS = 2000
+
+# 저장된 인덱스를 여는 방식
+# - memory: 인덱스와 메타데이터를 모두 메모리로 읽음
+# - mmap: IVF 인덱스는 FAISS mmap으로 열고, flat 인덱스는 읽지 않고 메모리 매핑된 임베딩 저장소로 검색하며,
+#   메타데이터는 백그라운드에서(또는 처음 필요할 때) 읽음. 첫 변경 시 인덱스를 메모리로 읽어 전환
+OPEN_MODES = ("memory", "mmap")
+
+# 필터 조건에 맞는 후보가 이 수 이하이면 FAISS 대신 저장된 임베딩으로 후보만 정확히 비교
+FILTER_EXACT_MAX = 4096
+
 class VectorDatabase:
-    def __init__(self, dimension: int = 768, storage_dir: str = "vector_db", max_vectors: int = 1000):
+    def __init__(self, dimension: int = 768, storage_dir: str = "vector_db", max_vectors: int = 1000,
+                 use_wal: bool = True, checkpoint_every: int = 100, checkpoint_interval: float = 5.0,
+                 title_cache: Optional[TitleCache] = None,
+                 embedding_cache: Optional[EmbeddingCache] = None, model_name: str = EMBEDDING_MODEL_NAME,
+                 index_config: Optional[Any] = None, preprocessor: Optional[TextPreprocessor] = None,
+                 eviction: Optional[Any] = None, open_mode: str = "memory", metadata_backend: str = "sqlite",
+                 blob_threshold: Optional[int] = 4096):
         """
         벡터 데이터베이스를 초기화합니다.
         
@@ -24,30 +63,342 @@ class VectorDatabase:
             dimension (int): 벡터의 차원 수 (기본값: 768)
             storage_dir (str): 벡터 데이터베이스 저장 디렉토리 (기본값: "vector_db")
             max_vectors (int): 최대 저장 벡터 수 (기본값: 1000)
+            use_wal (bool): 변경 내역을 WAL에 추가 기록할지 여부. False이면 체크포인트 사이의 변경은
+                비정상 종료 시 유실될 수 있습니다. (기본값: True)
+            checkpoint_every (int): 바로 체크포인트를 시작할 변경 횟수 (기본값: 100)
+            checkpoint_interval (float): 첫 변경 후 체크포인트까지 기다리는 최대 시간(초) (기본값: 5.0)
+            title_cache (Optional[TitleCache]): 생성된 제목 캐시. 없으면 저장 디렉토리에 새로 생성
+            embedding_cache (Optional[EmbeddingCache]): 텍스트 임베딩 캐시. 없으면 저장 디렉토리에 새로 생성
+            model_name (str): 임베딩 모델 이름. 모델은 프로세스 전체에서 공유되며 처음 사용할 때 로드됩니다.
+            index_config (Optional[Any]): 인덱스 타입과 파라미터. IndexConfig, 타입 문자열("flat", "ivf", "hnsw", "fp16", "sq8", "pq")
+                또는 {"index_type": ..., 파라미터...} 딕셔너리 (기본값: flat)
+            preprocessor (Optional[TextPreprocessor]): 제목 생성과 쿼리 임베딩 전에 서식을 제거하는 전처리기.
+                없으면 새로 생성
+            eviction (Optional[Any]): 최대 저장 개수나 바이트 한도를 넘을 때 삭제할 항목을 고르는 정책.
+                EvictionPolicy, 정책 이름("lru", "ttl") 또는 {"policy": ..., "max_bytes": ..., "ttl_seconds": ...}
+                딕셔너리 (기본값: lru)
+            open_mode (str): 저장된 인덱스를 여는 방식. memory는 전부 메모리로 읽고, mmap은 인덱스 페이지를
+                OS 페이지 캐시로 여러 프로세스가 공유하며 메타데이터를 지연 로드합니다. (기본값: memory)
+            metadata_backend (str): 메타데이터 저장 방식. sqlite는 항목 단위로 조회/갱신하고 컨텍스트를 한 번만 저장하며,
+                json은 전체를 메모리에 두고 metadata.json을 통째로 다시 씁니다. 기존 metadata.json은 sqlite로
+                처음 열 때 옮겨집니다. (기본값: sqlite)
+            blob_threshold (Optional[int]): 이 글자 수 이상인 컨텍스트는 내용 해시로 압축 저장하는 블롭 저장소에 두고
+                메타데이터에는 참조만 남깁니다. 같은 컨텍스트는 한 번만 저장됩니다. None이면 사용하지 않음 (기본값: 4096)
         """
+        if open_mode not in OPEN_MODES:
+            raise ValueError(f"지원하지 않는 열기 방식입니다: {open_mode}")
+        if metadata_backend not in METADATA_BACKENDS:
+            raise ValueError(f"지원하지 않는 메타데이터 저장 방식입니다: {metadata_backend}")
+
         self.dimension = dimension
         self.storage_dir = storage_dir
         self.index_path = os.path.join(storage_dir, "faiss_index.bin")
         self.metadata_path = os.path.join(storage_dir, "metadata.json")
+        self.metadata_db_path = os.path.join(storage_dir, "metadata.db")
+        self.checkpoint_path = os.path.join(storage_dir, "checkpoint.json")
+        self.wal_path = os.path.join(storage_dir, "wal.log")
         self.max_vectors = max_vectors
+        self.use_wal = use_wal
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self.model_name = model_name
+        self.index_config = IndexConfig.from_value(index_config)
+        self.open_mode = open_mode
+        self.metadata_backend = metadata_backend
+        self.blob_threshold = blob_threshold
+        # 현재 인덱스의 실제 타입 (벡터 수가 적으면 설정과 달리 flat)
+        self.index_kind = "flat"
+        # 제거를 지원하지 않는 인덱스(HNSW)에 남아 있는 삭제/교체된 벡터 수
+        self._stale_count = 0
+        # 선택자 검색용 (캐시를 만든 인덱스, 파일 ID → 현재 내부 인덱스 위치, 현재 위치 비트맵). 인덱스가 바뀌면 다시 만듦
+        self._id_positions: Optional[tuple] = None
+        # 인덱스가 읽기 전용으로 매핑되었거나(IVF) 아직 읽지 않은(flat) 상태인지 여부 (mmap 모드)
+        self._index_mapped = False
+        # 메타데이터는 처음 필요할 때 읽음 (None이면 아직 읽지 않음)
+        self._metadata_store: Optional[MutableMapping[str, Dict[str, Any]]] = None
+        self._metadata_lock = threading.Lock()
+        self._eviction_state: Dict[str, Any] = {}
         
-        # OpenAI 클라이언트 초기화
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # 검색/조회는 동시에, 변경 작업은 하나씩 실행하는 읽기/쓰기 잠금
+        self._lock = ReadWriteLock()
+        self._checkpoint_lock = threading.Lock()
+        self._closed = False
+        
+        # 저장/삭제 후 호출할 함수와, 잠금 안에서 축출되어 아직 알리지 않은 키
+        self._listeners: List[Callable[[str, List[str]], None]] = []
+        self._evicted_keys: List[str] = []
+        
+        # 변경을 모아 checkpoint_interval초 또는 checkpoint_every회마다 한 번 저장
+        self._checkpointer = CheckpointScheduler(
+            self._save_to_disk, interval=checkpoint_interval, max_dirty=checkpoint_every,
+            name=os.path.basename(os.path.normpath(storage_dir)))
         
         # 저장 디렉토리가 없으면 생성
         os.makedirs(storage_dir, exist_ok=True)
         
+        # 생성된 제목 캐시 (여러 VectorDatabase가 공유할 수 있음)
+        self.title_cache = title_cache or TitleCache(os.path.join(storage_dir, "title_cache.json"))
+        
+        # 텍스트 임베딩 캐시 (여러 VectorDatabase가 공유할 수 있음)
+        self.embedding_cache = embedding_cache or EmbeddingCache(
+            os.path.join(storage_dir, "embedding_cache"), model_name, dimension)
+        
+        # 서식 제거 전처리기 (여러 VectorDatabase가 공유할 수 있음)
+        self.preprocessor = preprocessor or TextPreprocessor()
+        
+        # 필터 검색용 메타데이터 역색인 (volumeId, type)
+        self.attributes = AttributeIndex()
+        
+        # 축출 정책 (최근 사용 순서, 저장 시각, 항목 크기 추적)
+        self.eviction: EvictionPolicy = make_eviction_policy(eviction)
+        
+        # 큰 컨텍스트를 압축해 보관하는 블롭 저장소 (내용 해시로 중복 제거)
+        self.blobs = BlobStore(os.path.join(storage_dir, "blobs"))
+        
+        # 원본 임베딩 저장소 (인덱스 재구성 시 재임베딩 없이 사용)
+        self.embeddings = EmbeddingStore(storage_dir, dimension)
+        
         # 기존 인덱스가 있으면 로드, 없으면 새로 생성
+        checkpoint_seq = 0
+        migrated = False
         if os.path.exists(self.index_path):
-            self.index = faiss.read_index(self.index_path)
-            with open(self.metadata_path, 'r', encoding='utf-8') as f:
-                self.metadata_store = json.load(f)
-        else:
-            self.index = faiss.IndexFlatL2(dimension)
-            self.metadata_store = {}
+            checkpoint = {}
+            if os.path.exists(self.checkpoint_path):
+                with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                    checkpoint = json.load(f)
+            checkpoint_seq = checkpoint.get("seq", 0)
+            self.index_kind = checkpoint.get("index_type", "flat")
+            self._stale_count = checkpoint.get("stale_count", 0)
+            self._eviction_state = checkpoint.get("eviction", {})
             
-        # 한국어 텍스트에 최적화된 모델 사용
-        self.model = SentenceTransformer('jhgan/ko-sroberta-multitask')
+            if open_mode == "mmap" and "index_type" in checkpoint:
+                self.index = self._open_mapped_index()
+            else:
+                self.index = faiss.read_index(self.index_path)
+                self._load_metadata()
+                if "index_type" not in checkpoint and not isinstance(self.index, faiss.IndexIDMap2):
+                    self._migrate_to_id_map()
+                    migrated = True
+                self.index_config.configure(self.index, self.index_kind)
+        else:
+            self.index = self._new_index()
+            # 인덱스가 없으면 체크포인트 전의 메타데이터는 WAL로 다시 채움
+            self._metadata_store = self._open_metadata_store()
+            self._metadata_store.clear()
+        
+        # 마지막 체크포인트 이후의 변경 내역을 WAL에서 복구
+        self.wal = None
+        if use_wal:
+            self.wal = WriteAheadLog(self.wal_path)
+            recovered = self.wal.recover(checkpoint_seq)
+            for record in recovered:
+                self._replay(record)
+            if recovered:
+                # 복구한 변경 내역은 다음 체크포인트에 반영
+                self._checkpointer.mark_dirty(len(recovered))
+        
+        # 메타데이터를 아직 읽지 않았다면 WAL에 복구할 내용이 없었으므로 임베딩 저장소는 체크포인트와 일치
+        if self._metadata_store is not None or not use_wal:
+            self._reconcile_embeddings()
+        
+        # 설정이 바뀌었거나 벡터 수가 달라져 인덱스 타입이 맞지 않으면 재구성
+        rebuilt = self._maybe_rebuild_index()
+        
+        if migrated or rebuilt:
+            self._save_to_disk()
+        
+        # mmap 모드는 메타데이터를 백그라운드에서 미리 읽어 첫 요청의 지연을 줄임
+        if self._metadata_store is None:
+            threading.Thread(target=self._load_metadata, name=f"vector-db-metadata-{os.path.basename(storage_dir)}",
+                             daemon=True).start()
+
+    @property
+    def metadata_store(self) -> MutableMapping[str, Dict[str, Any]]:
+        """
+        파일 ID(문자열)별 text, title, metadata, stored_at 저장소. 처음 접근할 때 디스크에서 읽습니다.
+        """
+        if self._metadata_store is None:
+            self._load_metadata()
+        return self._metadata_store
+
+    def _open_metadata_store(self) -> MutableMapping[str, Dict[str, Any]]:
+        """
+        설정된 방식으로 메타데이터 저장소를 엽니다. json은 metadata.json 전체를 딕셔너리로 읽습니다.
+        """
+        if self.metadata_backend == "sqlite":
+            return SQLiteMetadataStore.open(self.metadata_db_path, legacy_json_path=self.metadata_path)
+        if not os.path.exists(self.metadata_path):
+            if os.path.exists(self.metadata_db_path):
+                raise ValueError(f"메타데이터가 SQLite로 옮겨진 데이터베이스입니다. metadata_backend='sqlite'로 열어야 합니다: {self.storage_dir}")
+            return {}
+        with open(self.metadata_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _load_metadata(self) -> None:
+        """
+        메타데이터 저장소를 열고 필터 역색인과 축출 정책 상태를 만듭니다. 여러 스레드가 동시에 호출해도 한 번만 읽습니다.
+        """
+        with self._metadata_lock:
+            if self._metadata_store is not None:
+                return
+            metadata_store = self._open_metadata_store()
+            self.attributes.rebuild(metadata_store)
+            self.eviction.rebuild(metadata_store)
+            self.eviction.restore(self._eviction_state)
+            self.blobs.rebuild(entry["context_blob"]["ref"] for entry in metadata_store.values() if "context_blob" in entry)
+            self._metadata_store = metadata_store
+
+    def _open_mapped_index(self) -> Optional[faiss.Index]:
+        """
+        mmap 모드로 저장된 인덱스를 엽니다. IVF는 역리스트를 읽기 전용으로 매핑하고,
+        flat은 인덱스를 읽지 않고(None) 메모리 매핑된 임베딩 저장소로 정확히 검색합니다.
+        HNSW와 양자화 인덱스(fp16, sq8, pq)는 FAISS가 mmap을 지원하지 않아 메모리로 읽습니다.
+        
+        Returns:
+            Optional[faiss.Index]: 열린 인덱스. flat이면 None
+        """
+        if self.index_kind == "flat":
+            self._index_mapped = True
+            return None
+        if self.index_kind == "ivf":
+            index = faiss.read_index(self.index_path, faiss.IO_FLAG_MMAP)
+            self._index_mapped = True
+        else:
+            index = faiss.read_index(self.index_path)
+        self.index_config.configure(index, self.index_kind)
+        return index
+
+    def _ensure_writable_index(self) -> None:
+        """
+        매핑된(또는 읽지 않은) 인덱스를 변경 전에 메모리로 읽습니다.
+        읽기 전용으로 매핑된 IVF 인덱스에 추가/삭제하면 FAISS가 프로세스를 중단시키므로 반드시 먼저 호출해야 합니다.
+        """
+        if not self._index_mapped:
+            return
+        self.index = faiss.read_index(self.index_path)
+        self.index_config.configure(self.index, self.index_kind)
+        self._index_mapped = False
+        logger.info(f"변경을 위해 {self.index_kind} 인덱스를 메모리로 읽었습니다: {self.storage_dir}")
+
+    @property
+    def model(self) -> Any:
+        """
+        공유 임베딩 모델. 처음 접근할 때 로드됩니다.
+        """
+        return get_embedding_model(self.model_name)
+
+    @property
+    def client(self) -> OpenAI:
+        """
+        공유 OpenAI 클라이언트.
+        """
+        return get_openai_client()
+
+    def _new_index(self) -> faiss.Index:
+        """
+        파일 ID를 벡터 ID로 사용하는 빈 FAISS 인덱스를 생성합니다.
+        
+        Returns:
+            faiss.Index: ID 매핑 인덱스
+        """
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension))
+
+    @staticmethod
+    def _key(id: Any) -> str:
+        """
+        메타데이터 저장소의 키를 문자열로 통일합니다. (JSON 로드 후에도 동일한 키를 보장)
+        """
+        return str(id)
+
+    @staticmethod
+    def _faiss_ids(*ids: Any) -> np.ndarray:
+        """
+        파일 ID들을 FAISS가 사용하는 int64 배열로 변환합니다.
+        """
+        return np.array([int(id) for id in ids], dtype='int64')
+
+    def _migrate_to_id_map(self) -> None:
+        """
+        위치 기반 인덱스(IndexFlatL2)를 파일 ID 기반 인덱스로 변환합니다.
+        인덱스 위치와 메타데이터 순서가 일치하면 저장된 벡터를 그대로 옮기고,
+        어긋나 있으면 저장된 제목을 한 번 다시 임베딩합니다.
+        """
+        old_index = self.index
+        ids = list(self.metadata_store.keys())
+        self.index = self._new_index()
+        if not ids:
+            return
+        
+        if old_index.ntotal == len(ids):
+            vectors = old_index.reconstruct_n(0, old_index.ntotal)
+        else:
+            logger.warning(f"인덱스({old_index.ntotal})와 메타데이터({len(ids)}) 개수가 달라 제목을 다시 임베딩합니다: {self.storage_dir}")
+            vectors = np.vstack([self._get_embedding(self.metadata_store[id]["title"]) for id in ids])
+        
+        self.index.add_with_ids(vectors, self._faiss_ids(*ids))
+        for id, vector in zip(ids, vectors):
+            self.embeddings.put(int(id), vector)
+        logger.info(f"FAISS 인덱스를 파일 ID 기반으로 변환했습니다: {self.storage_dir} ({len(ids)}개)")
+
+    def _reconcile_embeddings(self) -> None:
+        """
+        임베딩 저장소를 메타데이터와 일치시킵니다. 저장소가 없던 기존 데이터베이스는
+        FAISS 인덱스에서 벡터를 복원해 채우고, 비정상 종료로 남은 항목은 제거합니다.
+        """
+        expected = {int(key) for key in self.metadata_store}
+        stored = set(self.embeddings.ids().tolist())
+        
+        for id in stored - expected:
+            self.embeddings.remove(id)
+        
+        missing = expected - stored
+        if missing:
+            self._ensure_writable_index()
+        for id in missing:
+            try:
+                vector = self.index.reconstruct(id)
+            except RuntimeError:
+                # 복원을 지원하지 않는 인덱스(IVF 등)는 저장된 제목을 다시 임베딩
+                vector = self._get_embedding(self.metadata_store[self._key(id)]["title"])
+            self.embeddings.put(id, vector)
+        if missing:
+            logger.info(f"FAISS 인덱스에서 {len(missing)}개의 임베딩을 복원했습니다: {self.storage_dir}")
+        
+        self.embeddings.flush()
+
+    def rebuild_index(self) -> None:
+        """
+        저장된 원본 임베딩만으로 FAISS 인덱스를 다시 만듭니다. 모델을 실행하지 않습니다.
+        """
+        with self._lock.write_lock():
+            vectors = np.ascontiguousarray(self.embeddings.vectors()) if len(self.embeddings) else None
+            ids = np.array(self.embeddings.ids()) if len(self.embeddings) else None
+            self.index, self.index_kind = self.index_config.build(self.dimension, vectors, ids)
+            self._index_mapped = False
+            self._stale_count = 0
+        logger.info(f"임베딩 저장소로부터 {self.index_kind} 인덱스를 재구성했습니다: {self.storage_dir} ({self.index.ntotal}개)")
+
+    def _maybe_rebuild_index(self) -> bool:
+        """
+        벡터 수에 맞는 인덱스 타입으로 전환하거나, 제거되지 않은 벡터가 많이 쌓인 HNSW 인덱스를
+        저장된 임베딩으로 다시 만듭니다. 호출자는 쓰기 잠금을 잡은 상태여야 합니다.
+        
+        Returns:
+            bool: 인덱스를 재구성했으면 True
+        """
+        count = len(self.embeddings)
+        desired_kind = self.index_config.kind_for(count)
+        
+        if desired_kind != self.index_kind:
+            # 학습된 인덱스는 학습 기준의 절반 아래로 줄어들 때까지 유지 (경계에서 반복 재구성 방지)
+            shrinking = self.index_kind == self.index_config.index_type and desired_kind == "flat"
+            if not (shrinking and count >= self.index_config.min_train_size // 2):
+                self.rebuild_index()
+                return True
+        elif self._stale_count > max(100, count // 10):
+            self.rebuild_index()
+            return True
+        return False
 
     def _generate_title(self, text: str, max_words: int = 5) -> str:
         """
@@ -60,6 +411,10 @@ class VectorDatabase:
         Returns:
             str: 생성된 제목
         """
+        cached_title = self.title_cache.get(text, max_words)
+        if cached_title is not None:
+            return cached_title
+            
         try:
             prompt = f"""다음 텍스트의 내용을 가장 잘 표현하는 간단한 제목을 만들어주세요.
             
@@ -71,7 +426,7 @@ class VectorDatabase:
             5. 제목만 출력 (다른 설명 없이)
             
             텍스트:
-            {text}
+            {text[:TITLE_INPUT_MAX_CHARS]}
             
             제목:"""
 
@@ -88,6 +443,8 @@ class VectorDatabase:
             # 응답에서 제목 추출 및 정리
             title = response.choices[0].message.content.strip()
             logger.info(f"생성된 제목: {title}")
+            if title:
+                self.title_cache.put(text, max_words, title)
             return title
             
         except Exception as e:
@@ -96,20 +453,263 @@ class VectorDatabase:
         
     def _save_to_disk(self) -> None:
         """
-        벡터 데이터베이스를 디스크에 저장합니다.
+        벡터 데이터베이스 전체를 디스크에 저장(체크포인트)합니다.
+        스냅샷은 읽기 잠금 안에서 메모리로 직렬화하므로 검색과 동시에 진행되고,
+        파일 쓰기는 잠금 밖에서 수행하므로 디스크 저장 중에도 검색과 변경이 막히지 않습니다.
+        각 파일은 임시 파일에 쓴 뒤 rename으로 교체하므로 저장 중 중단되어도 손상되지 않습니다.
+        메타데이터는 인덱스 파일을 쓴 뒤에 기록하므로 중단되어도 메타데이터가 인덱스보다 앞서지 않으며,
+        인덱스가 앞선 경우 남은 벡터는 WAL 복구가 제거합니다.
+        WAL은 스냅샷 시점에 새 세그먼트로 바꾸고, 체크포인트가 기록된 뒤 반영된 세그먼트 파일을 삭제합니다.
         """
-        try:
-            # FAISS 인덱스 저장
-            faiss.write_index(self.index, self.index_path)
-            
-            # 메타데이터 저장
-            with open(self.metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata_store, f, ensure_ascii=False, indent=2)
+        with self._checkpoint_lock:
+            garbage = set()
+            try:
+                with self._lock.read_lock():
+                    seq = self.wal.last_seq if self.wal else 0
+                    if self.wal:
+                        # 스냅샷에 반영된 레코드는 닫힌 세그먼트에 남고, 이후 레코드는 새 세그먼트에 기록됨
+                        self.wal.rotate()
+                    # 이 스냅샷 시점까지 참조가 없어진 블롭 (메타데이터 저장 후 삭제)
+                    garbage = self.blobs.take_garbage()
+                    # 매핑된 인덱스와 읽지 않은 메타데이터는 변경되지 않았으므로 다시 쓰지 않음
+                    index_bytes = None if self._index_mapped else faiss.serialize_index(self.index)
+                    metadata_json = None
+                    eviction_state = self._eviction_state
+                    sqlite_store = isinstance(self._metadata_store, SQLiteMetadataStore)
+                    if sqlite_store:
+                        eviction_state = self.eviction.state()
+                    elif self._metadata_store is not None:
+                        metadata_json = json.dumps(self._metadata_store, ensure_ascii=False, separators=(',', ':'))
+                        eviction_state = self.eviction.state()
+                    checkpoint = {"seq": seq, "index_type": self.index_kind, "stale_count": self._stale_count,
+                                  "eviction": eviction_state}
+                    self.embeddings.flush()
                 
-            logger.info(f"벡터 데이터베이스가 {self.storage_dir}에 저장되었습니다.")
-        except Exception as e:
-            logger.error(f"벡터 데이터베이스 저장 중 오류 발생: {str(e)}")
-            raise
+                # FAISS 인덱스 저장
+                if index_bytes is not None:
+                    atomic_write(self.index_path, index_bytes.tobytes())
+                
+                # 메타데이터 저장 (인덱스 이후에 기록)
+                if sqlite_store:
+                    # 변경된 항목만 한 트랜잭션으로 기록. 스냅샷 이후의 변경도 함께 기록되지만 WAL 복구는 같은 변경을 다시 적용해도 결과가 같음
+                    with self._lock.read_lock():
+                        self._metadata_store.commit()
+                if metadata_json is not None:
+                    atomic_write(self.metadata_path, metadata_json)
+                
+                # 체크포인트가 반영한 WAL 위치 저장 (인덱스와 메타데이터 이후에 기록)
+                atomic_write(self.checkpoint_path, json.dumps(checkpoint))
+                
+                if self.wal:
+                    self.wal.remove_through(seq)
+                
+                self.blobs.collect(garbage)
+                    
+                logger.info(f"벡터 데이터베이스가 {self.storage_dir}에 저장되었습니다.")
+            except Exception as e:
+                self.blobs.requeue(garbage)
+                logger.error(f"벡터 데이터베이스 저장 중 오류 발생: {str(e)}")
+                raise
+
+    def _journal(self, *records: Dict[str, Any]) -> None:
+        """
+        변경 내역을 WAL에 추가 기록하고 체크포인트 스케줄러에 변경을 알립니다.
+        호출자는 쓰기 잠금을 잡은 상태여야 합니다.
+        
+        Args:
+            *records (Dict[str, Any]): WAL 레코드 (여러 개면 한 번에 기록)
+        """
+        if self.wal:
+            self.wal.append_many(list(records))
+        self._checkpointer.mark_dirty(len(records))
+
+    @staticmethod
+    def _store_record(entry: Dict[str, Any], vector: np.ndarray) -> Dict[str, Any]:
+        """
+        저장 항목의 WAL 레코드를 만듭니다. text가 컨텍스트로 끝나면 컨텍스트를 metadata에만 남기고
+        text에서는 빼서(context_in_text) 같은 내용을 두 번 기록하지 않습니다.
+        """
+        record = {**entry, "op": "store", "vector": encode_vector(vector)}
+        context = entry["metadata"].get("context")
+        if isinstance(context, str) and context and entry["text"].endswith(context):
+            record["text"] = entry["text"][:-len(context)]
+            record["context_in_text"] = True
+        return record
+
+    def _replay(self, record: Dict[str, Any]) -> None:
+        """
+        WAL 레코드 하나를 메모리 상태에 다시 적용합니다.
+        
+        Args:
+            record (Dict[str, Any]): WAL 레코드
+        """
+        op = record.get("op")
+        if op == "store":
+            text = record["text"]
+            if record.get("context_in_text"):
+                text += record["metadata"]["context"]
+            self._discard_orphans(record["id"])
+            self._apply_store(record["id"], text, record["title"], record["metadata"],
+                              decode_vector(record["vector"]), record.get("stored_at"))
+        elif op == "delete":
+            if not self._apply_delete(record["id"]):
+                self._discard_orphans(record["id"])
+        else:
+            logger.warning(f"알 수 없는 WAL 레코드를 무시합니다: {op}")
+
+    def _apply_store(self, id: int, text: str, title: str, metadata: Dict[str, Any], vector: np.ndarray,
+                     stored_at: Optional[float] = None) -> None:
+        """
+        벡터와 메타데이터를 메모리 상태에 반영합니다. 같은 ID가 있으면 교체합니다.
+        """
+        self._apply_store_many(
+            [{"id": id, "text": text, "title": title, "metadata": metadata, "stored_at": stored_at}], vector)
+
+    def _apply_store_many(self, entries: List[Dict[str, Any]], vectors: np.ndarray) -> None:
+        """
+        여러 벡터와 메타데이터를 한 번의 FAISS 추가로 메모리 상태에 반영합니다.
+        같은 ID가 있으면 교체합니다. entries의 ID는 서로 달라야 합니다.
+        
+        Args:
+            entries (List[Dict[str, Any]]): id, text, title, metadata, stored_at(저장 시각, 없으면 현재)을 가진 항목 리스트
+            vectors (np.ndarray): entries와 같은 순서의 (n, dimension) 벡터
+        """
+        self._ensure_writable_index()
+        ids = [entry["id"] for entry in entries]
+        existing = [id for id in ids if self._key(id) in self.metadata_store]
+        if existing:
+            self._remove_from_index(*existing)
+            for id in existing:
+                previous = self.metadata_store[self._key(id)]
+                self.attributes.remove(id, previous["metadata"])
+                self._release_blob(previous)
+        start = self.index.ntotal
+        self.index.add_with_ids(vectors, self._faiss_ids(*ids))
+        if self._id_positions is not None and self._id_positions[0] is self.index:
+            # IndexIDMap2는 추가한 벡터를 내부 인덱스 끝에 붙임
+            self._update_positions({int(id): start + i for i, id in enumerate(ids)})
+        
+        for entry, vector in zip(entries, vectors):
+            self.embeddings.put(int(entry["id"]), vector)
+            stored_entry = self._externalize({
+                "text": entry["text"],
+                "title": entry["title"],
+                "metadata": entry["metadata"],
+                "stored_at": entry.get("stored_at") or time.time()
+            })
+            self.metadata_store[self._key(entry["id"])] = stored_entry
+            self.attributes.add(entry["id"], entry["metadata"])
+            self.eviction.add(self._key(entry["id"]), stored_entry)
+
+    def _externalize(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        컨텍스트가 blob_threshold 이상이면 블롭 저장소에 저장하고, 메타데이터와 text에서 컨텍스트를 뺀 뒤
+        참조(context_blob)를 남긴 항목을 반환합니다.
+        """
+        context = entry["metadata"].get("context")
+        if self.blob_threshold is None or not isinstance(context, str) or len(context) < self.blob_threshold:
+            return entry
+        in_text = entry["text"].endswith(context)
+        return {
+            **entry,
+            "text": entry["text"][:-len(context)] if in_text else entry["text"],
+            "metadata": {field: value for field, value in entry["metadata"].items() if field != "context"},
+            "context_blob": {"ref": self.blobs.put(context), "bytes": len(context.encode('utf-8')), "in_text": in_text}
+        }
+
+    def _materialize(self, entry: Dict[str, Any], include_context: bool = True) -> Dict[str, Any]:
+        """
+        저장된 항목을 호출자에게 돌려줄 형태로 만듭니다. 블롭에 있는 컨텍스트는 필요할 때만 읽습니다.
+        
+        Args:
+            entry (Dict[str, Any]): 메타데이터 저장소의 항목
+            include_context (bool): False이면 컨텍스트를 읽지 않고 text와 metadata.context를 제외
+        """
+        blob = entry.get("context_blob")
+        if not include_context:
+            return {"title": entry["title"], "stored_at": entry.get("stored_at"),
+                    "metadata": {field: value for field, value in entry["metadata"].items() if field != "context"}}
+        if blob is None:
+            return entry
+        context = self.blobs.get(blob["ref"])
+        return {
+            "text": entry["text"] + context if blob["in_text"] else entry["text"],
+            "title": entry["title"],
+            "metadata": {**entry["metadata"], "context": context},
+            "stored_at": entry.get("stored_at")
+        }
+
+    def _release_blob(self, entry: Dict[str, Any]) -> None:
+        """
+        교체되거나 삭제된 항목의 블롭 참조를 해제합니다.
+        """
+        if "context_blob" in entry:
+            self.blobs.release(entry["context_blob"]["ref"])
+
+    def _remove_from_index(self, *ids: Any) -> None:
+        """
+        FAISS 인덱스에서 벡터를 제거합니다. 제거를 지원하지 않는 인덱스는 벡터를 남겨 두고 현재 위치 비트맵에서 빼며,
+        남은 벡터가 있는 동안 검색은 비트맵 선택자로 현재 위치만 탐색합니다.
+        """
+        self._ensure_writable_index()
+        if IndexConfig.supports_remove(self.index_kind):
+            self.index.remove_ids(self._faiss_ids(*ids))
+            # 제거 후 뒤쪽 벡터의 위치가 당겨지므로 다음 선택자 검색에서 다시 만듦
+            self._id_positions = None
+        else:
+            self._positions_by_id()
+            self._update_positions({int(id): None for id in ids})
+            self._stale_count += len(ids)
+
+    def _discard_orphans(self, *ids: Any) -> None:
+        """
+        메타데이터에 없는데 인덱스나 임베딩 저장소에 남아 있는 벡터를 제거합니다. WAL 복구 중에 사용합니다.
+        체크포인트가 인덱스를 쓴 뒤 메타데이터를 기록하기 전에 중단되었거나, 메타데이터가 스냅샷 이후의
+        삭제까지 기록한 경우 인덱스에 메타데이터 없는 벡터가 남아 검색 결과 자리를 차지할 수 있습니다.
+        """
+        ids = [id for id in ids if self._key(id) not in self.metadata_store]
+        if not ids:
+            return
+        self._ensure_writable_index()
+        if IndexConfig.supports_remove(self.index_kind):
+            if self.index.remove_ids(self._faiss_ids(*ids)):
+                self._id_positions = None
+        else:
+            positions = self._positions_by_id()
+            self._remove_from_index(*[id for id in ids if int(id) in positions])
+        for id in ids:
+            self.embeddings.remove(int(id))
+
+    def _apply_delete(self, id: int) -> bool:
+        """
+        벡터와 메타데이터를 메모리 상태에서 제거합니다.
+        
+        Returns:
+            bool: 삭제된 항목이 있었으면 True
+        """
+        entry = self.metadata_store.pop(self._key(id), None)
+        if entry is None:
+            return False
+        self.attributes.remove(id, entry["metadata"])
+        self.eviction.remove(self._key(id))
+        self._release_blob(entry)
+        self._remove_from_index(id)
+        self.embeddings.remove(int(id))
+        return True
+
+    def close(self) -> None:
+        """
+        저장되지 않은 변경을 체크포인트하고 백그라운드 스레드와 WAL을 정리합니다.
+        """
+        if self._closed:
+            return
+        self._checkpointer.close()
+        self.title_cache.save()
+        self._closed = True
+        if isinstance(self._metadata_store, SQLiteMetadataStore):
+            self._metadata_store.close()
+        if self.wal:
+            self.wal.close()
         
     def _get_embedding(self, text: str) -> np.ndarray:
         """
@@ -121,93 +721,193 @@ class VectorDatabase:
         Returns:
             np.ndarray: 변환된 벡터
         """
+        cached_embedding = self.embedding_cache.get(text)
+        if cached_embedding is not None:
+            return cached_embedding
+            
         try:
-            embedding = self.model.encode(text)
-            return embedding.reshape(1, -1).astype('float32')
+            embedding = self.model.encode(text).reshape(1, -1).astype('float32')
+            self.embedding_cache.put(text, embedding)
+            return embedding
         except Exception as e:
             logger.error(f"텍스트 임베딩 중 오류 발생: {str(e)}")
             raise
         
-    def _remove_oldest_vector(self) -> None:
+    def _get_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """
-        가장 오래된 벡터를 삭제합니다.
+        여러 텍스트를 벡터로 변환합니다. 캐시에 없는 텍스트만 모아 배치로 인코딩합니다.
+        
+        Args:
+            texts (List[str]): 변환할 텍스트 리스트
+            batch_size (int): 모델 인코딩 배치 크기 (기본값: 32)
+            
+        Returns:
+            np.ndarray: texts와 같은 순서의 (n, dimension) 벡터
         """
-        if not self.metadata_store:
-            return
-
-        # 가장 오래된 ID 찾기
-        oldest_id = min(self.metadata_store.keys(), key=lambda x: int(x))
+        embeddings = np.zeros((len(texts), self.dimension), dtype='float32')
+        missing = []
+        for i, text in enumerate(texts):
+            cached_embedding = self.embedding_cache.get(text)
+            if cached_embedding is not None:
+                embeddings[i] = cached_embedding
+            else:
+                missing.append(i)
         
-        # 메타데이터에서 삭제
-        del self.metadata_store[oldest_id]
+        if missing:
+            try:
+                encoded = self.model.encode([texts[i] for i in missing], batch_size=batch_size)
+            except Exception as e:
+                logger.error(f"텍스트 배치 임베딩 중 오류 발생: {str(e)}")
+                raise
+            for i, embedding in zip(missing, np.asarray(encoded, dtype='float32')):
+                embeddings[i] = embedding
+                self.embedding_cache.put(texts[i], embedding)
         
-        # FAISS 인덱스 재구성
-        if len(self.metadata_store) > 0:
-            # 새로운 인덱스 생성
-            new_index = faiss.IndexFlatL2(self.dimension)
-            
-            # 남은 벡터들을 새 인덱스에 추가
-            remaining_ids = sorted(self.metadata_store.keys(), key=lambda x: int(x))
-            for id in remaining_ids:
-                text = self.metadata_store[id]["text"]
-                vector = self._get_embedding(text)
-                new_index.add(vector)
-            
-            # 기존 인덱스 교체
-            self.index = new_index
-        else:
-            # 모든 벡터가 삭제된 경우 새 인덱스 생성
-            self.index = faiss.IndexFlatL2(self.dimension)
+        return embeddings
+
+    def _evict(self, key: str, reason: str) -> None:
+        """
+        축출 대상 벡터를 삭제하고 WAL에 기록합니다. 호출자는 쓰기 잠금을 잡은 상태여야 합니다.
+        """
+        # 인덱스와 메타데이터에서 삭제 (재임베딩 없이 ID로 제거)
+        self._apply_delete(key)
+        self._journal({"op": "delete", "id": key})
+        self._evicted_keys.append(self._key(key))
+        logger.info(f"벡터가 삭제되었습니다({reason}). ID: {key}")
+
+    def _make_room(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        유효 기간이 지난 항목을 정리하고, entries를 저장해도 최대 저장 개수와 바이트 한도를 넘지 않도록
+        축출 정책이 고른 항목을 삭제합니다. 호출자는 쓰기 잠금을 잡은 상태여야 합니다.
         
-        logger.info(f"가장 오래된 벡터가 삭제되었습니다. ID: {oldest_id}")
+        Args:
+            entries (List[Dict[str, Any]]): 저장할 항목 (이 항목들은 삭제 대상에서 제외)
+        """
+        for key in self.eviction.expired():
+            self._evict(key, "만료")
+        
+        batch_keys = {self._key(entry["id"]) for entry in entries}
+        new_count = sum(1 for key in batch_keys if key not in self.metadata_store)
+        extra_bytes = sum(entry_bytes(entry) for entry in entries) - sum(self.eviction.size_of(key) for key in batch_keys)
+        while self.metadata_store and self.eviction.needs_room(len(self.metadata_store) + new_count,
+                                                               self.max_vectors, extra_bytes):
+            victim = self.eviction.victim(exclude=batch_keys)
+            if victim is None:
+                break
+            self._evict(victim, self.eviction.name)
 
     def store_vector(self, id: int, text: str, metadata: Dict[str, Any]) -> None:
         """
-        벡터를 저장합니다. 최대 저장 개수를 초과하면 가장 오래된 벡터를 삭제합니다.
+        벡터를 저장합니다. 최대 저장 개수나 바이트 한도를 초과하면 축출 정책에 따라 벡터를 삭제합니다.
         
         Args:
             id (int): 벡터 ID
             text (str): 텍스트 데이터
             metadata (Dict[str, Any]): 메타데이터
         """
-        # 최대 저장 개수 확인
-        if len(self.metadata_store) >= self.max_vectors:
-            self._remove_oldest_vector()
-        
-        # 텍스트에서 제목 생성
-        title = self._generate_title(text)
+        # 서식을 제거한 본문에서 제목 생성
+        title = self._generate_title(self.preprocessor.clean(text))
         
         # 제목만 벡터화
         vector = self._get_embedding(title)
+        entry = {"id": id, "text": text, "title": title, "metadata": metadata, "stored_at": time.time()}
         
-        # 벡터 저장
-        self.index.add(vector)
+        with self._lock.write_lock():
+            # 최대 저장 개수와 바이트 한도 확인 (같은 ID를 교체하는 경우는 늘어난 크기만 반영)
+            self._make_room([entry])
+            
+            # 벡터와 메타데이터 저장 (제목 정보 포함)
+            self._apply_store_many([entry], vector)
+            self._maybe_rebuild_index()
+            
+            # 변경분만 기록
+            self._journal(self._store_record(entry, vector))
+            evicted, self._evicted_keys = self._evicted_keys, []
         
-        # 메타데이터 저장 (제목 정보 포함)
-        self.metadata_store[id] = {
-            "text": text,
-            "title": title,
-            "metadata": metadata
-        }
+        self._notify("evict", evicted)
+        self._notify("store", [self._key(id)])
+        
+    def store_vectors_batch(self, records: List[Dict[str, Any]], title_workers: int = 8,
+                            encode_batch_size: int = 32) -> None:
+        """
+        여러 벡터를 한 번에 저장합니다. 제목은 동시에 생성하고, 임베딩은 배치로 계산하며,
+        FAISS 추가와 영속화는 한 번만 수행합니다. 같은 ID가 여러 번 있으면 마지막 항목을 사용합니다.
+        
+        Args:
+            records (List[Dict[str, Any]]): id, text, metadata를 가진 레코드 리스트
+            title_workers (int): 제목 생성 동시 실행 수 (기본값: 8)
+            encode_batch_size (int): 모델 인코딩 배치 크기 (기본값: 32)
+        """
+        # 같은 ID는 마지막 항목만 유지하고, 최대 저장 개수를 넘는 앞부분은 버림
+        records = list({self._key(record["id"]): record for record in records}.values())[-self.max_vectors:]
+        if not records:
+            return
         
-        # 디스크에 저장
-        self._save_to_disk()
+        # 서식을 제거한 본문에서 제목 생성 (네트워크 호출을 동시에 실행)
+        texts = [self.preprocessor.clean(record["text"]) for record in records]
+        with ThreadPoolExecutor(max_workers=max(1, min(title_workers, len(texts)))) as executor:
+            titles = list(executor.map(self._generate_title, texts))
         
-    def get_vector(self, id: int) -> Dict[str, Any]:
+        # 제목만 배치로 벡터화
+        vectors = self._get_embeddings(titles, batch_size=encode_batch_size)
+        
+        stored_at = time.time()
+        entries = [
+            {"id": record["id"], "text": record["text"], "title": title, "metadata": record["metadata"],
+             "stored_at": stored_at}
+            for record, title in zip(records, titles)
+        ]
+        
+        with self._lock.write_lock():
+            # 새로 추가되는 수와 크기만큼 최대 저장 개수와 바이트 한도 확인
+            self._make_room(entries)
+            
+            self._apply_store_many(entries, vectors)
+            self._maybe_rebuild_index()
+            
+            self._journal(*[self._store_record(entry, vector) for entry, vector in zip(entries, vectors)])
+            evicted, self._evicted_keys = self._evicted_keys, []
+        
+        self._notify("evict", evicted)
+        self._notify("store", [self._key(entry["id"]) for entry in entries])
+        logger.info(f"{len(entries)}개의 벡터를 일괄 저장했습니다: {self.storage_dir}")
+
+    def get_vector(self, id: int, include_context: bool = True) -> Dict[str, Any]:
         """
         벡터를 조회합니다.
         
         Args:
             id (int): 벡터 ID
+            include_context (bool): False이면 text와 metadata.context를 넣지 않음 (블롭을 읽지 않음)
             
         Returns:
             Dict[str, Any]: 저장된 벡터 데이터
         """
-        if id not in self.metadata_store:
-            raise KeyError(f"ID {id}에 해당하는 벡터가 존재하지 않습니다.")
-            
-        return self.metadata_store[id]
-        
+        key = self._key(id)
+        with self._lock.read_lock():
+            entry = self.metadata_store.get(key)
+            if entry is None:
+                raise KeyError(f"ID {id}에 해당하는 벡터가 존재하지 않습니다.")
+            entry = self._materialize(entry, include_context)
+        self.eviction.touch(key)
+
+        return entry
+
+    def get_embedding(self, id: int) -> np.ndarray:
+        """
+        저장된 벡터의 임베딩을 조회합니다. 저장된 문서를 쿼리로 사용할 때 제목 생성과 임베딩을 다시 하지 않도록 합니다.
+
+        Args:
+            id (int): 벡터 ID
+
+        Returns:
+            np.ndarray: (1, dimension) 임베딩
+        """
+        with self._lock.read_lock():
+            if self._key(id) not in self.metadata_store:
+                raise KeyError(f"ID {id}에 해당하는 벡터가 존재하지 않습니다.")
+            return self.embeddings.get(id)
+
     def delete_vector(self, id: int) -> None:
         """
         벡터를 삭제합니다.
@@ -215,61 +915,291 @@ class VectorDatabase:
         Args:
             id (int): 벡터 ID
         """
-        if id not in self.metadata_store:
-            raise KeyError(f"ID {id}에 해당하는 벡터가 존재하지 않습니다.")
+        with self._lock.write_lock():
+            if not self._apply_delete(id):
+                raise KeyError(f"ID {id}에 해당하는 벡터가 존재하지 않습니다.")
+            self._maybe_rebuild_index()
+                
+            # 변경 내역 기록
+            self._journal({"op": "delete", "id": id})
+        
+        self._notify("delete", [self._key(id)])
+
+    def add_listener(self, listener: Callable[[str, List[str]], None]) -> None:
+        """
+        벡터가 저장되거나 삭제(축출 포함)된 뒤 호출할 함수를 등록합니다.
+        함수는 쓰기 잠금을 푼 뒤 ("store", "delete" 또는 "evict", 키 리스트)로 호출되므로 검색을 실행해도 됩니다.
+        "evict"는 최대 저장 개수, 바이트 한도, 유효 기간 때문에 축출 정책이 삭제한 항목입니다.
+        
+        Args:
+            listener (Callable[[str, List[str]], None]): 변경 알림을 받을 함수
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, keys: List[str]) -> None:
+        """
+        등록된 함수에 변경을 알립니다. 알림 처리 중의 오류는 저장/삭제 결과에 영향을 주지 않습니다.
+        """
+        if not keys:
+            return
+        for listener in self._listeners:
+            try:
+                listener(event, keys)
+            except Exception as e:
+                logger.error(f"변경 알림 처리 중 오류 발생 ({event}): {str(e)}")
+        
+    def _build_query_text(self, query: str, mode: str = "llm") -> str:
+        """
+        검색 방식에 따라 임베딩할 쿼리 텍스트를 만듭니다.
+        
+        Args:
+            query (str): 검색 쿼리
+            mode (str): 검색 방식 (llm, keywords, fast)
             
-        del self.metadata_store[id]
-        # 디스크에 저장
-        self._save_to_disk()
+        Returns:
+            str: 임베딩할 텍스트
+        """
+        # 서식을 제거한 본문으로 쿼리 구성 (본문이 없으면 원본 사용)
+        query = self.preprocessor.clean(query) or query
+        if mode == "llm":
+            # 쿼리 제목과 쿼리를 결합
+            return f"{self._generate_title(query)} {query}"
+        if mode == "keywords":
+            return f"{extract_keywords(query)} {query}"
+        return query
+
+    def embed_query(self, query: str, mode: str = "llm") -> np.ndarray:
+        """
+        검색 방식에 맞춰 쿼리를 벡터화합니다. 여러 VectorDatabase를 검색할 때 한 번만 계산해 재사용합니다.
         
-    def search_similar(self, query: str, k: int = 5) -> list:
+        Args:
+            query (str): 검색 쿼리
+            mode (str): 쿼리 표현 방식 (llm, keywords, fast)
+            
+        Returns:
+            np.ndarray: (1, dimension) 쿼리 벡터
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"지원하지 않는 검색 방식입니다: {mode}")
+        return self._get_embedding(self._build_query_text(query, mode))
+
+    def search_similar(self, query: str, k: int = 5, mode: str = "llm",
+                       filters: Optional[Dict[str, Any]] = None, include_context: bool = True) -> list:
         """
         유사한 벡터를 검색합니다.
         
         Args:
             query (str): 검색 쿼리
             k (int): 반환할 결과 수
+            mode (str): 쿼리 표현 방식. llm은 LLM 제목을 사용하고, keywords와 fast는
+                네트워크 호출 없이 임베딩합니다. (기본값: llm)
+            filters (Optional[Dict[str, Any]]): 메타데이터 필터 (예: {"volumeId": 3}). 조건에 맞는 항목 안에서만 검색
+            include_context (bool): False이면 결과에 text와 metadata.context를 넣지 않음 (블롭을 읽지 않음)
             
         Returns:
             list: 유사한 벡터들의 메타데이터 리스트
         """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"지원하지 않는 검색 방식입니다: {mode}")
+            
         try:
             if len(self.metadata_store) == 0:
                 return []
 
-            # 쿼리에서 제목 생성
-            query_title = self._generate_title(query)
-            
-            # 쿼리 제목과 원본 쿼리를 결합하여 벡터화
-            combined_query = f"{query_title} {query}"
-            query_vector = self._get_embedding(combined_query)
-            
-            # 실제 저장된 벡터 수에 맞춰 k 값 조정
-            k = min(k, len(self.metadata_store))
-            
-            # 유사도 검색
-            distances, indices = self.index.search(query_vector, k)
+            # 검색 방식에 맞춰 쿼리를 벡터화
+            query_vector = self.embed_query(query, mode)
+        except Exception as e:
+            logger.error(f"유사 벡터 검색 중 오류 발생: {str(e)}")
+            return []
             
-            # 결과 반환
-            results = []
-            metadata_ids = list(self.metadata_store.keys())
+        return self.search_by_vector(query_vector, k, filters, include_context)
+
+    @staticmethod
+    def _exact_search(query_vector: np.ndarray, ids: np.ndarray, vectors: np.ndarray, k: int) -> tuple:
+        """
+        주어진 벡터들과의 제곱 L2 거리를 직접 계산해 가까운 k개를 찾습니다. (n, dimension) 크기의 임시 배열을 만들지 않습니다.
+        
+        Returns:
+            tuple: FAISS search와 같은 형태의 (distances, ids)
+        """
+        query = query_vector.reshape(-1).astype('float32')
+        distances = np.einsum('ij,ij->i', vectors, vectors) - 2 * (vectors @ query) + float(query @ query)
+        np.maximum(distances, 0, out=distances)
+        top = np.argsort(distances)[:k] if len(distances) <= k else np.argpartition(distances, k)[:k]
+        top = top[np.argsort(distances[top])]
+        return distances[top].reshape(1, -1), np.asarray(ids)[top].reshape(1, -1)
+
+    def _search_candidates(self, query_vector: np.ndarray, candidates: set, k: int) -> tuple:
+        """
+        필터 조건에 맞는 후보 ID 안에서만 가까운 벡터를 찾습니다. 호출자는 읽기 잠금을 잡은 상태여야 합니다.
+        후보가 적거나 flat 인덱스이면 저장된 임베딩으로 후보만 정확히 비교하고(후보 수에 비례하는 비용),
+        많으면 FAISS ID 선택자로 학습된 인덱스의 검색 범위를 제한합니다.
+        
+        Returns:
+            tuple: FAISS search와 같은 형태의 (distances, ids)
+        """
+        if (self.index_kind == "flat" or not IndexConfig.supports_selector(self.index_kind)
+                or len(candidates) <= FILTER_EXACT_MAX):
+            ids, vectors = self.embeddings.take(candidates)
+            return self._exact_search(query_vector, ids, vectors, k)
+        
+        rerank = self.index_config.rerank_factor(self.index_kind)
+        search_k = min(k * max(rerank, 1), self.index.ntotal)
+        if self.index_kind == "ivf":
+            params = self.index_config.search_parameters("ivf", faiss.IDSelectorBatch(self._faiss_ids(*candidates)))
+            distances, ids = self.index.search(query_vector, search_k, params=params)
+        else:
+            # ID별 현재 위치만 고르므로 HNSW에 남은 교체 전 벡터는 제외됨
+            id_positions = self._positions_by_id()
+            positions = np.array([id_positions[id] for id in map(int, candidates) if id in id_positions], dtype='int64')
+            distances, ids = self._search_positions(query_vector, search_k, faiss.IDSelectorBatch(positions))
+        return self._rerank(query_vector, ids, k) if rerank else (distances, ids)
+
+    def _search_positions(self, query_vector: np.ndarray, k: int, selector: faiss.IDSelector) -> tuple:
+        """
+        선택자가 고른 내부 인덱스 위치 안에서 검색하고 결과 위치를 파일 ID로 바꿉니다.
+        IndexIDMap2는 검색 파라미터를 지원하지 않으므로 내부 인덱스를 직접 검색합니다.
+        
+        Returns:
+            tuple: FAISS search와 같은 형태의 (distances, ids)
+        """
+        params = self.index_config.search_parameters(self.index_kind, selector)
+        distances, found = faiss.downcast_index(self.index.index).search(query_vector, k, params=params)
+        ids = np.where(found >= 0, faiss.rev_swig_ptr(self.index.id_map.data(), self.index.id_map.size())[found], -1)
+        return distances, ids
+
+    def _positions_by_id(self) -> Dict[int, int]:
+        """
+        저장된 파일 ID별 현재 내부 인덱스 위치를 반환합니다. 인덱스가 재구성되거나 다시 로드되어 바뀐 경우에만
+        ID 매핑 전체로 다시 만들고, 그 외에는 추가/제거할 때 갱신된 캐시를 사용합니다.
+        같은 ID가 여러 위치에 있으면(HNSW) 마지막 위치를 사용하고, 임베딩 저장소에 없는 ID는 제외합니다.
+        """
+        cached = self._id_positions
+        if cached is None or cached[0] is not self.index:
+            id_map = faiss.vector_to_array(self.index.id_map)
+            positions = {int(id): position for position, id in enumerate(id_map)}
+            positions = {id: positions[id] for id in map(int, self.embeddings.ids()) if id in positions}
+            live = np.zeros(len(id_map), dtype=bool)
+            live[np.fromiter(positions.values(), dtype='int64', count=len(positions))] = True
+            cached = (self.index, positions, np.packbits(live, bitorder='little'))
+            self._id_positions = cached
+        return cached[1]
+
+    def _update_positions(self, changes: Dict[int, Optional[int]]) -> None:
+        """
+        위치 캐시와 현재 위치 비트맵을 갱신합니다. 이전 위치는 비트맵에서 빼고, 새 위치(None이면 제거)를 넣습니다.
+        호출자는 쓰기 잠금을 잡은 상태여야 합니다.
+        """
+        index, positions, bits = self._id_positions
+        for id, position in changes.items():
+            previous = positions.pop(id, None)
+            if previous is not None:
+                bits[previous >> 3] &= ~np.uint8(1 << (previous & 7))
+            if position is None:
+                continue
+            if position >> 3 >= len(bits):
+                # 추가할 때마다 복사하지 않도록 두 배로 늘림
+                bits = np.concatenate([bits, np.zeros(max(len(bits), (position >> 3) + 1 - len(bits)), dtype='uint8')])
+            bits[position >> 3] |= np.uint8(1 << (position & 7))
+            positions[id] = position
+        self._id_positions = (index, positions, bits)
+
+    def _live_selector(self) -> faiss.IDSelector:
+        """
+        교체되거나 삭제된 뒤 인덱스에 남은 벡터(HNSW)를 제외하고 현재 위치만 고르는 선택자를 만듭니다.
+        비트맵을 그대로 참조하므로 읽기 잠금을 잡은 동안에만 사용해야 합니다.
+        """
+        self._positions_by_id()
+        return faiss.IDSelectorBitmap(self.index.ntotal, faiss.swig_ptr(self._id_positions[2]))
+
+    def _rerank(self, query_vector: np.ndarray, ids: np.ndarray, k: int) -> tuple:
+        """
+        인덱스가 찾은 후보를 임베딩 저장소의 원본 벡터로 다시 비교해 가까운 k개를 고릅니다.
+        양자화 인덱스의 근사 거리로 인한 순위 오차를 보정합니다. 삭제된 후보는 제외됩니다.
+        
+        Returns:
+            tuple: FAISS search와 같은 형태의 (distances, ids)
+        """
+        found_ids, vectors = self.embeddings.take(dict.fromkeys(int(id) for id in ids[0] if id != -1))
+        return self._exact_search(query_vector, found_ids, vectors, k)
+
+    def search_by_vector(self, query_vector: np.ndarray, k: int = 5,
+                         filters: Optional[Dict[str, Any]] = None, include_context: bool = True,
+                         touch: bool = True) -> list:
+        """
+        이미 계산된 쿼리 벡터로 유사한 벡터를 검색합니다.
+        
+        Args:
+            query_vector (np.ndarray): (1, dimension) 쿼리 벡터
+            k (int): 반환할 결과 수
+            filters (Optional[Dict[str, Any]]): 메타데이터 필터. 필드별 값(또는 값 리스트)이 모두 일치하는 항목만 검색
+            include_context (bool): False이면 결과에 text와 metadata.context를 넣지 않음 (블롭을 읽지 않음)
+            touch (bool): False이면 결과 항목의 사용 시점을 갱신하지 않음. 사용자 요청이 아닌 내부 유지 작업에서 사용
             
-            for i, idx in enumerate(indices[0]):
-                if idx != -1 and idx < len(metadata_ids):  # 유효한 인덱스인지 확인
-                    metadata_id = metadata_ids[idx]
-                    result = {
-                        "id": metadata_id,
-                        "text": self.metadata_store[metadata_id]["text"],
-                        "title": self.metadata_store[metadata_id]["title"],
-                        "metadata": self.metadata_store[metadata_id]["metadata"],
-                        "similarity_score": float(1 / (1 + distances[0][i])),
-                        "fileId": self.metadata_store[metadata_id]["metadata"].get("fileId", None),
-                        "volumeId": self.metadata_store[metadata_id]["metadata"].get("volumeId", None)
-                    }
-                    results.append(result)
+        Returns:
+            list: 유사한 벡터들의 메타데이터 리스트
+        """
+        try:
+            # 검색과 결과 구성은 같은 읽기 잠금 안에서 수행해 변경 도중의 상태를 보지 않도록 함
+            with self._lock.read_lock():
+                if len(self.metadata_store) == 0:
+                    return []
+                
+                candidates = self.attributes.lookup(filters)
+                if candidates is None and self.index is None:
+                    # mmap 모드의 flat 인덱스: 메모리 매핑된 임베딩 저장소로 정확히 검색
+                    distances, ids = self._exact_search(query_vector, self.embeddings.ids(), self.embeddings.vectors(), k)
+                elif candidates is None:
+                    # 실제 저장된 벡터 수에 맞춰 k 값 조정 (재순위 후보만큼 더 검색)
+                    rerank = self.index_config.rerank_factor(self.index_kind)
+                    search_k = min(k * max(rerank, 1), self.index.ntotal)
+                    
+                    if self._stale_count:
+                        # 제거되지 않은 교체 전 벡터가 같은 ID로 반환되지 않도록 현재 위치만 검색
+                        distances, ids = self._search_positions(query_vector, search_k, self._live_selector())
+                    else:
+                        # 유사도 검색 (인덱스가 파일 ID를 그대로 반환)
+                        distances, ids = self.index.search(query_vector, search_k)
+                    if rerank:
+                        distances, ids = self._rerank(query_vector, ids, k)
+                elif not candidates:
+                    return []
+                else:
+                    distances, ids = self._search_candidates(query_vector, candidates, k)
+                
+                # 결과 반환
+                results = []
+                seen = set()
+                
+                for i, faiss_id in enumerate(ids[0]):
+                    metadata_id = self._key(faiss_id)
+                    if faiss_id == -1 or metadata_id in seen:
+                        continue
+                    entry = self.metadata_store.get(metadata_id)
+                    if entry is not None:  # 유효한 ID인지 확인
+                        seen.add(metadata_id)
+                        entry = self._materialize(entry, include_context)
+                        result = {
+                            "id": metadata_id,
+                            "title": entry["title"],
+                            "metadata": entry["metadata"],
+                            "similarity_score": float(1 / (1 + distances[0][i])),
+                            "fileId": entry["metadata"].get("fileId", None),
+                            "volumeId": entry["metadata"].get("volumeId", None)
+                        }
+                        if include_context:
+                            result["text"] = entry["text"]
+                        results.append(result)
+                        if touch:
+                            self.eviction.touch(metadata_id)
+                        if len(results) == k:
+                            break
             
             return results
             
+        except ValueError:
+            # 지원하지 않는 필터 필드
+            raise
         except Exception as e:
             logger.error(f"유사 벡터 검색 중 오류 발생: {str(e)}")
             return [] 
\ No newline at end of file
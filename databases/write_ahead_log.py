@@ -0,0 +1,214 @@
+import base64
+import json
+import logging
+import os
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def encode_vector(vector: np.ndarray) -> str:
+    """
+    벡터를 WAL 레코드에 기록할 수 있도록 base64 문자열로 변환합니다.
+
+    Args:
+        vector (np.ndarray): 변환할 벡터
+
+    Returns:
+        str: float32 바이트를 base64로 인코딩한 문자열
+    """
+    return base64.b64encode(np.ascontiguousarray(vector, dtype='float32').tobytes()).decode('ascii')
+
+
+def decode_vector(data: str) -> np.ndarray:
+    """
+    base64 문자열을 (1, dimension) 형태의 float32 벡터로 복원합니다.
+
+    Args:
+        data (str): encode_vector로 인코딩된 문자열
+
+    Returns:
+        np.ndarray: 복원된 벡터
+    """
+    return np.frombuffer(base64.b64decode(data), dtype='float32').reshape(1, -1).copy()
+
+
+class WriteAheadLog:
+    """
+    벡터 데이터베이스의 변경 내역을 한 줄에 하나씩 기록하는 추가 전용(append-only) 로그입니다.
+
+    각 레코드는 단조 증가하는 seq 번호를 가지며, 체크포인트가 반영한 seq 이후의
+    레코드만 복구 시 다시 적용됩니다. 기록은 path 파일(현재 세그먼트)에 추가되고, 체크포인트 스냅샷 시점에
+    rotate()로 현재 세그먼트를 "path.<마지막 seq>" 파일로 닫은 뒤, 체크포인트가 기록되면
+    remove_through()로 반영된 세그먼트 파일을 통째로 삭제합니다. 로그를 다시 읽거나 쓰지 않습니다.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        """
+        Args:
+            path (str): 현재 세그먼트 파일 경로. 닫힌 세그먼트는 같은 디렉토리의 "path.<마지막 seq>" 파일
+            fsync (bool): 레코드마다 os.fsync를 호출할지 여부 (기본값: False)
+        """
+        self.path = path
+        self.fsync = fsync
+        self.last_seq = 0
+        self.pending = 0
+        self._file = None
+        # 현재 세그먼트의 레코드 수와, 닫힌 세그먼트별 (마지막 seq, 레코드 수)
+        self._segment_records = 0
+        self._sealed: Dict[str, Tuple[int, int]] = {}
+
+    def _sealed_segments(self) -> List[Tuple[int, str]]:
+        """
+        디스크에 남아 있는 닫힌 세그먼트를 (마지막 seq, 경로) 형태로 오래된 순서대로 반환합니다.
+        """
+        directory, name = os.path.split(self.path)
+        segments = []
+        for file_name in os.listdir(directory or '.'):
+            suffix = file_name[len(name) + 1:]
+            if file_name.startswith(f"{name}.") and suffix.isdigit():
+                segments.append((int(suffix), os.path.join(directory, file_name)))
+        return sorted(segments)
+
+    def _read_segment(self, path: str, after_seq: int, records: List[Dict[str, Any]]) -> int:
+        """
+        세그먼트 파일에서 after_seq 이후의 레코드를 records에 추가합니다.
+        마지막 줄이 기록 도중 끊긴 경우 해당 줄은 버리고 파일을 잘라냅니다.
+
+        Returns:
+            int: 세그먼트의 유효한 레코드 수
+        """
+        count = 0
+        valid_size = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    logger.warning(f"손상된 WAL 레코드를 발견하여 이후 내용을 버립니다: {path}")
+                    break
+                valid_size += len(line)
+                count += 1
+                seq = record.get("seq", 0)
+                if seq > after_seq:
+                    records.append(record)
+                    self.last_seq = max(self.last_seq, seq)
+
+        if valid_size < os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(valid_size)
+        return count
+
+    def recover(self, after_seq: int) -> List[Dict[str, Any]]:
+        """
+        닫힌 세그먼트와 현재 세그먼트를 차례로 읽어 체크포인트 이후의 레코드를 반환하고 추가 기록을 위해 현재 세그먼트를 엽니다.
+        체크포인트에 이미 반영된 닫힌 세그먼트는 삭제합니다.
+
+        Args:
+            after_seq (int): 체크포인트에 이미 반영된 마지막 seq
+
+        Returns:
+            List[Dict[str, Any]]: 다시 적용해야 할 레코드 리스트
+        """
+        records = []
+        self.last_seq = after_seq
+        self._sealed = {}
+
+        for segment_seq, path in self._sealed_segments():
+            if segment_seq <= after_seq:
+                # 체크포인트를 기록한 뒤 삭제하기 전에 중단된 세그먼트
+                os.remove(path)
+                continue
+            before = len(records)
+            self._read_segment(path, after_seq, records)
+            self._sealed[path] = (segment_seq, len(records) - before)
+
+        self._segment_records = 0
+        if os.path.exists(self.path):
+            self._segment_records = self._read_segment(self.path, after_seq, records)
+
+        self.pending = len(records)
+        self._file = open(self.path, 'ab')
+        if records:
+            logger.info(f"WAL에서 {len(records)}개의 레코드를 복구합니다: {self.path}")
+        return records
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        레코드에 seq 번호를 부여하여 로그 끝에 기록합니다.
+
+        Args:
+            record (Dict[str, Any]): 기록할 레코드 (JSON 직렬화 가능해야 함)
+
+        Returns:
+            int: 부여된 seq 번호
+        """
+        return self.append_many([record])
+
+    def append_many(self, records: List[Dict[str, Any]]) -> int:
+        """
+        여러 레코드를 한 번의 쓰기와 flush로 기록합니다.
+
+        Args:
+            records (List[Dict[str, Any]]): 기록할 레코드 리스트
+
+        Returns:
+            int: 마지막으로 부여된 seq 번호
+        """
+        if self._file is None:
+            raise RuntimeError(f"WAL이 열려 있지 않습니다: {self.path}")
+
+        lines = []
+        for record in records:
+            self.last_seq += 1
+            lines.append(json.dumps({"seq": self.last_seq, **record}, ensure_ascii=False, separators=(',', ':')))
+        self._file.write("".join(f"{line}\n" for line in lines).encode('utf-8'))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.pending += len(records)
+        self._segment_records += len(records)
+        return self.last_seq
+
+    def rotate(self) -> None:
+        """
+        현재 세그먼트를 닫아 "path.<마지막 seq>"로 옮기고 새 세그먼트를 엽니다. 체크포인트 스냅샷 시점에
+        기록과 동시에 실행되지 않도록 잠금 안에서 호출하며, 파일 이름만 바꾸므로 로그 크기와 관계없이 빠릅니다.
+        """
+        if self._file is None or self._segment_records == 0:
+            return
+
+        self._file.close()
+        sealed_path = f"{self.path}.{self.last_seq:012d}"
+        os.replace(self.path, sealed_path)
+        self._sealed[sealed_path] = (self.last_seq, self._segment_records)
+        self._segment_records = 0
+        self._file = open(self.path, 'ab')
+
+    def remove_through(self, seq: int) -> None:
+        """
+        체크포인트에 반영된 seq 이하의 레코드만 담은 닫힌 세그먼트를 삭제합니다.
+        현재 세그먼트와 체크포인트를 쓰는 동안 추가된 레코드는 그대로 남습니다.
+
+        Args:
+            seq (int): 체크포인트에 반영된 마지막 seq
+        """
+        for path, (segment_seq, count) in list(self._sealed.items()):
+            if segment_seq > seq:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            del self._sealed[path]
+            self.pending -= count
+
+    def close(self) -> None:
+        """
+        WAL 파일을 닫습니다.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
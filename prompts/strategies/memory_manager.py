@@ -5,6 +5,7 @@ import json
 import os
 import logging
 from pathlib import Path
+from databases.checkpoint_scheduler import CheckpointScheduler, atomic_write
 
 logger = logging.getLogger(__name__)
 
@@ -16,14 +17,17 @@ class MemoryManager:
     _memory = None
     _base_dir = None
     _memory_file = None
+    _checkpointer = None
 
     @classmethod
-    def initialize(cls, base_dir: Optional[str] = None):
+    def initialize(cls, base_dir: Optional[str] = None, save_interval: float = 2.0, save_every: int = 20):
         """
         메모리 매니저를 초기화합니다.
         
         Args:
             base_dir (Optional[str]): 메모리 저장 기본 디렉토리. 없으면 기본값 사용
+            save_interval (float): 메시지 추가 후 파일 저장까지 기다리는 최대 시간(초) (기본값: 2.0)
+            save_every (int): 바로 저장할 추가 메시지 수 (기본값: 20)
         """
         if base_dir:
             cls._base_dir = Path(base_dir)
@@ -33,6 +37,11 @@ class MemoryManager:
         
         cls._memory_file = cls._base_dir / "memory.json"
         
+        # 메시지마다 파일 전체를 다시 쓰지 않도록 변경을 모아 저장
+        if cls._checkpointer is not None:
+            cls._checkpointer.close()
+        cls._checkpointer = CheckpointScheduler(cls._save_memory, interval=save_interval, max_dirty=save_every, name="memory")
+        
         # 메모리 저장 디렉토리 생성
         cls._base_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"메모리 디렉토리가 생성되었습니다: {cls._base_dir}")
@@ -102,22 +111,22 @@ class MemoryManager:
     @classmethod
     def _save_memory(cls):
         """
-        현재 메모리를 저장합니다.
+        현재 메모리를 저장합니다. 임시 파일에 쓴 뒤 교체하므로 저장 중 중단되어도 기존 파일이 남습니다.
         """
         try:
             # 메모리 데이터를 JSON 형식으로 변환
             memory_data = []
-            for message in cls._memory.chat_memory.messages:
+            for message in list(cls._memory.chat_memory.messages):
                 memory_data.append({
                     'type': message.type,
                     'content': message.content
                 })
             # 메모리 파일에 저장
-            with open(cls._memory_file, 'w', encoding='utf-8') as f:
-                json.dump(memory_data, f, ensure_ascii=False, indent=2)
+            atomic_write(str(cls._memory_file), json.dumps(memory_data, ensure_ascii=False, indent=2))
             logger.info(f"메모리를 성공적으로 저장했습니다: {cls._memory_file}")
         except Exception as e:
             logger.error(f"메모리 저장 중 오류 발생: {str(e)}")
+            raise
 
     @classmethod
     def add_message(cls, message: BaseMessage):
@@ -130,7 +139,15 @@ class MemoryManager:
         if cls._instance is None:
             cls()
         cls._memory.chat_memory.add_message(message)
-        cls._save_memory()
+        cls._checkpointer.mark_dirty()
+
+    @classmethod
+    def close(cls):
+        """
+        저장되지 않은 메시지를 파일에 기록합니다. 서버 종료 시 호출됩니다.
+        """
+        if cls._checkpointer is not None:
+            cls._checkpointer.close()
 
     @classmethod
     def get_messages(cls) -> List[BaseMessage]:
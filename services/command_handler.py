@@ -3,8 +3,9 @@ import html
 import logging
 import base64
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .vector_db_service import VectorDBService
+from .indexing_queue import IndexingQueue
 from databases.vector_database import VectorDatabase
 from prompts.prompt_factory import PromptFactory
 import codecs
@@ -12,10 +13,42 @@ import unicodedata
 
 logger = logging.getLogger(__name__)
 
+# 명령어별 기본 유사도 검색 방식 (메시지의 search_mode로 재정의 가능)
+# LLM 제목 생성 없이 임베딩만으로 검색해 응답 지연을 줄인다
+DEFAULT_SEARCH_MODES = {
+    'request_prompt': 'fast',       # 파일 형식별 예시 검색
+    'get_workflows': 'keywords'     # 유사 워크플로우 검색
+}
+
 class CommandHandler:
-    def __init__(self, vector_db_service: VectorDBService, prompt_factory: PromptFactory):
+    def __init__(self, vector_db_service: VectorDBService, prompt_factory: PromptFactory,
+                 indexing_queue: Optional[IndexingQueue] = None):
         self.vector_db_service = vector_db_service
         self.prompt_factory = prompt_factory
+        # 지정되면 프로그램 정보 저장을 백그라운드에서 처리 (없으면 요청 처리 중에 바로 저장)
+        self.indexing_queue = indexing_queue
+
+    def _index_program(self, program: Dict[str, Any]) -> None:
+        """프로그램 정보를 인덱싱 큐에 넣거나, 큐가 없으면 바로 벡터 DB에 저장"""
+        if self.indexing_queue is not None:
+            self.indexing_queue.submit(
+                file_id=program.get('fileId'),
+                file_type=program.get('fileType'),
+                context=program.get('context'),
+                volume_id=program.get('volumeId')
+            )
+        else:
+            self.vector_db_service.store_program_info(
+                file_id=program.get('fileId'),
+                file_type=program.get('fileType'),
+                context=program.get('context'),
+                volume_id=program.get('volumeId')
+            )
+
+    @staticmethod
+    def _search_mode(message: Dict[str, Any]) -> str:
+        """메시지에 지정된 검색 방식, 없으면 명령어별 기본 검색 방식을 반환"""
+        return message.get('search_mode') or DEFAULT_SEARCH_MODES.get(message.get('command'), 'llm')
 
     def handle_command(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -107,13 +140,8 @@ class CommandHandler:
                 current_file_type = current_program.get('fileType', '').lower()
                 if current_file_type != 'Text':  # text 타입은 vector DB 저장 안함
                     try:
-                        self.vector_db_service.store_program_info(
-                            file_id=current_program.get('fileId'),
-                            file_type=current_program.get('fileType'),
-                            context=current_program.get('context'),
-                            volume_id=current_program.get('volumeId')
-                        )
-                        logger.info(f"현재 프로그램 정보를 vector DB에 저장했습니다 - FileID: {current_program.get('fileId')}, FileType: {current_program.get('fileType')}")
+                        self._index_program(current_program)
+                        logger.info(f"현재 프로그램 정보를 vector DB 저장 요청했습니다 - FileID: {current_program.get('fileId')}, FileType: {current_program.get('fileType')}")
                     except Exception as e:
                         logger.warning(f"Vector DB 저장 실패 (계속 진행): {str(e)}")
                 else:
@@ -124,13 +152,8 @@ class CommandHandler:
                 target_file_type = content.get('target_program').get('fileType', '').lower()
                 if target_file_type != 'Text':  # Text 타입은 vector DB 저장 안함
                     try:
-                        self.vector_db_service.store_program_info(
-                            file_id=content.get('target_program').get('fileId'),
-                            file_type=content.get('target_program').get('fileType'),
-                            context=content.get('target_program').get('context'),
-                            volume_id=content.get('target_program').get('volumeId')
-                        )
-                        logger.info(f"대상 프로그램 정보를 vector DB에 저장했습니다 - FileID: {content.get('target_program').get('fileId')}, FileType: {content.get('target_program').get('fileType')}")
+                        self._index_program(content.get('target_program'))
+                        logger.info(f"대상 프로그램 정보를 vector DB 저장 요청했습니다 - FileID: {content.get('target_program').get('fileId')}, FileType: {content.get('target_program').get('fileType')}")
                     except Exception as e:
                         logger.warning(f"Vector DB 저장 실패 (계속 진행): {str(e)}")
                 else:
@@ -146,7 +169,8 @@ class CommandHandler:
                     similar_examples = self.vector_db_service.search_similar_programs(
                         query=f"fileType:{file_type}",
                         file_type=file_type,
-                        k=3
+                        k=3,
+                        mode=self._search_mode(message)
                     )
                     examples = [example.get('context', '') for example in similar_examples]
             
@@ -248,20 +272,39 @@ class CommandHandler:
                 }
 
             # 일반 파일 처리
-            # 벡터 데이터베이스에 프로그램 정보 저장
-            self.vector_db_service.store_program_info(
+            # 저장된 내용이 최신이면 저장된 임베딩을 검색 쿼리로 재사용 (현재 프로그램 자신은 제외)
+            similar_programs = None
+            current = self.vector_db_service.is_program_current(
                 file_id=multi_file_id,
                 file_type=multi_file_type,
                 context=multi_file_context,
                 volume_id=multi_volume_id
             )
-            
-            # 유사한 프로그램 검색
-            similar_programs = self.vector_db_service.search_similar_programs(
-                query=multi_file_context,
-                file_type=request_file_type,
-                k=5
-            )
+            if current:
+                similar_programs = self.vector_db_service.search_similar_to_program(
+                    file_id=multi_file_id,
+                    file_type=multi_file_type,
+                    k=5,
+                    search_file_type=request_file_type
+                )
+            if similar_programs is None:
+                # 내용이 바뀌었거나 저장되지 않은 경우 LLM 호출 없이 컨텍스트로 검색
+                # (저장된 예전 내용의 현재 프로그램이 결과에 나올 수 있으므로 하나 더 찾아 제외)
+                similar_programs = self.vector_db_service.search_similar_programs(
+                    query=multi_file_context,
+                    file_type=request_file_type,
+                    k=6,
+                    mode=self._search_mode(message),
+                    include_context=False
+                )
+                similar_programs = [
+                    program for program in similar_programs
+                    if not (str(program['fileId']) == str(multi_file_id)
+                            and str(program['metadata'].get('type', '')).lower() == multi_file_type.lower())
+                ][:5]
+            if not current:
+                # 저장은 검색이 끝난 뒤 인덱싱 큐에서 처리
+                self._index_program(content['current_program'])
             
             # 유사한 프로그램의 ID 리스트 추출
             similar_program_ids = [[program['fileId'], program['volumeId']] for program in similar_programs]
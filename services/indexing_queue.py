@@ -0,0 +1,223 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .vector_db_service import VectorDBService, SUPPORTED_FILE_TYPES
+
+logger = logging.getLogger(__name__)
+
+
+class IndexingQueue:
+    """
+    프로그램 정보 저장(제목 생성, 임베딩, 영속화)을 요청 처리 경로 밖에서 실행하는 백그라운드 큐입니다.
+
+    같은 (파일 타입, fileId)에 대한 작업이 처리 전에 다시 들어오면 최신 내용으로 합치고(coalesce)
+    큐에서의 순서는 유지합니다. 큐가 가득 차면 가장 오래된 작업을 버립니다. 버려진 문서는
+    다음 요청에서 다시 저장됩니다. 작업자 스레드는 대기 중인 작업을 묶어 store_program_infos로
+    일괄 저장하고, 일괄 저장이 실패하면 한 건씩 다시 저장해 실패한 문서만 버립니다.
+    """
+
+    def __init__(self, vector_db_service: VectorDBService, max_pending: int = 1000, batch_size: int = 32):
+        """
+        Args:
+            vector_db_service (VectorDBService): 저장을 수행할 벡터 DB 서비스
+            max_pending (int): 대기 가능한 최대 작업 수 (기본값: 1000)
+            batch_size (int): 한 번에 저장할 최대 작업 수 (기본값: 32)
+        """
+        self.vector_db_service = vector_db_service
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+
+        # (파일 타입, fileId) -> 작업. 삽입 순서가 처리 순서
+        self._pending: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._cond = threading.Condition()
+        # 작업자가 꺼내 저장 중인 작업의 키
+        self._in_flight: Set[Tuple[str, str]] = set()
+        self._closed = False
+
+        # 통계
+        self._submitted = 0
+        self._processed = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._failed = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
+        self._worker = threading.Thread(target=self._run, name="vector-db-indexing", daemon=True)
+        self._worker.start()
+
+    @staticmethod
+    def _job_key(file_type: str, file_id: Any) -> Tuple[str, str]:
+        return file_type.lower(), str(file_id)
+
+    def submit(self, file_id: int, file_type: str, context: str, volume_id: int) -> bool:
+        """
+        프로그램 정보 저장 작업을 큐에 넣고 바로 반환합니다.
+
+        Args:
+            file_id (int): 파일 ID
+            file_type (str): 파일 타입 (excel, word, hwp, powerpoint)
+            context (str): 파일 컨텍스트
+            volume_id (int): 볼륨 ID
+
+        Returns:
+            bool: 큐에 들어갔으면 True. text 타입이나 지원하지 않는 타입, 종료된 큐는 False
+        """
+        file_type = file_type or ''
+        if file_type.lower() not in SUPPORTED_FILE_TYPES:
+            logger.info(f"벡터 DB에 저장하지 않는 파일 타입입니다 - FileID: {file_id}, FileType: {file_type}")
+            return False
+
+        key = self._job_key(file_type, file_id)
+        job = {"fileId": file_id, "fileType": file_type, "context": context, "volumeId": volume_id}
+
+        with self._cond:
+            if self._closed:
+                logger.warning(f"종료된 인덱싱 큐에는 작업을 넣을 수 없습니다 - FileID: {file_id}")
+                return False
+
+            self._submitted += 1
+            existing = self._pending.get(key)
+            if existing is not None:
+                # 처리 전인 같은 문서는 최신 내용으로 교체 (지연 시간은 처음 들어온 시점 기준)
+                job["enqueued_at"] = existing["enqueued_at"]
+                self._pending[key] = job
+                self._coalesced += 1
+            else:
+                if len(self._pending) >= self.max_pending:
+                    dropped_key, _ = self._pending.popitem(last=False)
+                    self._dropped += 1
+                    logger.warning(f"인덱싱 큐가 가득 차 가장 오래된 작업을 버립니다: {dropped_key}")
+                job["enqueued_at"] = time.monotonic()
+                self._pending[key] = job
+            self._cond.notify_all()
+        return True
+
+    def discard(self, file_type: str, file_id: Any, timeout: Optional[float] = 30) -> bool:
+        """
+        아직 처리되지 않은 작업을 큐에서 제거하고, 같은 문서를 작업자가 저장 중이면 끝날 때까지 기다립니다.
+        호출 후 바로 저장하는 최신 내용이 처리 중이던 예전 내용으로 덮어써지지 않도록 합니다.
+
+        Args:
+            file_type (str): 파일 타입
+            file_id (Any): 파일 ID
+            timeout (Optional[float]): 저장 중인 작업을 기다릴 최대 시간(초). None이면 끝날 때까지 대기 (기본값: 30)
+
+        Returns:
+            bool: 제거된 작업이 있었으면 True
+        """
+        key = self._job_key(file_type, file_id)
+        with self._cond:
+            removed = self._pending.pop(key, None) is not None
+            if removed:
+                self._cond.notify_all()
+            if not self._cond.wait_for(lambda: key not in self._in_flight, timeout):
+                logger.warning(f"처리 중인 인덱싱 작업이 {timeout}초 안에 끝나지 않았습니다: {key}")
+            return removed
+
+    def _run(self) -> None:
+        """
+        대기 중인 작업을 묶어 저장하는 작업자 루프입니다. 종료 요청 후에도 남은 작업을 모두 처리합니다.
+        """
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                items = [self._pending.popitem(last=False) for _ in range(min(self.batch_size, len(self._pending)))]
+                self._in_flight = {key for key, _ in items}
+                jobs = [job for _, job in items]
+
+            failed = self._store(jobs)
+
+            now = time.monotonic()
+            lag = max(now - job["enqueued_at"] for job in jobs)
+            with self._cond:
+                self._in_flight = set()
+                self._processed += len(jobs) - failed
+                self._failed += failed
+                self._last_lag = lag
+                self._max_lag = max(self._max_lag, lag)
+                self._cond.notify_all()
+
+    def _store(self, jobs: List[Dict[str, Any]]) -> int:
+        """
+        작업들을 일괄 저장합니다. 일괄 저장이 실패하면 한 건씩 다시 저장해, 문제가 있는 문서 때문에
+        같은 묶음의 다른 문서까지 버려지지 않도록 합니다. (이미 저장된 문서는 내용이 같아 건너뜀)
+
+        Returns:
+            int: 저장에 실패한 작업 수
+        """
+        try:
+            self.vector_db_service.store_program_infos(jobs)
+            return 0
+        except Exception as e:
+            logger.error(f"백그라운드 일괄 인덱싱 중 오류 발생 ({len(jobs)}개), 한 건씩 다시 저장합니다: {str(e)}")
+
+        failed = 0
+        for job in jobs:
+            try:
+                self.vector_db_service.store_program_info(
+                    file_id=job["fileId"], file_type=job["fileType"], context=job["context"], volume_id=job["volumeId"])
+            except Exception as e:
+                # 오류는 서비스에서 기록됨. 다음 요청에서 같은 문서가 다시 저장됨
+                logger.error(f"백그라운드 인덱싱 실패 - FileID: {job['fileId']}, FileType: {job['fileType']}: {str(e)}")
+                failed += 1
+        return failed
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        현재 대기 중인 작업이 모두 처리될 때까지 기다립니다.
+
+        Args:
+            timeout (Optional[float]): 최대 대기 시간(초). None이면 끝날 때까지 대기
+
+        Returns:
+            bool: 모두 처리되었으면 True
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        큐 깊이와 지연 시간 통계를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: depth(대기 작업 수), in_flight, oldest_pending_seconds(가장 오래 기다린 작업의 대기 시간),
+                last_lag_seconds / max_lag_seconds(제출부터 저장 완료까지), 누적 처리/합침/버림/실패 수
+        """
+        with self._cond:
+            now = time.monotonic()
+            oldest = next(iter(self._pending.values()), None)
+            return {
+                "depth": len(self._pending),
+                "in_flight": len(self._in_flight),
+                "oldest_pending_seconds": round(now - oldest["enqueued_at"], 3) if oldest else 0.0,
+                "last_lag_seconds": round(self._last_lag, 3),
+                "max_lag_seconds": round(self._max_lag, 3),
+                "submitted": self._submitted,
+                "processed": self._processed,
+                "coalesced": self._coalesced,
+                "dropped": self._dropped,
+                "failed": self._failed
+            }
+
+    def close(self, timeout: Optional[float] = 30) -> None:
+        """
+        새 작업을 받지 않고, 남은 작업을 모두 저장한 뒤 작업자 스레드를 종료합니다.
+
+        Args:
+            timeout (Optional[float]): 작업자 종료 대기 시간(초) (기본값: 30)
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
+        if self._worker.is_alive():
+            logger.warning(f"인덱싱 큐를 {timeout}초 안에 비우지 못했습니다. 남은 작업: {len(self._pending)}개")
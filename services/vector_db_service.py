@@ -1,31 +1,82 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Optional
+import functools
+import hashlib
+import heapq
+import itertools
 import logging
-from databases.vector_database import VectorDatabase
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from databases.vector_database import VectorDatabase, EMBEDDING_MODEL_NAME
+from databases.title_cache import TitleCache
+from databases.embedding_cache import EmbeddingCache
+from databases.text_processing import TextPreprocessor
+from databases.near_duplicate import NearDuplicateIndex
+from databases.neighbor_graph import NeighborGraph, node_key
 import os
 import json
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# 벡터 DB를 지원하는 파일 타입
+SUPPORTED_FILE_TYPES = ('excel', 'word', 'hwp', 'powerpoint')
+
 class VectorDBService:
-    def __init__(self, storage_dir: str = "vector_db", max_vectors: int = 1000):
+    def __init__(self, storage_dir: str = "vector_db", max_vectors: int = 1000,
+                 index_configs: Optional[Dict[str, Any]] = None, eviction: Optional[Any] = None,
+                 open_mode: str = "memory", metadata_backend: str = "sqlite",
+                 near_duplicate_threshold: Optional[float] = 0.95, neighbor_graph_size: Optional[int] = 16):
         """
         VectorDBService를 초기화합니다.
         
         Args:
             storage_dir (str): 벡터 데이터베이스 저장 디렉토리 (기본값: "vector_db")
             max_vectors (int): 최대 저장 벡터 수 (기본값: 1000)
+            index_configs (Optional[Dict[str, Any]]): 파일 타입별 인덱스 설정
+                (예: {"word": {"index_type": "ivf", "nlist": 256, "nprobe": 16}}). 없는 타입은 flat
+            eviction (Optional[Any]): 파일 타입별 VectorDB에 적용할 축출 정책 이름 또는 설정 딕셔너리
+                (예: "lru", {"policy": "ttl", "ttl_seconds": 86400, "max_bytes": 50000000}). 기본값은 lru
+            open_mode (str): 저장된 인덱스를 여는 방식 (memory, mmap). mmap은 시작이 빠르고
+                같은 호스트의 여러 프로세스가 인덱스 페이지를 공유합니다. (기본값: memory)
+            metadata_backend (str): 메타데이터 저장 방식 (sqlite, json). sqlite는 항목 단위로 갱신하며
+                기존 metadata.json은 처음 열 때 옮겨집니다. (기본값: sqlite)
+            near_duplicate_threshold (Optional[float]): 이 SimHash 유사도 이상인 문서는 새로 인덱싱하지 않고
+                기존 대표 문서의 사본으로 연결하며, 검색 결과에서도 하나로 묶습니다. None이면 사용하지 않음 (기본값: 0.95)
+            neighbor_graph_size (Optional[int]): 문서마다 대상 타입별로 미리 계산해 둘 유사 문서 수.
+                저장된 파일 기준 검색(get_workflows)이 이 그래프를 읽습니다. None이면 사용하지 않음 (기본값: 16)
         """
         self.storage_dir = storage_dir
         # 저장 디렉토리가 없으면 생성
         os.makedirs(storage_dir, exist_ok=True)
         
-        # 파일 타입별 VectorDB 초기화
-        self._vector_dbs = {
-            'excel': VectorDatabase(storage_dir=os.path.join(storage_dir, "excel_db"), max_vectors=max_vectors),
-            'word': VectorDatabase(storage_dir=os.path.join(storage_dir, "word_db"), max_vectors=max_vectors),
-            'hwp': VectorDatabase(storage_dir=os.path.join(storage_dir, "hwp_db"), max_vectors=max_vectors),
-            'powerpoint': VectorDatabase(storage_dir=os.path.join(storage_dir, "powerpoint_db"), max_vectors=max_vectors)
-        }
+        # 모든 파일 타입이 공유하는 제목 캐시 (재시작 후에도 유지)
+        self._title_cache = TitleCache(os.path.join(storage_dir, "title_cache.json"))
+        
+        # 모든 파일 타입이 공유하는 임베딩 캐시 (메모리 + 디스크)
+        self._embedding_cache = EmbeddingCache(os.path.join(storage_dir, "embedding_cache"), EMBEDDING_MODEL_NAME)
+        
+        # 모든 파일 타입이 공유하는 서식 제거 전처리기 (결과를 내용 해시별로 보관)
+        self._preprocessor = TextPreprocessor()
+        
+        # 파일 타입별 VectorDB는 처음 사용할 때 연다 (임베딩 모델은 모든 타입이 공유)
+        self.max_vectors = max_vectors
+        self.index_configs = {db_type.lower(): config for db_type, config in (index_configs or {}).items()}
+        self.eviction = eviction
+        self.open_mode = open_mode
+        self.metadata_backend = metadata_backend
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._vector_dbs: Dict[str, VectorDatabase] = {}
+        self._duplicates: Dict[str, NearDuplicateIndex] = {}
+        self._open_lock = threading.Lock()
+        
+        # 모든 파일 타입에 걸친 문서별 유사 문서 그래프 (저장/삭제/축출 시 갱신)
+        self._neighbors: Optional[NeighborGraph] = None
+        if neighbor_graph_size is not None:
+            self._neighbors = NeighborGraph(os.path.join(storage_dir, "neighbors.db"), size=neighbor_graph_size)
+        self._neighbor_lock = threading.Lock()
+        
+        # 전체 타입 검색 시 타입별 FAISS 검색을 동시에 실행하는 스레드 풀
+        self._search_executor = ThreadPoolExecutor(max_workers=len(SUPPORTED_FILE_TYPES), thread_name_prefix="vector-search")
         logger.debug(f"VectorDBService 초기화 완료. 저장 디렉토리: {storage_dir}, 최대 벡터 수: {max_vectors}")
 
     def _get_db_by_type(self, file_type: str) -> VectorDatabase:
@@ -44,14 +95,226 @@ class VectorDBService:
         if normalized_type == 'text':
             raise ValueError(f"Text 파일 타입은 벡터 DB를 지원하지 않습니다: {file_type}")
             
-        if normalized_type not in self._vector_dbs:
+        if normalized_type not in SUPPORTED_FILE_TYPES:
             raise ValueError(f"지원하지 않는 파일 타입입니다: {file_type}")
-        return self._vector_dbs[normalized_type]
+        
+        vector_db = self._vector_dbs.get(normalized_type)
+        if vector_db is None:
+            with self._open_lock:
+                vector_db = self._vector_dbs.get(normalized_type)
+                if vector_db is None:
+                    vector_db = VectorDatabase(
+                        storage_dir=self._db_dir(normalized_type),
+                        max_vectors=self.max_vectors,
+                        title_cache=self._title_cache,
+                        embedding_cache=self._embedding_cache,
+                        preprocessor=self._preprocessor,
+                        index_config=self.index_configs.get(normalized_type),
+                        eviction=self.eviction,
+                        open_mode=self.open_mode,
+                        metadata_backend=self.metadata_backend
+                    )
+                    if self._neighbors is not None:
+                        vector_db.add_listener(functools.partial(self._on_vectors_changed, normalized_type))
+                    if self.near_duplicate_threshold is not None:
+                        vector_db.add_listener(functools.partial(self._on_canonicals_evicted, normalized_type))
+                    self._vector_dbs[normalized_type] = vector_db
+                    logger.info(f"파일 타입 {normalized_type}의 벡터 DB를 열었습니다.")
+        return vector_db
+
+    def _get_duplicates(self, file_type: str) -> Optional[NearDuplicateIndex]:
+        """
+        파일 타입의 중복 문서 색인을 반환합니다. 처음 사용할 때 벡터 DB의 지문으로 만듭니다.
+        
+        Returns:
+            Optional[NearDuplicateIndex]: 중복 문서 색인. 중복 감지를 사용하지 않으면 None
+        """
+        if self.near_duplicate_threshold is None:
+            return None
+        normalized_type = file_type.lower()
+        duplicates = self._duplicates.get(normalized_type)
+        if duplicates is None:
+            vector_db = self._get_db_by_type(normalized_type)
+            with self._open_lock:
+                duplicates = self._duplicates.get(normalized_type)
+                if duplicates is None:
+                    duplicates = NearDuplicateIndex(os.path.join(self._db_dir(normalized_type), "aliases.db"),
+                                                    threshold=self.near_duplicate_threshold)
+                    duplicates.rebuild(vector_db.metadata_store.items())
+                    self._duplicates[normalized_type] = duplicates
+        return duplicates
+
+    def _db_dir(self, db_type: str) -> str:
+        """
+        파일 타입별 VectorDB 저장 디렉토리를 반환합니다.
+        """
+        return os.path.join(self.storage_dir, f"{db_type}_db")
+
+    def _searchable_dbs(self) -> Dict[str, VectorDatabase]:
+        """
+        전체 검색 대상 VectorDB를 반환합니다. 이미 열렸거나 디스크에 데이터가 있는 타입만 엽니다.
+        """
+        searchable = {}
+        for db_type in SUPPORTED_FILE_TYPES:
+            db_dir = self._db_dir(db_type)
+            has_data = os.path.exists(os.path.join(db_dir, "faiss_index.bin")) or os.path.exists(os.path.join(db_dir, "wal.log"))
+            if db_type in self._vector_dbs or has_data:
+                searchable[db_type] = self._get_db_by_type(db_type)
+        return searchable
+
+    @staticmethod
+    def _content_fingerprint(file_type: str, context: str) -> str:
+        """
+        파일 타입과 컨텍스트로 문서 내용의 지문(SHA-256)을 계산합니다.
+        
+        Args:
+            file_type (str): 파일 타입
+            context (str): 파일 컨텍스트
+            
+        Returns:
+            str: 16진수 해시 문자열
+        """
+        return hashlib.sha256(f"{file_type.lower()}\0{context}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _is_unchanged(vector_db: VectorDatabase, file_id: int, content_hash: str, volume_id: int) -> bool:
+        """
+        저장된 file_id의 내용 지문과 volume_id가 주어진 값과 같은지 확인합니다.
+        
+        Returns:
+            bool: 같은 내용이 이미 저장되어 있으면 True
+        """
+        try:
+            existing_metadata = vector_db.get_vector(file_id, include_context=False).get("metadata", {})
+        except KeyError:
+            return False  # 기존 데이터가 없는 경우
+        return existing_metadata.get("contentHash") == content_hash and existing_metadata.get("volumeId") == volume_id
+
+    def is_program_current(self, file_id: int, file_type: str, context: str, volume_id: int) -> bool:
+        """
+        파일이 주어진 내용과 volume_id로 이미 저장(또는 저장된 대표 문서의 사본으로 연결)되어 있는지 확인합니다.
+        True이면 저장된 임베딩으로 바로 검색할 수 있습니다.
+        
+        Args:
+            file_id (int): 파일 ID
+            file_type (str): 파일 타입 (excel, word, hwp, powerpoint)
+            context (str): 파일 컨텍스트
+            volume_id (int): 볼륨 ID
+            
+        Returns:
+            bool: 저장된 내용이 최신이면 True
+        """
+        if (file_type or '').lower() not in SUPPORTED_FILE_TYPES:
+            return False
+        vector_db = self._get_db_by_type(file_type)
+        content_hash = self._content_fingerprint(file_type, context)
+        if self._is_unchanged(vector_db, file_id, content_hash, volume_id):
+            return True
+        
+        duplicates = self._get_duplicates(file_type)
+        alias = duplicates.alias(str(file_id)) if duplicates is not None else None
+        if alias is None:
+            return False
+        alias_metadata = alias["metadata"]
+        return (alias_metadata.get("contentHash") == content_hash and alias_metadata.get("volumeId") == volume_id
+                and str(alias_metadata["canonicalId"]) in vector_db.metadata_store)
+
+    def _prepare_record(self, file_id: int, file_type: str, context: str, volume_id: int,
+                        pending: Optional[Dict[str, Optional[int]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        저장할 벡터 DB 레코드를 만듭니다. 내용이 바뀌지 않았으면 None을 반환합니다.
+        거의 같은 문서가 이미 있으면 레코드에 canonicalId를 넣어 반환하며, 이 레코드는 벡터 DB에 저장하지 않고
+        사본으로만 연결합니다. 중복 문서 색인은 저장이 끝난 뒤 _register_duplicate로 갱신합니다.
+        
+        Args:
+            file_id (int): 파일 ID
+            file_type (str): 파일 타입
+            context (str): 파일 컨텍스트
+            volume_id (int): 볼륨 ID
+            pending (Optional[Dict[str, Optional[int]]]): 같은 일괄 저장에서 먼저 저장하기로 한 파일 ID별 지문
+            
+        Returns:
+            Optional[Dict[str, Any]]: id, text, metadata(와 사본이면 canonicalId)를 가진 레코드. 저장할 필요가 없으면 None
+        """
+        vector_db = self._get_db_by_type(file_type)
+        content_hash = self._content_fingerprint(file_type, context)
+        
+        # 동일한 file_id의 내용이 바뀌지 않았다면 저장 생략
+        if self._is_unchanged(vector_db, file_id, content_hash, volume_id):
+            logger.info(f"변경되지 않은 파일 정보는 다시 저장하지 않습니다. Type: {file_type}, ID: {file_id}")
+            return None
+        
+        metadata = {
+            "type": file_type,
+            "context": context,
+            "fileId": file_id,
+            "volumeId": volume_id,
+            "contentHash": content_hash
+        }
+        record = {"id": file_id, "text": f"{file_type} {context}", "metadata": metadata}
+        
+        duplicates = self._get_duplicates(file_type)
+        if duplicates is None:
+            return record
+        
+        key = str(file_id)
+        pending = pending if pending is not None else {}
+        exists = lambda canonical_key: canonical_key in vector_db.metadata_store
+        
+        # 이미 사본으로 연결된 파일: 내용이 같고 대표 문서가 남아 있으면 생략, 아니면 연결을 풀고 다시 판단
+        alias = duplicates.alias(key)
+        if alias is not None:
+            alias_metadata = alias["metadata"]
+            if (alias_metadata.get("contentHash") == content_hash and alias_metadata.get("volumeId") == volume_id
+                    and (str(alias_metadata["canonicalId"]) in pending or exists(str(alias_metadata["canonicalId"])))):
+                logger.info(f"변경되지 않은 사본 파일은 다시 저장하지 않습니다. Type: {file_type}, ID: {file_id}")
+                return None
+            duplicates.unlink(key)
+        
+        fingerprint = duplicates.fingerprint(self._preprocessor.clean(context))
+        if fingerprint is None:
+            return record
+        metadata["simhash"] = f"{fingerprint:016x}"
+        
+        # 이미 대표 문서인 파일은 그대로 다시 인덱싱하고, 새 파일만 거의 같은 대표 문서에 연결
+        # (같은 일괄 저장에서 먼저 나온 문서는 아직 색인에 없으므로 따로 비교)
+        if key not in vector_db.metadata_store:
+            canonical_key = duplicates.find_canonical(fingerprint, exists, exclude=key)
+            if canonical_key is None:
+                canonical_key = next((pending_key for pending_key, pending_fingerprint in pending.items()
+                                      if pending_fingerprint is not None and pending_key != key
+                                      and duplicates.is_near(fingerprint, pending_fingerprint)), None)
+            if canonical_key is not None:
+                record["canonicalId"] = canonical_key
+        return record
+
+    def _register_duplicate(self, file_type: str, record: Dict[str, Any]) -> None:
+        """
+        저장이 끝난 레코드를 중복 문서 색인에 반영합니다. 사본 레코드는 대표 문서에 연결하고,
+        저장된 문서는 지문이 있으면 대표 문서로 등록합니다. 다시 저장된 대표 문서에 연결되어 있던 사본은
+        바뀐 내용 기준으로 다시 판단합니다.
+        """
+        duplicates = self._get_duplicates(file_type)
+        if duplicates is None:
+            return
+        key = str(record["id"])
+        if "canonicalId" in record:
+            entry = {field: value for field, value in record.items() if field != "canonicalId"}
+            duplicates.link(key, record["canonicalId"], entry)
+            logger.info(f"거의 같은 문서의 사본으로 연결했습니다. Type: {file_type}, ID: {key}, 대표 문서: {record['canonicalId']}")
+        else:
+            if "simhash" in record["metadata"]:
+                duplicates.add_canonical(key, int(record["metadata"]["simhash"], 16))
+            else:
+                duplicates.remove_canonical(key)
+            self._reassign_aliases(file_type, duplicates, key)
 
     def store_program_info(self, file_id: int, file_type: str, context: str, volume_id: int) -> None:
         """
         프로그램 정보를 벡터 데이터베이스에 저장합니다.
-        동일한 file_id가 있는 경우 기존 데이터를 삭제하고 새로운 데이터를 저장합니다.
+        동일한 file_id가 있는 경우 기존 데이터를 새로운 데이터로 교체합니다.
+        내용 지문과 volume_id가 저장된 값과 같으면 제목 생성, 임베딩, 저장을 모두 생략하고,
+        이미 인덱싱된 문서와 거의 같은 새 문서는 그 문서의 사본으로만 연결합니다.
         
         Args:
             file_id (int): 파일 ID
@@ -65,39 +328,84 @@ class VectorDBService:
                 logger.info(f"Text 타입은 벡터 DB에 저장하지 않습니다 - FileID: {file_id}, FileType: {file_type}")
                 return
                 
-            vector_db = self._get_db_by_type(file_type)
+            record = self._prepare_record(file_id, file_type, context, volume_id)
+            if record is None:
+                return
+            if "canonicalId" in record:
+                # 대표 문서가 이미 저장되어 있으므로 사본으로만 연결
+                self._register_duplicate(file_type, record)
+                return
             
-            # 동일한 file_id가 있는지 확인하고 있다면 삭제
-            try:
-                existing_data = vector_db.get_vector(file_id)
-                vector_db.delete_vector(file_id)
-                logger.info(f"기존 파일 정보가 삭제되었습니다. Type: {file_type}, ID: {file_id}")
-                logger.debug(f"삭제된 기존 데이터: {json.dumps(existing_data, ensure_ascii=False)}")
-            except:
-                pass  # 기존 데이터가 없는 경우 무시
-            
-            # 프로그램 정보를 벡터로 변환
-            program_info = f"{file_type} {context}"
-            
-            # 벡터 데이터베이스에 저장
-            vector_db.store_vector(
+            # 벡터 데이터베이스에 저장 (중복 문서 색인은 저장이 성공한 뒤 갱신)
+            self._get_db_by_type(file_type).store_vector(
                 id=file_id,  
-                text=program_info,
-                metadata={
-                    "type": file_type,
-                    "context": context,
-                    "fileId": file_id,
-                    "volumeId": volume_id
-                }
+                text=record["text"],
+                metadata=record["metadata"]
             )
+            self._register_duplicate(file_type, record)
             
             logger.info(f"파일 정보가 벡터 DB에 저장되었습니다. Type: {file_type}, ID: {file_id}")
-            logger.debug(f"저장된 데이터: {json.dumps({'text': program_info, 'metadata': {'type': file_type, 'context': context, 'fileId': file_id, 'volumeId': volume_id}}, ensure_ascii=False)}")
+            logger.debug(f"저장된 데이터: {json.dumps(record, ensure_ascii=False)}")
             
         except Exception as e:
             logger.error(f"벡터 DB 저장 중 오류 발생: {str(e)}")
             raise
 
+    def store_program_infos(self, programs: List[Dict[str, Any]]) -> int:
+        """
+        여러 프로그램 정보를 파일 타입별로 묶어 일괄 저장합니다.
+        text 타입, 지원하지 않는 타입, 내용이 바뀌지 않은 파일, 사본으로 연결된 파일은 건너뜁니다.
+        
+        Args:
+            programs (List[Dict[str, Any]]): fileId, fileType, context, volumeId를 가진 프로그램 정보 리스트
+            
+        Returns:
+            int: 실제로 저장된 프로그램 수
+        """
+        try:
+            records_by_type: Dict[str, List[Dict[str, Any]]] = {}
+            aliases_by_type: Dict[str, List[Dict[str, Any]]] = {}
+            pending_by_type: Dict[str, Dict[str, Optional[int]]] = {}
+            for program in programs:
+                file_id = program.get('fileId')
+                file_type = program.get('fileType') or ''
+                
+                if file_type.lower() == 'text':
+                    continue
+                if file_type.lower() not in SUPPORTED_FILE_TYPES:
+                    logger.warning(f"지원하지 않는 파일 타입은 건너뜁니다 - FileID: {file_id}, FileType: {file_type}")
+                    continue
+                
+                pending = pending_by_type.setdefault(file_type.lower(), {})
+                record = self._prepare_record(file_id, file_type, program.get('context'), program.get('volumeId'), pending)
+                if record is None:
+                    continue
+                if "canonicalId" in record:
+                    aliases_by_type.setdefault(file_type.lower(), []).append(record)
+                    continue
+                simhash = record["metadata"].get("simhash")
+                pending[str(file_id)] = int(simhash, 16) if simhash else None
+                records_by_type.setdefault(file_type.lower(), []).append(record)
+            
+            # 중복 문서 색인은 저장이 성공한 뒤 갱신 (사본은 대표 문서가 저장된 뒤 연결)
+            stored = 0
+            for db_type, records in records_by_type.items():
+                self._get_db_by_type(db_type).store_vectors_batch(records)
+                for record in records:
+                    self._register_duplicate(db_type, record)
+                stored += len(records)
+                logger.info(f"파일 정보 {len(records)}개가 벡터 DB에 일괄 저장되었습니다. Type: {db_type}")
+            for db_type, aliases in aliases_by_type.items():
+                for record in aliases:
+                    self._register_duplicate(db_type, record)
+            
+            logger.info(f"일괄 저장 완료. 요청: {len(programs)}개, 저장: {stored}개")
+            return stored
+            
+        except Exception as e:
+            logger.error(f"벡터 DB 일괄 저장 중 오류 발생: {str(e)}")
+            raise
+
     def get_program_info(self, file_id: int, file_type: str) -> Dict[str, Any]:
         """
         프로그램 정보를 벡터 데이터베이스에서 조회합니다.
@@ -116,7 +424,14 @@ class VectorDBService:
                 return {}
                 
             vector_db = self._get_db_by_type(file_type)
-            vector_data = vector_db.get_vector(file_id)
+            try:
+                vector_data = vector_db.get_vector(file_id)
+            except KeyError:
+                # 거의 같은 문서의 사본으로 연결된 파일
+                duplicates = self._get_duplicates(file_type)
+                vector_data = duplicates.alias(str(file_id)) if duplicates is not None else None
+                if vector_data is None:
+                    raise
             return vector_data.get("metadata", {})
         except Exception as e:
             logger.error(f"벡터 DB 조회 중 오류 발생: {str(e)}")
@@ -137,13 +452,120 @@ class VectorDBService:
                 return
                 
             vector_db = self._get_db_by_type(file_type)
+            duplicates = self._get_duplicates(file_type)
+            if duplicates is not None and duplicates.unlink(str(file_id)) is not None:
+                logger.info(f"사본 파일 연결이 삭제되었습니다. Type: {file_type}, ID: {file_id}")
+                return
+            
             vector_db.delete_vector(file_id)
             logger.info(f"파일 정보가 벡터 DB에서 삭제되었습니다. Type: {file_type}, ID: {file_id}")
+            if duplicates is not None:
+                duplicates.remove_canonical(str(file_id))
+                self._promote_alias(vector_db, duplicates, str(file_id))
         except Exception as e:
             logger.error(f"벡터 DB 삭제 중 오류 발생: {str(e)}")
             raise
 
-    def search_similar_programs(self, query: str, file_type: str = None, k: int = 5) -> List[Dict[str, Any]]:
+    def _on_canonicals_evicted(self, file_type: str, event: str, keys: List[str]) -> None:
+        """
+        축출된 대표 문서를 중복 문서 색인에서 빼고 연결된 사본도 정리합니다.
+        축출로 비운 자리를 사본 승격으로 다시 채우지 않도록 승격하지 않으며, 정리된 사본은 다음 요청에서 새 문서로 저장됩니다.
+        """
+        if event != "evict":
+            return
+        duplicates = self._get_duplicates(file_type)
+        for key in keys:
+            duplicates.remove_canonical(key)
+            aliases = duplicates.aliases_of(key)
+            for alias_key in aliases:
+                duplicates.unlink(alias_key)
+            if aliases:
+                logger.info(f"축출된 대표 문서 {key}의 사본 {len(aliases)}개 연결을 정리했습니다. Type: {file_type}")
+
+    def _promote_alias(self, vector_db: VectorDatabase, duplicates: NearDuplicateIndex, canonical_key: str) -> None:
+        """
+        삭제된 대표 문서의 사본 중 하나를 새 대표 문서로 인덱싱하고 나머지 사본을 그 문서에 연결합니다.
+        """
+        aliases = duplicates.aliases_of(canonical_key)
+        if not aliases:
+            return
+        
+        promoted_key, others = aliases[0], aliases[1:]
+        entry = duplicates.unlink(promoted_key)
+        metadata = {field: value for field, value in entry["metadata"].items() if field != "canonicalId"}
+        vector_db.store_vector(id=metadata["fileId"], text=entry["text"], metadata=metadata)
+        duplicates.add_canonical(promoted_key, int(metadata["simhash"], 16))
+        for key in others:
+            duplicates.link(key, promoted_key, duplicates.alias(key))
+        logger.info(f"삭제된 대표 문서 {canonical_key}의 사본 {promoted_key}을(를) 대표 문서로 인덱싱했습니다. (연결된 사본 {len(others)}개)")
+
+    def _reassign_aliases(self, file_type: str, duplicates: NearDuplicateIndex, canonical_key: str) -> None:
+        """
+        내용이 바뀌어 다시 저장된 대표 문서의 사본 연결을 풀고, 각 사본을 새 파일처럼 다시 판단합니다.
+        여전히 거의 같은 대표 문서가 있으면 그 문서에 연결하고, 없으면 인덱싱해 대표 문서로 승격합니다.
+        """
+        aliases = duplicates.aliases_of(canonical_key)
+        for alias_key in aliases:
+            metadata = duplicates.unlink(alias_key)["metadata"]
+            try:
+                record = self._prepare_record(metadata["fileId"], file_type, metadata["context"], metadata["volumeId"])
+                if record is None:
+                    continue
+                if "canonicalId" not in record:
+                    self._get_db_by_type(file_type).store_vector(id=record["id"], text=record["text"],
+                                                                 metadata=record["metadata"])
+                self._register_duplicate(file_type, record)
+            except Exception as e:
+                # 연결이 풀린 사본은 다음 저장 요청에서 새 파일로 저장됨
+                logger.error(f"사본 파일 재판단 중 오류 발생. Type: {file_type}, ID: {alias_key}, 오류: {str(e)}")
+        if aliases:
+            logger.info(f"다시 저장된 대표 문서 {canonical_key}의 사본 {len(aliases)}개를 다시 판단했습니다. Type: {file_type}")
+
+    def _collapse_duplicates(self, results: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        """
+        검색 결과에서 같은 타입의 거의 같은 문서를 점수가 높은 하나로 묶고,
+        각 결과에 연결된 사본 목록(duplicates: [[fileId, volumeId], ...])을 붙입니다.
+        """
+        collapsed = []
+        kept_fingerprints: Dict[str, List[int]] = {}
+        for result in results:
+            file_type = str(result["metadata"].get("type", "")).lower()
+            duplicates = self._get_duplicates(file_type)
+            if duplicates is None:
+                collapsed.append(result)
+                continue
+            
+            value = result["metadata"].get("simhash")
+            if value:
+                fingerprint = int(value, 16)
+                kept = kept_fingerprints.setdefault(file_type, [])
+                if any(duplicates.is_near(fingerprint, other) for other in kept):
+                    continue
+                kept.append(fingerprint)
+            
+            aliases = [duplicates.alias(key) for key in duplicates.aliases_of(result["id"])]
+            result["duplicates"] = [[alias["metadata"]["fileId"], alias["metadata"]["volumeId"]]
+                                    for alias in aliases if alias is not None]
+            collapsed.append(result)
+            if len(collapsed) == k:
+                break
+        return collapsed
+
+    def _search_dbs(self, vector_dbs: Iterable[VectorDatabase], query_vector: np.ndarray, k: int,
+                    filters: Optional[Dict[str, Any]], include_context: bool) -> List[Dict[str, Any]]:
+        """
+        여러 VectorDB에서 같은 쿼리 벡터로 검색해 유사도 점수 기준 상위 k개를 병합합니다.
+        """
+        # 타입별 FAISS 검색을 동시에 실행
+        per_type_results = self._search_executor.map(
+            lambda vector_db: vector_db.search_by_vector(query_vector, k, filters, include_context),
+            vector_dbs)
+        return heapq.nlargest(k, itertools.chain.from_iterable(per_type_results),
+                              key=lambda x: x['similarity_score'])
+
+    def search_similar_programs(self, query: str, file_type: str = None, k: int = 5, mode: str = "llm",
+                                filters: Optional[Dict[str, Any]] = None,
+                                include_context: bool = True) -> List[Dict[str, Any]]:
         """
         유사한 파일을 검색합니다.
         
@@ -151,37 +573,285 @@ class VectorDBService:
             query (str): 검색 쿼리
             file_type (str, optional): 특정 파일 타입만 검색할 경우 지정
             k (int): 반환할 결과 수
+            mode (str): 쿼리 표현 방식 (llm, keywords, fast). keywords와 fast는 LLM을 호출하지 않음
+            filters (Optional[Dict[str, Any]]): 메타데이터 필터 (volumeId, type). 예: {"volumeId": 3}
+            include_context (bool): False이면 결과에 text와 metadata.context를 넣지 않음. ID만 필요할 때
+                큰 컨텍스트를 읽지 않도록 사용 (기본값: True)
             
         Returns:
-            List[Dict[str, Any]]: 유사한 파일 정보 리스트
+            List[Dict[str, Any]]: 유사한 파일 정보 리스트. 거의 같은 문서는 하나로 묶이고 사본은 duplicates에 표시
         """
         try:
-            logger.debug(f"유사 파일 검색 시작. 쿼리: {query}, 파일 타입: {file_type}, k: {k}")
+            logger.debug(f"유사 파일 검색 시작. 쿼리: {query}, 파일 타입: {file_type}, k: {k}, 방식: {mode}, 필터: {filters}")
             
             # text 타입은 유사도 검색을 하지 않음
             if file_type and file_type.lower() == 'text':
                 logger.info(f"Text 타입은 유사도 검색을 하지 않습니다 - FileType: {file_type}")
                 return []
             
+            # 거의 같은 문서를 하나로 묶은 뒤에도 k개가 남도록 더 많이 찾음
+            fetch_k = k * 2 if self.near_duplicate_threshold is not None else k
+            
             if file_type:
                 # 특정 파일 타입에서만 검색
                 vector_db = self._get_db_by_type(file_type)
-                results = vector_db.search_similar(query, k)
+                results = vector_db.search_similar(query, fetch_k, mode=mode, filters=filters, include_context=include_context)
                 logger.debug(f"특정 파일 타입({file_type}) 검색 결과: {json.dumps(results, ensure_ascii=False)}")
             else:
-                # 모든 파일 타입에서 검색
-                all_results = []
-                for db_type, vector_db in self._vector_dbs.items():
-                    results = vector_db.search_similar(query, k)
-                    logger.debug(f"파일 타입 {db_type} 검색 결과: {json.dumps(results, ensure_ascii=False)}")
-                    all_results.extend(results)
+                # 모든 파일 타입에서 검색: 쿼리 벡터는 한 번만 계산 (모델과 캐시는 모든 타입이 공유)
+                vector_dbs = {db_type: vector_db for db_type, vector_db in self._searchable_dbs().items() if vector_db.metadata_store}
+                if not vector_dbs:
+                    logger.info(f"검색할 파일 정보가 없습니다. 쿼리: {query}")
+                    return []
+                query_vector = next(iter(vector_dbs.values())).embed_query(query, mode)
                 
-                # 유사도 점수로 정렬하고 상위 k개 선택
-                results = sorted(all_results, key=lambda x: x['similarity_score'], reverse=True)[:k]
-                logger.debug(f"전체 검색 결과 (상위 {k}개): {json.dumps(results, ensure_ascii=False)}")
+                results = self._search_dbs(vector_dbs.values(), query_vector, fetch_k, filters, include_context)
+                logger.debug(f"전체 검색 결과 (상위 {fetch_k}개): {json.dumps(results, ensure_ascii=False)}")
+            
+            if self.near_duplicate_threshold is not None:
+                results = self._collapse_duplicates(results, k)
             
             logger.info(f"유사 파일 검색 완료. 파일 타입: {file_type if file_type else '전체'}, 쿼리: {query}, 결과 수: {len(results)}")
             return results
         except Exception as e:
             logger.error(f"유사 파일 검색 중 오류 발생: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+
+    def _compute_neighbors(self, file_type: str, key: str, count: int) -> Optional[Dict[str, List[List[Any]]]]:
+        """
+        저장된 임베딩으로 문서의 대상 타입별 이웃을 계산합니다. 사용 시점(축출 순서)은 갱신하지 않습니다.
+        
+        Returns:
+            Optional[Dict[str, List[List[Any]]]]: {대상 타입: [[파일 키, fileId, volumeId, 유사도 점수], ...]}.
+                문서가 저장되어 있지 않으면 None
+        """
+        try:
+            query_vector = self._get_db_by_type(file_type).get_embedding(key)
+        except KeyError:
+            return None
+        vector_dbs = {db_type: vector_db for db_type, vector_db in self._searchable_dbs().items() if vector_db.metadata_store}
+        per_type_results = self._search_executor.map(
+            lambda vector_db: vector_db.search_by_vector(query_vector, count + 1, include_context=False, touch=False),
+            vector_dbs.values())
+        return {
+            db_type: [[result["id"], result["fileId"], result["volumeId"], result["similarity_score"]]
+                      for result in results if not (db_type == file_type and result["id"] == key)][:count]
+            for db_type, results in zip(vector_dbs, per_type_results)
+        }
+
+    def _on_vectors_changed(self, file_type: str, event: str, keys: List[str]) -> None:
+        """
+        VectorDB의 저장/삭제(축출 포함) 알림을 받아 이웃 그래프를 갱신합니다.
+        저장된 문서는 이웃을 다시 계산하고, 찾은 이웃들의 목록에도 후보로 넣습니다.
+        바뀌거나 삭제된 문서를 이웃으로 가진 노드는 다음 조회 때 다시 계산합니다.
+        """
+        vector_db = self._get_db_by_type(file_type)
+        with self._neighbor_lock:
+            # 이번 알림에서 계산한 노드는 이미 바뀐 벡터로 계산되었으므로 다시 계산하지 않음
+            computed = set()
+            # 후보 제안은 대상 노드별로 모아 노드마다 한 번만 읽고 씀
+            offers: Dict[str, List[List[Any]]] = {}
+            for key in keys:
+                node = node_key(file_type, key)
+                if event != "store":
+                    self._neighbors.remove(node)
+                    continue
+                
+                self._neighbors.mark_dirty(self._neighbors.referrers(node) - computed)
+                entry = vector_db.metadata_store.get(key)
+                # 역방향 이웃을 더 많이 찾도록 보관할 수의 두 배를 후보로 계산
+                candidates = self._compute_neighbors(file_type, key, self._neighbors.size * 2)
+                if entry is None or candidates is None:
+                    # 알림 전에 다시 삭제된 문서
+                    self._neighbors.remove(node)
+                    continue
+                self._neighbors.set(node, entry.get("stored_at"), candidates)
+                computed.add(node)
+                for target_type, items in candidates.items():
+                    for neighbor_key, _, _, score in items:
+                        offers.setdefault(node_key(target_type, neighbor_key), []).append(
+                            [key, entry["metadata"].get("fileId"), entry["metadata"].get("volumeId"), score])
+            for node, offered in offers.items():
+                self._neighbors.offer(node, file_type, offered)
+            self._neighbors.commit()
+
+    def _neighbor_results(self, file_type: str, key: str, search_file_type: Optional[str], count: int,
+                          include_context: bool, include_self: bool) -> Optional[List[Dict[str, Any]]]:
+        """
+        이웃 그래프에서 문서의 유사 문서를 읽어 검색 결과 형태로 반환합니다.
+        그래프에 없거나 문서가 다시 저장된 뒤 갱신되지 않은 노드는 저장된 임베딩으로 다시 계산합니다.
+        
+        Returns:
+            Optional[List[Dict[str, Any]]]: 유사도 순 결과. 문서가 저장되어 있지 않으면 None
+        """
+        entry = self._get_db_by_type(file_type).metadata_store.get(key)
+        if entry is None:
+            return None
+        
+        node = node_key(file_type, key)
+        current = self._neighbors.get(node)
+        if current is not None and current[0] == entry.get("stored_at"):
+            neighbors = current[1]
+        else:
+            with self._neighbor_lock:
+                neighbors = self._compute_neighbors(file_type, key, self._neighbors.size)
+                if neighbors is None:
+                    return None
+                self._neighbors.set(node, entry.get("stored_at"), neighbors)
+                self._neighbors.commit()
+        
+        target_types = [search_file_type.lower()] if search_file_type else list(neighbors)
+        items = [(target_type, item) for target_type in target_types for item in neighbors.get(target_type, [])]
+        if include_self and file_type in target_types:
+            items.append((file_type, [key, None, None, 1.0]))
+        
+        results = []
+        for target_type, (neighbor_key, _, _, score) in heapq.nlargest(count, items, key=lambda x: x[1][3]):
+            try:
+                neighbor = self._get_db_by_type(target_type).get_vector(neighbor_key, include_context=include_context)
+            except KeyError:
+                # 그래프가 갱신되기 전에 삭제된 문서
+                continue
+            result = {
+                "id": neighbor_key,
+                "title": neighbor["title"],
+                "metadata": neighbor["metadata"],
+                "similarity_score": score,
+                "fileId": neighbor["metadata"].get("fileId", None),
+                "volumeId": neighbor["metadata"].get("volumeId", None)
+            }
+            if include_context:
+                result["text"] = neighbor["text"]
+            results.append(result)
+        return results
+
+    def rebuild_neighbor_graph(self) -> int:
+        """
+        저장된 임베딩으로 이웃 그래프 전체를 다시 만듭니다. (재임베딩이나 LLM 호출 없음)
+        
+        Returns:
+            int: 이웃을 계산한 문서 수
+        """
+        if self._neighbors is None:
+            return 0
+        count = 0
+        with self._neighbor_lock:
+            self._neighbors.clear()
+            for db_type, vector_db in self._searchable_dbs().items():
+                for key in list(vector_db.metadata_store):
+                    entry = vector_db.metadata_store.get(key)
+                    neighbors = self._compute_neighbors(db_type, key, self._neighbors.size)
+                    if entry is None or neighbors is None:
+                        continue
+                    self._neighbors.set(node_key(db_type, key), entry.get("stored_at"), neighbors)
+                    count += 1
+            self._neighbors.commit()
+        logger.info(f"이웃 그래프를 다시 만들었습니다. 문서 수: {count}")
+        return count
+
+    def search_similar_to_program(self, file_id: int, file_type: str, k: int = 5, search_file_type: str = None,
+                                  filters: Optional[Dict[str, Any]] = None,
+                                  include_context: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """
+        저장된 파일의 임베딩을 쿼리로 사용해 유사한 파일을 검색합니다.
+        쿼리 제목 생성(LLM 호출)과 임베딩을 다시 하지 않으며, 파일 자신은 결과에서 제외합니다.
+        사본으로 연결된 파일은 대표 문서의 임베딩을 사용합니다.
+        필터가 없으면 미리 계산된 이웃 그래프를 읽어 FAISS 검색 없이 반환합니다.
+        
+        Args:
+            file_id (int): 쿼리로 사용할 파일 ID
+            file_type (str): 쿼리로 사용할 파일의 타입
+            k (int): 반환할 결과 수
+            search_file_type (str, optional): 특정 파일 타입만 검색할 경우 지정
+            filters (Optional[Dict[str, Any]]): 메타데이터 필터 (volumeId, type)
+            include_context (bool): False이면 결과에 text와 metadata.context를 넣지 않음 (기본값: False)
+            
+        Returns:
+            Optional[List[Dict[str, Any]]]: 유사한 파일 정보 리스트. 파일이 저장되어 있지 않으면 None
+        """
+        try:
+            if file_type.lower() == 'text' or (search_file_type and search_file_type.lower() == 'text'):
+                logger.info(f"Text 타입은 유사도 검색을 하지 않습니다 - FileType: {file_type}, 검색 타입: {search_file_type}")
+                return []
+            
+            source_type = file_type.lower()
+            source_db = self._get_db_by_type(source_type)
+            key = str(file_id)
+            duplicates = self._get_duplicates(source_type)
+            alias = duplicates.alias(key) if duplicates is not None else None
+            
+            query_key = str(alias["metadata"]["canonicalId"]) if alias is not None else key
+            
+            # 자기 자신이 결과에 포함되어도 k개가 남도록 더 찾음
+            fetch_k = (k * 2 if self.near_duplicate_threshold is not None else k) + 1
+            results = None
+            if self._neighbors is not None and filters is None and fetch_k <= self._neighbors.size:
+                results = self._neighbor_results(source_type, query_key, search_file_type, fetch_k,
+                                                 include_context, include_self=alias is not None)
+            if results is None:
+                try:
+                    query_vector = source_db.get_embedding(query_key)
+                except KeyError:
+                    logger.info(f"저장되지 않은 파일은 저장된 임베딩으로 검색할 수 없습니다. Type: {file_type}, ID: {file_id}")
+                    return None
+                if search_file_type:
+                    vector_dbs = [self._get_db_by_type(search_file_type)]
+                else:
+                    vector_dbs = [vector_db for vector_db in self._searchable_dbs().values() if vector_db.metadata_store]
+                results = self._search_dbs(vector_dbs, query_vector, fetch_k, filters, include_context)
+            results = [result for result in results
+                       if not (str(result["metadata"].get("type", "")).lower() == source_type and result["id"] == key)]
+            
+            if self.near_duplicate_threshold is not None:
+                results = self._collapse_duplicates(results, k)
+                if alias is not None:
+                    # 대표 문서의 사본 목록에서 자기 자신을 뺌
+                    for result in results:
+                        if result["id"] == query_key:
+                            result["duplicates"] = [duplicate for duplicate in result["duplicates"]
+                                                    if str(duplicate[0]) != key]
+            results = results[:k]
+            logger.info(f"저장된 파일 기준 유사 파일 검색 완료. Type: {file_type}, ID: {file_id}, 결과 수: {len(results)}")
+            return results
+        except Exception as e:
+            logger.error(f"유사 파일 검색 중 오류 발생: {str(e)}")
+            raise
+
+    def close(self) -> None:
+        """
+        모든 파일 타입별 VectorDB의 남은 변경 내역을 체크포인트하고 정리합니다.
+        서버 종료 시 호출됩니다.
+        """
+        for db_type, vector_db in list(self._vector_dbs.items()):
+            try:
+                vector_db.close()
+            except Exception as e:
+                logger.error(f"벡터 DB 종료 중 오류 발생 ({db_type}): {str(e)}")
+        for db_type, duplicates in list(self._duplicates.items()):
+            try:
+                duplicates.close()
+            except Exception as e:
+                logger.error(f"사본 저장소 종료 중 오류 발생 ({db_type}): {str(e)}")
+        if self._neighbors is not None:
+            try:
+                self._neighbors.close()
+            except Exception as e:
+                logger.error(f"이웃 그래프 종료 중 오류 발생: {str(e)}")
+        self._search_executor.shutdown(wait=True)
+        self._title_cache.save()
+        self._embedding_cache.close()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        제목 캐시, 임베딩 캐시, 전처리 결과의 적중/미스 통계와 타입별 블롭 저장소, 이웃 그래프 통계를 반환합니다.
+        
+        Returns:
+            Dict[str, Any]: 캐시별 통계
+        """
+        return {
+            "title_cache": {"hits": self._title_cache.hits, "misses": self._title_cache.misses},
+            "embedding_cache": self._embedding_cache.stats(),
+            "preprocessor": {"hits": self._preprocessor.hits, "misses": self._preprocessor.misses},
+            "blobs": {db_type: vector_db.blobs.stats() for db_type, vector_db in self._vector_dbs.items()},
+            "neighbor_graph": self._neighbors.stats() if self._neighbors is not None else None
+        }